@@ -0,0 +1,158 @@
+"""Stage-by-stage benchmarks over synthetic documents.
+
+Usage::
+
+    python benchmarks/bench.py                       # print a table
+    python benchmarks/bench.py --save baseline.json  # record a baseline
+    python benchmarks/bench.py --compare baseline.json --tolerance 0.25
+    python benchmarks/bench.py --compare benchmarks/baseline.json  # reference run
+
+Every scenario is generated with :mod:`zddoc.testing`, so runs are
+reproducible and need no fixture files.  Each stage is timed on its own
+(best of ``--repeat`` runs) and then run once more under ``tracemalloc`` to
+record its peak allocation.  ``--compare`` exits with status 1 when a stage
+is slower than the baseline by more than the tolerance (stages that take
+well under a millisecond are too noisy to compare and are skipped).
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from zddoc.cfbf import CFBFReader  # noqa: E402
+from zddoc.fib import FIB_MIN_SIZE, WordFIB  # noqa: E402
+from zddoc.fields import FieldScanner  # noqa: E402
+from zddoc.piece_table import PieceTable  # noqa: E402
+from zddoc.reader import DEFAULT_CHUNK_CHARS, DocReader  # noqa: E402
+from zddoc.testing import build_doc, sample_text  # noqa: E402
+
+MB = 1024 * 1024
+NOISE_FLOOR_SECONDS = 0.0005
+
+SCENARIOS: Dict[str, Dict[str, object]] = {
+    "small-mini-stream": dict(chars=2_000, min_stream_size=0),
+    "compressed-4mb": dict(chars=4 * MB),
+    "unicode-2mb": dict(chars=2 * MB, unicode_ratio=1.0),
+    "mixed-fragmented": dict(chars=2 * MB, pieces=20_000, unicode_ratio=0.5, shuffle_pieces=True),
+    "scattered-sectors": dict(chars=2 * MB, scatter_sectors=True),
+    "difat-fat": dict(chars=1 * MB, min_fat_sectors=150),
+    "v4-sectors": dict(chars=2 * MB, sector_size=4096),
+    "field-heavy": dict(chars=1 * MB, fields=True),
+}
+_TOC_ENTRY = '\x13 HYPERLINK \\l "_Toc1" \x14Heading text\t\x13 PAGEREF _Toc1 \\h \x1412\x15\x15\r'
+
+
+def build_scenario(options: Dict[str, object]) -> bytes:
+    options = dict(options)
+    text = sample_text(options.pop("chars"), seed=1)
+    if options.pop("fields", False):
+        # A table of contents with thousands of nested HYPERLINK/PAGEREF fields.
+        toc = "\x13 TOC \\o \"1-3\" \x14" + _TOC_ENTRY * (len(text) // 2 // len(_TOC_ENTRY)) + "\x15"
+        text = toc + text[len(toc) :]
+    return build_doc(text, **options)
+
+
+def _walk_fat(cfbf: CFBFReader) -> None:
+    """Build the FAT and decode every page of it; building alone only reads the DIFAT."""
+    cfbf._build_fat()
+    for index in range(len(cfbf._fat_sectors)):
+        cfbf._fat.page(index)
+
+
+def _stages(data: bytes) -> List[Tuple[str, Callable[[], object], int]]:
+    """Return ``(name, callable, bytes_processed)`` for every stage of ``data``."""
+    cfbf = CFBFReader(data)
+    word = cfbf.open_stream("WordDocument").getvalue()
+    fib = WordFIB.from_bytes(word)
+    table = cfbf.open_stream(fib.table_stream_name).getvalue()
+    pieces = PieceTable(table, fib.fcClx, fib.lcbClx)
+    segments = list(pieces.segments())
+    word_stream = io.BytesIO(word)
+    raw = list(DocReader._iter_segments(segments, word_stream, DEFAULT_CHUNK_CHARS))
+    text_bytes = sum(segment.byte_length for segment in segments)
+    raw_chars = sum(len(chunk) for chunk in raw)
+    return [
+        # Opening reads the header, the DIFAT and the directory, not the whole file.
+        ("cfbf_open", lambda: CFBFReader(data), 512 + len(cfbf._entries) * 128),
+        ("build_fat", lambda: _walk_fat(cfbf), len(cfbf._fat_sectors) * cfbf.sector_size),
+        ("read_directory", cfbf._read_directory, len(cfbf._entries) * 128),
+        ("fib", lambda: WordFIB.from_bytes(word[:FIB_MIN_SIZE]), FIB_MIN_SIZE),
+        ("piece_table", pieces._parse, fib.lcbClx),
+        ("decode", lambda: list(DocReader._iter_segments(segments, word_stream, DEFAULT_CHUNK_CHARS)), text_bytes),
+        ("fields", lambda: list(DocReader._strip_fields(raw, FieldScanner())), raw_chars),
+        ("normalize", lambda: list(DocReader._normalize_chunks(raw, DEFAULT_CHUNK_CHARS)), raw_chars),
+        ("read_text", lambda: DocReader(data).read_text(), len(data)),
+    ]
+
+
+def run_scenario(data: bytes, repeat: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, func, size in _stages(data):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {
+            "seconds": best,
+            "mb_per_s": size / MB / best if best else 0.0,
+            "peak_kib": peak / 1024,
+        }
+    return results
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for scenario, stages in current.items():
+        for stage, numbers in stages.items():
+            previous = baseline.get(scenario, {}).get(stage)
+            if not previous or numbers["seconds"] - previous["seconds"] < NOISE_FLOOR_SECONDS:
+                continue
+            ratio = numbers["seconds"] / previous["seconds"]
+            if ratio > 1 + tolerance:
+                regressions.append(f"{scenario}/{stage}: {ratio:.2f}x slower than baseline")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per stage (best is kept)")
+    parser.add_argument("--save", type=Path, help="write results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, help="compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown ratio for --compare")
+    args = parser.parse_args()
+
+    current: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for scenario in args.scenario or list(SCENARIOS):
+        data = build_scenario(SCENARIOS[scenario])
+        current[scenario] = run_scenario(data, args.repeat)
+        print(f"{scenario} ({len(data) / MB:.1f} MB)")
+        for stage, numbers in current[scenario].items():
+            print(
+                f"  {stage:<15} {numbers['seconds'] * 1000:9.2f} ms "
+                f"{numbers['mb_per_s']:9.1f} MB/s {numbers['peak_kib']:10.0f} KiB peak"
+            )
+    if args.save:
+        args.save.write_text(json.dumps(current, indent=2, sort_keys=True))
+    if args.compare:
+        regressions = compare(current, json.loads(args.compare.read_text()), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import asyncio
+import io
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from zddoc.aio import AsyncDocReader, extract_many
+
+DOC_PATH = Path(__file__).resolve().parents[1] / "test_doc" / "hnw14-vdw79.doc"
+
+
+class _AsyncBytes:
+    """Minimal async byte source, like an HTTP body or asyncio.StreamReader."""
+
+    def __init__(self, data: bytes, step: int = 1000) -> None:
+        self._data = data
+        self._step = step
+
+    async def read(self, size: int = -1) -> bytes:
+        await asyncio.sleep(0)
+        chunk, self._data = self._data[: self._step], self._data[self._step :]
+        return chunk
+
+
+class AsyncDocReaderTest(unittest.TestCase):
+    def test_reads_async_source(self) -> None:
+        async def run():
+            async with AsyncDocReader(_AsyncBytes(DOC_PATH.read_bytes())) as reader:
+                return await reader.read_text(), await reader.read_range(0, 7)
+
+        text, preview = asyncio.run(run())
+        self.assertIn("my test file for python", text)
+        self.assertEqual("my test", preview)
+
+    def test_large_async_source_spills_to_disk(self) -> None:
+        async def run():
+            reader = AsyncDocReader(_AsyncBytes(DOC_PATH.read_bytes()), spill_threshold=2048)
+            async with reader:
+                spill_path = Path(reader._spill_path)
+                self.assertTrue(spill_path.exists())
+                text = await reader.read_text()
+            return text, spill_path
+
+        text, spill_path = asyncio.run(run())
+        self.assertIn("my test file for python", text)
+        self.assertFalse(spill_path.exists())
+
+    def test_process_executor_reopens_in_worker(self) -> None:
+        async def run(executor):
+            async with AsyncDocReader(DOC_PATH, executor=executor) as reader:
+                text = await reader.read_text()
+            async with AsyncDocReader(_AsyncBytes(DOC_PATH.read_bytes()), executor=executor) as reader:
+                preview = await reader.read_range(0, 7)
+            with self.assertRaises(TypeError):
+                await AsyncDocReader(io.BytesIO(DOC_PATH.read_bytes()), executor=executor).open()
+            return text, preview
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            text, preview = asyncio.run(run(executor))
+        self.assertIn("my test file for python", text)
+        self.assertEqual("my test", preview)
+
+
+class ExtractManyTest(unittest.TestCase):
+    def test_results_and_errors(self) -> None:
+        data = DOC_PATH.read_bytes()
+        sources = [DOC_PATH, b"garbage", _AsyncBytes(data)] + [data] * 10
+
+        async def run():
+            return [result async for result in extract_many(sources, concurrency=3)]
+
+        results = {result.index: result for result in asyncio.run(run())}
+        self.assertEqual(set(range(len(sources))), set(results))
+        self.assertEqual("DocFormatError", results[1].error_type)
+        for index in (0, 2, 12):
+            self.assertIn("my test file for python", results[index].text)
+
+    def test_unexpected_errors_are_raised(self) -> None:
+        async def run():
+            return [result async for result in extract_many([5, DOC_PATH.read_bytes()], concurrency=1)]
+
+        # A leaked slot would leave the consumer waiting forever.
+        with self.assertRaises(TypeError):
+            asyncio.run(asyncio.wait_for(run(), 30))
+
+    def test_early_exit_cancels_pending_work(self) -> None:
+        async def run():
+            async for result in extract_many([DOC_PATH] * 50, concurrency=2):
+                return result
+
+        self.assertTrue(asyncio.run(run()).ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
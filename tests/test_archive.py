@@ -0,0 +1,106 @@
+import io
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from zddoc.archive import (
+    OpenArchives,
+    expand_archives,
+    extract_archive,
+    extract_items,
+    extract_member,
+    iter_members,
+    member_path,
+    split_member_path,
+)
+from zddoc.batch import extract_batch
+
+DOC_DIR = Path(__file__).resolve().parents[1] / "test_doc"
+SAMPLE = (DOC_DIR / "hnw14-vdw79.doc").read_bytes()
+MEMBERS = {
+    "docs/a.doc": SAMPLE,
+    "docs/B.DOC": (DOC_DIR / "a15a2-6pwn0.doc").read_bytes(),
+    "broken.doc": b"not a compound file" * 40,
+    "notes.txt": b"ignored",
+}
+
+
+class ArchiveTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.tmp = Path(self._tmp.name)
+        self.zip_path = self.tmp / "corpus.zip"
+        with zipfile.ZipFile(self.zip_path, "w", zipfile.ZIP_DEFLATED) as handle:
+            for name, data in MEMBERS.items():
+                handle.writestr(name, data)
+        self.tar_paths = []
+        for suffix, mode in ((".tar", "w"), (".tar.gz", "w:gz")):
+            path = self.tmp / f"corpus{suffix}"
+            with tarfile.open(path, mode) as handle:
+                for name, data in MEMBERS.items():
+                    info = tarfile.TarInfo(name)
+                    info.size = len(data)
+                    handle.addfile(info, io.BytesIO(data))
+            self.tar_paths.append(path)
+
+    def _check(self, results) -> None:
+        by_name = {result.path.rpartition("!")[2]: result for result in results}
+        self.assertEqual({"docs/a.doc", "docs/B.DOC", "broken.doc"}, set(by_name))
+        self.assertIn("my test file for python", by_name["docs/a.doc"].text)
+        self.assertEqual(len(SAMPLE), by_name["docs/a.doc"].input_bytes)
+        self.assertTrue(by_name["docs/B.DOC"].ok)
+        self.assertEqual("DocFormatError", by_name["broken.doc"].error_type)
+
+    def test_extract_archive_reads_members_in_memory(self) -> None:
+        for path in [self.zip_path] + self.tar_paths:
+            with self.subTest(path=path.name):
+                self._check(list(extract_archive(path)))
+
+    def test_large_members_are_spooled(self) -> None:
+        members = list(iter_members(self.zip_path, spool_threshold=1024))
+        self.assertFalse(any(isinstance(source, bytes) for name, _, source in members if name.endswith("a.doc")))
+        self._check(list(extract_archive(self.tar_paths[1], spool_threshold=1024)))
+
+    def test_member_paths(self) -> None:
+        item = member_path(self.zip_path, "docs/a.doc")
+        self.assertEqual((str(self.zip_path), "docs/a.doc"), split_member_path(item))
+        self.assertIsNone(split_member_path(str(DOC_DIR / "hnw14-vdw79.doc")))
+        self.assertTrue(extract_member(item, spool_threshold=16).ok)
+        missing = extract_member(member_path(self.zip_path, "nope.doc"))
+        self.assertEqual("KeyError", missing.error_type)
+
+    def test_batch_workers_open_each_archive_once(self) -> None:
+        archives = OpenArchives(limit=1)
+        self.addCleanup(archives.close)
+        for path in (self.zip_path, self.tar_paths[0]):
+            with self.subTest(path=path.name):
+                members = archives.get(path)
+                items = [member_path(path, name) for name in ("docs/a.doc", "docs/B.DOC", "broken.doc", "nope.doc")]
+                results = extract_items(items, archives=archives)
+                self.assertEqual([True, True, False, False], [result.ok for result in results])
+                self.assertEqual("KeyError", results[-1].error_type)
+                self.assertIs(members, archives.get(path))
+        # Only the most recent archive stays open, until the set is closed.
+        zip_members = archives.get(self.zip_path)
+        self.assertIsNot(members, archives.get(self.tar_paths[0]))
+        archives.close()
+        self.assertIsNot(zip_members, archives.get(self.zip_path))
+
+    def test_batch_expands_archives(self) -> None:
+        corrupt = self.tmp / "corrupt.zip"
+        corrupt.write_bytes(b"PK\x03\x04 truncated")
+        paths = [str(self.zip_path), str(self.tar_paths[0]), str(self.tar_paths[1]), str(corrupt)]
+        items = list(expand_archives(iter(paths)))
+        self.assertEqual(3 + 3 + 1 + 1, len(items))
+        for jobs in (1, 2):
+            results = list(extract_batch(items, jobs=jobs, chunk_size=2))
+            self.assertEqual(10, len(results))
+            failed = [result for result in results if result.path == str(corrupt)]
+            self.assertEqual("BadZipFile", failed[0].error_type)
+
+
+if __name__ == "__main__":
+    unittest.main()
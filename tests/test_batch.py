@@ -0,0 +1,53 @@
+import signal
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from zddoc.batch import BatchStats, expand_paths, extract_batch
+from zddoc.extract import ExtractionTimeout, _deadline
+
+DOC_DIR = Path(__file__).resolve().parents[1] / "test_doc"
+
+
+class ExpandPathsTest(unittest.TestCase):
+    def test_directories_globs_and_missing_files(self) -> None:
+        from_dir = list(expand_paths([str(DOC_DIR)]))
+        self.assertEqual(2, len(from_dir))
+        self.assertEqual(from_dir, list(expand_paths([str(DOC_DIR / "*.doc")])))
+        self.assertEqual(["missing.doc"], list(expand_paths(["missing.doc"])))
+
+    def test_directory_suffix_match_ignores_case(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("a.doc", "B.DOC", "nested/c.Doc", "notes.txt"):
+                (Path(tmp) / name).parent.mkdir(exist_ok=True)
+                (Path(tmp) / name).write_bytes(b"")
+            found = [Path(path).relative_to(tmp).as_posix() for path in expand_paths([tmp])]
+            self.assertEqual(["B.DOC", "a.doc", "nested/c.Doc"], found)
+
+
+class ExtractBatchTest(unittest.TestCase):
+    def test_errors_are_recorded_per_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            bogus = Path(tmp) / "bogus.doc"
+            bogus.write_bytes(b"not a compound file" * 64)
+            paths = [str(DOC_DIR / "hnw14-vdw79.doc"), str(bogus), str(Path(tmp) / "gone.doc")]
+            for jobs in (1, 2):
+                stats = BatchStats()
+                results = {r.path: r for r in extract_batch(paths, jobs=jobs, chunk_size=1, stats=stats)}
+                self.assertEqual(set(paths), set(results))
+                self.assertIn("my test file for python", results[paths[0]].text)
+                self.assertEqual("DocFormatError", results[paths[1]].error_type)
+                self.assertEqual("FileNotFoundError", results[paths[2]].error_type)
+                self.assertEqual((3, 2), (stats.files, stats.failed))
+                self.assertGreater(stats.input_bytes, 0)
+
+    @unittest.skipUnless(hasattr(signal, "setitimer"), "needs POSIX interval timers")
+    def test_deadline_interrupts_slow_work(self) -> None:
+        with self.assertRaises(ExtractionTimeout):
+            with _deadline(0.05):
+                time.sleep(2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from zddoc.cache import ExtractionCache
+from zddoc.reader import DocReader
+from zddoc.testing import build_doc, sample_text
+
+DOC_PATH = Path(__file__).resolve().parents[1] / "test_doc" / "hnw14-vdw79.doc"
+
+
+class ExtractionCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.cache = ExtractionCache(self.root / "cache")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_hit_skips_parsing(self) -> None:
+        data = DOC_PATH.read_bytes()
+        with DocReader(data, cache=self.cache) as reader:
+            expected = reader.read_text()
+        with DocReader(data, cache=self.cache) as reader:
+            self.assertEqual(expected, reader.read_text())
+            self.assertIsNone(reader._cfbf_reader)
+        with DocReader(io.BytesIO(data), cache=self.cache) as reader:
+            self.assertEqual(expected, reader.read_text())
+            self.assertIsNone(reader._cfbf_reader)
+
+    def test_path_key_tracks_modification(self) -> None:
+        path = self.root / "doc.doc"
+        path.write_bytes(DOC_PATH.read_bytes())
+        key = self.cache.key_for(path)
+        self.assertEqual(key, self.cache.key_for(str(path)))
+        os.utime(path, ns=(0, 10**9))
+        self.assertNotEqual(key, self.cache.key_for(path))
+
+    def test_corrupt_entry_is_a_miss(self) -> None:
+        self.cache.put("ab" * 20, "text")
+        self.cache._entry_path("ab" * 20).write_bytes(b"not zlib")
+        self.assertIsNone(self.cache.get("ab" * 20))
+        self.assertFalse(self.cache._entry_path("ab" * 20).exists())
+
+    def test_hit_survives_failed_access_time_update(self) -> None:
+        self.cache.put("ab" * 20, "text")
+        with mock.patch("os.utime", side_effect=PermissionError("read-only file system")):
+            self.assertEqual("text", self.cache.get("ab" * 20))
+        self.assertTrue(self.cache._entry_path("ab" * 20).exists())
+
+    def test_least_recently_used_entries_are_evicted(self) -> None:
+        cache = ExtractionCache(self.root / "small", max_bytes=6500, level=0)
+        keys = [f"{index:02d}" * 20 for index in range(6)]
+        for age, key in enumerate(keys):
+            cache.put(key, sample_text(1000, seed=age))
+            os.utime(cache._entry_path(key), (age, age))
+        os.utime(cache._entry_path(keys[0]), (100, 100))  # recently read
+        cache.put("ff" * 20, sample_text(1000, seed=99))
+        self.assertLessEqual(cache._scan_size(), 6500)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+
+    def test_synthetic_content_keys_differ(self) -> None:
+        first = build_doc(sample_text(100, seed=1))
+        second = build_doc(sample_text(100, seed=2))
+        self.assertNotEqual(self.cache.key_for(first), self.cache.key_for(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,15 +3,17 @@ import struct
 import unittest
 from pathlib import Path
 
-from zddoc.cfbf import DocFormatError
+from zddoc.cfbf import FAT_CACHE_PAGES, CFBFReader, DocFormatError, StreamView, _iter_sector_runs, _sector_runs
 from zddoc.fib import (
     FC_CLX_OFFSET,
     FIB_MIN_SIZE,
     LCB_CLX_OFFSET,
     WordFIB,
 )
-from zddoc.piece_table import PieceTable
+from zddoc.piece_table import PieceSegment, PieceTable, coalesce_segments
 from zddoc.reader import DocReader
+from zddoc.stats import ExtractionStats
+from zddoc.testing import build_doc
 
 
 def _build_fib_bytes(*, which_tbl: bool = False, encrypted: bool = False) -> bytes:
@@ -24,6 +26,97 @@ def _build_fib_bytes(*, which_tbl: bool = False, encrypted: bool = False) -> byt
     return bytes(data)
 
 
+class _NonSeekable(io.RawIOBase):
+    def __init__(self, data: bytes) -> None:
+        self._buffer = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        return self._buffer.readinto(buffer)
+
+
+class CFBFReaderTest(unittest.TestCase):
+    def test_sector_runs_coalesce_consecutive_sectors(self) -> None:
+        self.assertEqual([(3, 3), (9, 1), (4, 2)], _sector_runs([3, 4, 5, 9, 4, 5]))
+        self.assertEqual([], _sector_runs([]))
+
+    def test_backends_return_identical_streams(self) -> None:
+        base_dir = Path(__file__).resolve().parents[1]
+        doc_path = base_dir / "test_doc" / "a15a2-6pwn0.doc"
+        data = doc_path.read_bytes()
+        sources = [doc_path, data, io.BytesIO(data), _NonSeekable(data)]
+        streams = []
+        for source in sources:
+            with CFBFReader(source) as cfbf:
+                streams.append(
+                    (cfbf.open_stream("WordDocument").getvalue(), cfbf.open_stream("1Table").getvalue())
+                )
+        self.assertEqual(1, len(set(streams)))
+        self.assertEqual(192384, len(streams[0][0]))
+
+    def test_lazy_stream_matches_eager_stream(self) -> None:
+        base_dir = Path(__file__).resolve().parents[1]
+        # hnw14's table stream lives in the mini stream, a15a2's in the regular FAT.
+        for name, stream_name in (("hnw14-vdw79.doc", "1Table"), ("a15a2-6pwn0.doc", "WordDocument")):
+            with CFBFReader(base_dir / "test_doc" / name) as cfbf:
+                expected = cfbf.open_stream(stream_name).getvalue()
+                view = cfbf.open_stream(stream_name, lazy=True)
+                self.assertEqual(len(expected), view.size)
+                view.seek(100)
+                self.assertEqual(expected[100:1100], view.read(1000))
+                view.seek(-5, io.SEEK_END)
+                self.assertEqual(expected[-5:], view.read())
+                view.seek(0)
+                self.assertEqual(expected, view.read())
+
+    def test_growing_runs_are_capped(self) -> None:
+        self.assertEqual([(0, 1), (1, 2), (3, 4), (7, 8), (15, 5)], list(_iter_sector_runs(range(20), 8)))
+        self.assertEqual([(3, 1), (4, 2), (9, 1), (4, 1)], list(_iter_sector_runs([3, 4, 5, 9, 4], 8)))
+
+    def test_fat_pages_are_loaded_on_demand(self) -> None:
+        data = build_doc("small\r" * 10, min_fat_sectors=FAT_CACHE_PAGES * 3, extra_streams={"Big": b"x" * 40_000})
+        stats = ExtractionStats()
+        with CFBFReader(data, stats=stats) as cfbf:
+            self.assertEqual(FAT_CACHE_PAGES * 3, len(cfbf._fat_sectors))
+            opened = stats.counters["sectors_read"]
+            self.assertLess(opened, 10)
+            view = cfbf.open_stream("Big", lazy=True)
+            self.assertEqual(b"x" * 100, view.read(100))
+            self.assertLessEqual(stats.counters["sectors_read"] - opened, 2)
+            self.assertEqual(b"x" * 40_000, cfbf.open_stream("Big").getvalue())
+            for sector in range(len(cfbf._fat)):
+                cfbf._fat[sector]
+            self.assertEqual(FAT_CACHE_PAGES, len(cfbf._fat._pages))
+
+    def test_version_4_sectors_and_mini_stream(self) -> None:
+        data = build_doc("tiny\r", sector_size=4096, min_stream_size=0, extra_streams={"Big": bytes(range(256)) * 40})
+        with CFBFReader(data) as cfbf:
+            self.assertEqual((4, 4096), (cfbf.major_version, cfbf.sector_size))
+            self.assertEqual(bytes(range(256)) * 40, cfbf.open_stream("Big").getvalue())
+            table = cfbf.open_stream("1Table", lazy=True)
+            self.assertEqual(table.read(), cfbf.open_stream("1Table").getvalue())
+        with DocReader(data) as reader:
+            self.assertEqual("tiny\n", reader.read_text())
+
+    def test_version_3_stream_size_high_bits_are_ignored(self) -> None:
+        data = bytearray(build_doc("hello\r"))
+        with CFBFReader(bytes(data)) as cfbf:
+            dir_offset = cfbf._sector_offset(cfbf._dir_start_sector)
+            size = cfbf._entries["WordDocument"].stream_size
+        for offset in range(dir_offset, dir_offset + 512, 128):
+            if data[offset : offset + 24] == "WordDocument".encode("utf-16le"):
+                struct.pack_into("<I", data, offset + 0x7C, 0xDEAD)
+        with CFBFReader(bytes(data)) as cfbf:
+            self.assertEqual(size, cfbf._entries["WordDocument"].stream_size)
+
+    def test_short_chain_truncates_lazy_stream(self) -> None:
+        view = StreamView(lambda offset, target: target.__setitem__(slice(None), b"a" * len(target)), [(0, 10)], 50)
+        self.assertEqual(b"a" * 10, view.read())
+        self.assertEqual(10, view.size)
+
+
 class WordFIBTest(unittest.TestCase):
     def test_table_stream_selection(self) -> None:
         fib = WordFIB.from_bytes(_build_fib_bytes(which_tbl=True))
@@ -39,6 +132,19 @@ class WordFIBTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             WordFIB.from_bytes(b"short")
 
+    def test_story_ranges(self) -> None:
+        data = bytearray(_build_fib_bytes())
+        for offset, count in ((0x4C, 10), (0x50, 4), (0x5C, 3), (0x64, 2)):
+            struct.pack_into("<i", data, offset, count)
+        fib = WordFIB.from_bytes(bytes(data))
+        self.assertEqual((10, 4, 0, 3), (fib.ccpText, fib.ccpFtn, fib.ccpHdd, fib.ccpAtn))
+        ranges = fib.story_ranges()
+        self.assertEqual((0, 10), ranges["main"])
+        self.assertEqual((10, 14), ranges["footnotes"])
+        self.assertEqual((14, 14), ranges["headers"])
+        self.assertEqual((14, 17), ranges["comments"])
+        self.assertEqual((17, 19), ranges["textboxes"])
+
 
 class PieceTableTest(unittest.TestCase):
     def test_simple_segment(self) -> None:
@@ -56,6 +162,70 @@ class PieceTableTest(unittest.TestCase):
         self.assertEqual(0x40, segment.offset)
         self.assertEqual(3 * 2, segment.byte_length)
 
+    def test_from_stream_reads_only_clx(self) -> None:
+        pcd = struct.pack("<H I H", 0, 0x40000080, 0)
+        plc = struct.pack("<2I", 0, 5) + pcd
+        clx = b"\x02" + struct.pack("<I", len(plc)) + plc
+        table = io.BytesIO(b"\xff" * 64 + clx)
+        segments = list(PieceTable.from_stream(table, 64, len(clx)).segments())
+        self.assertEqual(0x40, segments[0].offset)
+        self.assertEqual("cp1252", segments[0].encoding)
+        with self.assertRaises(ValueError):
+            PieceTable.from_stream(table, 64, len(clx) + 1)
+
+    def test_segments_in_range_clips_pieces(self) -> None:
+        cp_values = (0, 4, 10, 12)
+        pcds = (
+            struct.pack("<H I H", 0, 0x40000000 | 0x200, 0)
+            + struct.pack("<H I H", 0, 0x400, 0)
+            + struct.pack("<H I H", 0, 0x40000000 | 0x600, 0)
+        )
+        plc = struct.pack("<4I", *cp_values) + pcds
+        clx = b"\x02" + struct.pack("<I", len(plc)) + plc
+        piece_table = PieceTable(clx, 0, len(clx))
+        self.assertEqual(12, piece_table.char_count)
+        clipped = list(piece_table.segments_in_range(2, 11))
+        self.assertEqual([(2, 4), (4, 10), (10, 11)], [(seg.cp_start, seg.cp_end) for seg in clipped])
+        self.assertEqual((0x100 + 2, 2), (clipped[0].offset, clipped[0].byte_length))
+        self.assertEqual((0x400, 12), (clipped[1].offset, clipped[1].byte_length))
+        self.assertEqual((0x300, 1), (clipped[2].offset, clipped[2].byte_length))
+        clipped = list(piece_table.segments_in_range(5, 7))
+        self.assertEqual([(0x400 + 2, 4)], [(seg.offset, seg.byte_length) for seg in clipped])
+        self.assertEqual([], list(piece_table.segments_in_range(12, 20)))
+
+    def test_columns_skip_empty_pieces_and_support_cp_lookup(self) -> None:
+        cp_values = [0, 4, 4, 10] + [10 + index for index in range(1, 17)]
+        tail = [(0x40000000 | 0x1000 + 2 * index) if index % 3 else 0x2000 for index in range(16)]
+        fcs = [0x40000000 | 0x200, 0x800, 0x400] + tail
+        pcds = b"".join(struct.pack("<H I H", 0, fc, 0) for fc in fcs)
+        plc = struct.pack(f"<{len(cp_values)}I", *cp_values) + pcds
+        clx = b"\x02" + struct.pack("<I", len(plc)) + plc
+        piece_table = PieceTable(clx, 0, len(clx))
+        self.assertEqual(18, len(piece_table))
+        self.assertEqual(26, piece_table.char_count)
+        self.assertEqual([True, False, False, True, True], [piece_table.is_compressed(index) for index in range(5)])
+        self.assertEqual(PieceSegment(4, 10, 0x400, "utf-16le", 12), piece_table.segment(1))
+        self.assertEqual(PieceSegment(12, 13, 0x802, "cp1252", 1), piece_table.segment(4))
+        self.assertEqual(list(piece_table.segments())[4], piece_table.segment(4))
+        self.assertEqual((0, 1, 1, 4), tuple(piece_table.piece_index(cp) for cp in (3, 4, 9, 12)))
+        for cp in (-1, 26):
+            with self.assertRaises(IndexError):
+                piece_table.piece_index(cp)
+
+    def test_coalesce_merges_only_file_contiguous_pieces(self) -> None:
+        segments = [
+            PieceSegment(0, 3, 100, "cp1252", 3),
+            PieceSegment(3, 5, 103, "cp1252", 2),
+            PieceSegment(5, 6, 105, "utf-16le", 2),
+            PieceSegment(6, 8, 108, "utf-16le", 4),
+            PieceSegment(8, 9, 112, "utf-16le", 2),
+        ]
+        merged = list(coalesce_segments(segments))
+        self.assertEqual(
+            [(0, 5, 100, 5), (5, 6, 105, 2), (6, 9, 108, 6)],
+            [(seg.cp_start, seg.cp_end, seg.offset, seg.byte_length) for seg in merged],
+        )
+
     def test_missing_clx(self) -> None:
         table = bytearray(b"\x00" * 16)
         with self.assertRaises(ValueError):
@@ -67,6 +237,14 @@ class DocReaderTest(unittest.TestCase):
         with self.assertRaises(DocFormatError):
             DocReader(b"invalid")
 
+    def test_normalize_chunks_joins_crlf_across_boundaries(self) -> None:
+        raw = ["ab\r", "\ncd\r", "\r\n", "\x13x\x15\x07\r"]
+        expected = DocReader._normalize("".join(raw))
+        for chunk_chars in (1, 3, 100):
+            chunks = list(DocReader._normalize_chunks(iter(raw), chunk_chars))
+            self.assertEqual(expected, "".join(chunks))
+        self.assertEqual("ab\ncd\n\nx\t\n", expected)
+
 
 class DocReaderIntegrationTest(unittest.TestCase):
     def test_reads_sample_doc(self) -> None:
@@ -76,6 +254,43 @@ class DocReaderIntegrationTest(unittest.TestCase):
             text = reader.read_text()
         self.assertIn("my test file for python", text)
 
+    def test_iter_text_and_write_text_match_read_text(self) -> None:
+        base_dir = Path(__file__).resolve().parents[1]
+        for name in ("hnw14-vdw79.doc", "a15a2-6pwn0.doc"):
+            with DocReader(base_dir / "test_doc" / name) as reader:
+                text = reader.read_text()
+                for chunk_chars in (1, 5, 4096):
+                    self.assertEqual(text, "".join(reader.iter_text(chunk_chars=chunk_chars)))
+                sink = io.BytesIO()
+                written = reader.write_text(sink, encoding="utf-8", chunk_chars=16)
+            self.assertEqual(len(text), written)
+            self.assertEqual(text, sink.getvalue().decode("utf-8"))
+
+    def test_read_range(self) -> None:
+        base_dir = Path(__file__).resolve().parents[1]
+        with DocReader(base_dir / "test_doc" / "a15a2-6pwn0.doc") as reader:
+            self.assertEqual(149, reader.char_count())
+            self.assertEqual("my test file", reader.read_range(2, 14))
+            self.assertEqual(reader.read_text(), reader.read_range(0))
+            self.assertEqual("", reader.read_range(14, 14))
+            with self.assertRaises(ValueError):
+                reader.read_range(-1, 5)
+
+    def test_read_story(self) -> None:
+        text = "Body text.\rNote one\rHeader\rA comment\r"
+        counts = {"ccpText": 11, "ccpFtn": 9, "ccpHdd": 7, "ccpAtn": 10}
+        with DocReader(build_doc(text, pieces=3, story_counts=counts)) as reader:
+            self.assertEqual("Body text.\n", reader.read_story("main"))
+            self.assertEqual("Note one\n", reader.read_story("footnotes"))
+            self.assertEqual("", reader.read_story("endnotes"))
+            self.assertEqual(
+                [("main", "Body text.\n"), ("comments", "A comment\n")],
+                list(reader.iter_stories(["main", "comments"])),
+            )
+            self.assertEqual(["main", "footnotes", "headers", "comments"], [name for name, _ in reader.iter_stories()])
+            with self.assertRaises(ValueError):
+                reader.read_story("body")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+from zddoc.fields import Field, FieldScanner
+from zddoc.reader import DocReader
+from zddoc.testing import build_doc
+
+HYPERLINK = '\x13 HYPERLINK "https://example.com/a b" \\o "tip" \x14Example\x15'
+TOC_ENTRY = '\x13 HYPERLINK \\l "_Toc1" \x14Intro\t\x13 PAGEREF _Toc1 \\h \x143\x15\x15\r'
+TEXT = (
+    "See "
+    + HYPERLINK
+    + " now.\r"
+    + "\x13 TOC \\o \"1-3\" \x14"
+    + TOC_ENTRY
+    + "\x15"
+    + "Page \x13 PAGE \x147\x15 of \x13 IF \x13 NUMPAGES \x142\x15 > 1 \"many\" \x14many\x15.\r"
+    + "\x13 XE \"index entry\" \x15Done\r"
+)
+DISPLAYED = "See Example now.\rIntro\t3\rPage 7 of many.\rDone\r"
+
+
+class FieldScannerTest(unittest.TestCase):
+    def test_keeps_only_results(self) -> None:
+        self.assertEqual(DISPLAYED, FieldScanner().feed(TEXT))
+
+    def test_any_chunking_gives_the_same_output(self) -> None:
+        for size in (1, 2, 7, 30):
+            scanner = FieldScanner()
+            chunks = [scanner.feed(TEXT[index : index + size]) for index in range(0, len(TEXT), size)]
+            self.assertEqual(DISPLAYED, "".join(chunks))
+            self.assertEqual(len(TEXT), scanner.position)
+
+    def test_stray_markers_are_dropped(self) -> None:
+        self.assertEqual("ab c", FieldScanner().feed("a\x14b\x15 c"))
+
+    def test_collects_nested_records(self) -> None:
+        scanner = FieldScanner(collect=True)
+        scanner.feed(TEXT)
+        records = sorted(scanner.fields, key=lambda record: record.cp_start)
+        self.assertEqual(
+            ["HYPERLINK", "TOC", "HYPERLINK", "PAGEREF", "PAGE", "IF", "NUMPAGES", "XE"],
+            [record.code for record in records],
+        )
+        link = records[0]
+        self.assertEqual((4, 4 + len(HYPERLINK)), (link.cp_start, link.cp_end))
+        self.assertEqual("Example", link.result)
+        self.assertEqual("https://example.com/a b", link.target)
+        self.assertEqual("#_Toc1", records[2].target)
+        self.assertEqual((1, 2), (records[2].depth, records[3].depth))
+        self.assertEqual("Intro\t3", records[2].result)
+        self.assertEqual("Intro\t3\r", records[1].result)
+        self.assertEqual('IF 2 > 1 "many"', records[5].instruction)
+        self.assertEqual("", records[7].result)
+        self.assertIsNone(records[1].target)
+
+    def test_target_without_url(self) -> None:
+        self.assertIsNone(Field(0, 1, "HYPERLINK", "", 0).target)
+
+    def test_deeply_nested_fields(self) -> None:
+        depth = 5_000
+        text = "\x13 A \x14" * depth + "x" + "\x15" * depth
+        scanner = FieldScanner()
+        self.assertEqual("x", "".join(scanner.feed(text[index : index + 4096]) for index in range(0, len(text), 4096)))
+
+
+class DocReaderFieldTest(unittest.TestCase):
+    def test_reader_drops_field_codes(self) -> None:
+        data = build_doc(TEXT, pieces=5, unicode_ratio=0.5)
+        with DocReader(data) as reader:
+            self.assertEqual(DocReader._normalize(DISPLAYED), reader.read_text())
+            self.assertEqual(DocReader._normalize(DISPLAYED), "".join(reader.iter_text(chunk_chars=3)))
+            links = reader.hyperlinks()
+            self.assertEqual(["https://example.com/a b", "#_Toc1"], [link.target for link in links])
+            self.assertEqual("Intro\t3", links[1].result)
+            toc = [record for record in reader.fields() if record.code == "TOC"][0]
+            self.assertEqual("Intro\t3\n", toc.result)
+        with DocReader(data, keep_field_codes=True) as reader:
+            self.assertIn('HYPERLINK "https://example.com/a b"', reader.read_text())
+
+    def test_cps_count_surrogate_pairs_and_undecodable_bytes(self) -> None:
+        # The first piece is UTF-16 (it holds an emoji), the second cp1252 with the undefined byte 0x81.
+        text = "\U0001F600" + "a" * 80 + " q~q " + HYPERLINK + "\r"
+        data = build_doc(text, pieces=2).replace(b"q~q", b"q\x81q")
+        with DocReader(data) as reader:
+            (link,) = reader.fields()
+            self.assertEqual((87, 87 + len(HYPERLINK)), (link.cp_start, link.cp_end))
+            self.assertEqual("Example", reader.read_range(link.cp_start, link.cp_end))
+
+
+if __name__ == "__main__":
+    unittest.main()
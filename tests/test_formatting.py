@@ -0,0 +1,120 @@
+import struct
+import unittest
+from pathlib import Path
+
+from zddoc.formatting import (
+    DEFAULT_CHARACTER_STYLE,
+    FKP_CACHE_PAGES,
+    SPRM_C_F_BOLD,
+    SPRM_C_ISTD,
+    RunProperties,
+    iter_sprms,
+    run_properties,
+)
+from zddoc.reader import DocReader
+from zddoc.testing import build_doc, sample_text
+
+DOC_DIR = Path(__file__).resolve().parents[1] / "test_doc"
+TEXT = "Heading\rSome bold and italic text, \x13 PAGE \x147\x15 pages.\rCell\x07Last paragraph\r"
+BOLD = RunProperties(bold=True)
+ITALIC = RunProperties(italic=True, style_index=30)
+
+
+class SprmTest(unittest.TestCase):
+    def test_operand_sizes(self) -> None:
+        grpprl = (
+            struct.pack("<HB", SPRM_C_F_BOLD, 0x81)
+            + struct.pack("<HBBB", 0xC601, 2, 7, 8)  # variable length
+            + struct.pack("<HH", SPRM_C_ISTD, 42)
+            + struct.pack("<HI", 0x6C02, 1)
+            + b"\x35"  # truncated sprm is ignored
+        )
+        sprms = list(iter_sprms(grpprl))
+        self.assertEqual([SPRM_C_F_BOLD, 0xC601, SPRM_C_ISTD, 0x6C02], [sprm for sprm, _ in sprms])
+        self.assertEqual(b"\x02\x07\x08", sprms[1][1])
+        self.assertEqual(RunProperties(bold=True, style_index=42), run_properties(grpprl))
+        self.assertEqual(RunProperties(), run_properties(struct.pack("<HB", SPRM_C_F_BOLD, 0x80)))
+
+
+class ParagraphTest(unittest.TestCase):
+    def _doc(self, **options) -> bytes:
+        runs = [(0, 7, RunProperties(style_index=12)), (13, 17, BOLD), (22, 28, ITALIC)]
+        return build_doc(TEXT, runs=runs, paragraph_styles=[1, 0, 0, 2], **options)
+
+    def test_paragraphs_runs_and_styles(self) -> None:
+        for options in ({}, dict(pieces=9, unicode_ratio=0.5), dict(pieces=9, shuffle_pieces=True)):
+            with self.subTest(**options), DocReader(self._doc(**options)) as reader:
+                paragraphs = list(reader.iter_paragraphs())
+                self.assertEqual(
+                    ["Heading", "Some bold and italic text, 7 pages.", "Cell", "Last paragraph"],
+                    [paragraph.text for paragraph in paragraphs],
+                )
+                self.assertEqual([1, 0, 0, 2], [paragraph.style_index for paragraph in paragraphs])
+                self.assertEqual([(0, 8), (8, 53), (53, 58), (58, 73)], [(p.cp_start, p.cp_end) for p in paragraphs])
+                self.assertEqual(12, paragraphs[0].runs[0].style_index)
+                runs = [(run.text, run.bold, run.italic, run.style_index) for run in paragraphs[1].runs]
+                self.assertEqual(
+                    [
+                        ("Some ", False, False, DEFAULT_CHARACTER_STYLE),
+                        ("bold", True, False, DEFAULT_CHARACTER_STYLE),
+                        (" and ", False, False, DEFAULT_CHARACTER_STYLE),
+                        ("italic", False, True, 30),
+                        (" text, 7 pages.", False, False, DEFAULT_CHARACTER_STYLE),
+                    ],
+                    runs,
+                )
+                self.assertEqual((13, 17), (paragraphs[1].runs[1].cp_start, paragraphs[1].runs[1].cp_end))
+
+    def test_story_and_documents_without_bin_tables(self) -> None:
+        text = "Body\rMore\rNote\r"
+        data = build_doc(text, story_counts={"ccpText": 10, "ccpFtn": 5}, runs=[(10, 14, BOLD)])
+        with DocReader(data) as reader:
+            notes = list(reader.iter_paragraphs("footnotes"))
+            self.assertEqual(["Note"], [paragraph.text for paragraph in notes])
+            self.assertTrue(notes[0].runs[0].bold)
+            with self.assertRaises(ValueError):
+                reader.iter_paragraphs("appendix")
+        with DocReader(build_doc(text)) as reader:
+            paragraphs = list(reader.iter_paragraphs())
+            self.assertEqual(["Body", "More", "Note"], [paragraph.text for paragraph in paragraphs])
+            styles = {(paragraph.style_index, paragraph.runs[0].style_index) for paragraph in paragraphs}
+            self.assertEqual({(0, DEFAULT_CHARACTER_STYLE)}, styles)
+
+    def test_undecodable_bytes_keep_their_cp(self) -> None:
+        data = build_doc("aq~q\rnext\r", runs=[(6, 8, BOLD)]).replace(b"q~q", b"q\x81q")
+        with DocReader(data) as reader:
+            paragraphs = list(reader.iter_paragraphs())
+        self.assertEqual([(0, 5), (5, 10)], [(paragraph.cp_start, paragraph.cp_end) for paragraph in paragraphs])
+        self.assertEqual(["aqq", "next"], [paragraph.text for paragraph in paragraphs])
+        self.assertEqual((6, 8), (paragraphs[1].runs[1].cp_start, paragraphs[1].runs[1].cp_end))
+
+    def test_paragraph_text_matches_read_text(self) -> None:
+        data = build_doc("abc~def\rq\x13 PAGE \x14~1\x15 end\r", runs=[(2, 5, BOLD)]).replace(b"~", b"\x81")
+        with DocReader(data) as reader:
+            paragraphs = list(reader.iter_paragraphs())
+            self.assertEqual("abcdef\nq1 end\n", reader.read_text())
+            self.assertEqual(reader.read_text(), "".join(paragraph.text + "\n" for paragraph in paragraphs))
+        self.assertEqual(["ab", "cd", "ef"], [run.text for run in paragraphs[0].runs])
+
+    def test_fkp_pages_are_loaded_lazily(self) -> None:
+        text = sample_text(60_000, seed=2)
+        runs = [(cp, cp + 3, BOLD) for cp in range(0, len(text), 10)]
+        with DocReader(build_doc(text, pieces=20, runs=runs)) as reader:
+            paragraphs = reader.iter_paragraphs()
+            next(paragraphs)
+            characters, _ = reader._formatting
+            self.assertGreater(len(characters), FKP_CACHE_PAGES)
+            self.assertLessEqual(len(characters._pages), 2)
+            bold = sum(len(run.text) for paragraph in paragraphs for run in paragraph.runs if run.bold)
+            self.assertGreater(bold, 10_000)
+            self.assertEqual(FKP_CACHE_PAGES, len(characters._pages))
+
+    def test_fixture(self) -> None:
+        with DocReader(DOC_DIR / "hnw14-vdw79.doc") as reader:
+            paragraphs = list(reader.iter_paragraphs())
+        self.assertEqual(["my test file for python"], [paragraph.text for paragraph in paragraphs])
+        self.assertEqual((0, 24), (paragraphs[0].cp_start, paragraphs[0].cp_end))
+
+
+if __name__ == "__main__":
+    unittest.main()
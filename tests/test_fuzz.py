@@ -0,0 +1,131 @@
+import os
+import struct
+import time
+import tracemalloc
+import unittest
+from pathlib import Path
+
+from zddoc.extract import RECORDED_ERRORS
+from zddoc.cfbf import CFBFReader, DocFormatError
+from zddoc.fib import FIB_MIN_SIZE, WordFIB
+from zddoc.formatting import RunProperties
+from zddoc.limits import LimitExceededError, Limits
+from zddoc.piece_table import PieceTable
+from zddoc.probe import probe
+from zddoc.reader import DocReader
+from zddoc.testing import build_doc, hostile_docs, mutations, sample_text
+
+DOC_DIR = Path(__file__).resolve().parents[1] / "test_doc"
+# Raise for longer local runs, e.g. ZDDOC_FUZZ_ITERATIONS=20000.
+ITERATIONS = int(os.environ.get("ZDDOC_FUZZ_ITERATIONS", "150"))
+# Per-document budgets; generous against CI noise, far below what a loop or a runaway allocation costs.
+MAX_SECONDS = 2.0
+MAX_PEAK_BYTES = 32 * 1024 * 1024
+# Work and memory are proportional to the limits, so tight ones keep the run quick.
+FUZZ_LIMITS = Limits(max_stream_bytes=4 * 1024 * 1024, max_pieces=100_000, max_output_chars=4 * 1024 * 1024)
+
+
+def _exercise(data: bytes) -> None:
+    """Run every parser over ``data``; only the recorded error types may escape."""
+    probe(data)
+    try:
+        with CFBFReader(data, limits=FUZZ_LIMITS) as cfbf:
+            for name in list(cfbf._entries):
+                cfbf.open_stream(name).getvalue()
+                cfbf.open_stream(name, lazy=True).read()
+            word = cfbf.open_stream("WordDocument", lazy=True)
+            fib = WordFIB.from_bytes(word.read(FIB_MIN_SIZE))
+            table_stream = cfbf.open_stream(fib.table_stream_name, lazy=True)
+            PieceTable.from_stream(table_stream, fib.fcClx, fib.lcbClx, FUZZ_LIMITS)
+    except RECORDED_ERRORS:
+        pass
+    try:
+        with DocReader(data, limits=FUZZ_LIMITS) as reader:
+            reader.read_text()
+            reader.fields()
+            for _ in reader.iter_paragraphs():
+                pass
+            for _ in reader.search(["lorem", "\u20ac"]):
+                pass
+            reader.metadata()
+    except RECORDED_ERRORS:
+        pass
+
+
+class FuzzTest(unittest.TestCase):
+    def assertBounded(self, name: str, data: bytes) -> None:
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            _exercise(data)
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        seconds = time.perf_counter() - started
+        self.assertLess(seconds, MAX_SECONDS, name)
+        self.assertLess(peak, MAX_PEAK_BYTES, name)
+
+    def test_hostile_documents_fail_fast(self) -> None:
+        expected = {
+            "fat cycle": DocFormatError,
+            "directory self loop": DocFormatError,
+            "mini FAT cycle": DocFormatError,
+            "DIFAT cycle": DocFormatError,
+            "huge lcbClx": ValueError,
+            "overlapping pieces": LimitExceededError,
+        }
+        for name, data in hostile_docs().items():
+            with self.subTest(name):
+                self.assertBounded(name, data)
+                if name in expected:
+                    with self.assertRaises(expected[name]):
+                        with DocReader(data, limits=FUZZ_LIMITS) as reader:
+                            reader.read_text()
+
+    def test_huge_stream_size_is_clamped(self) -> None:
+        data = hostile_docs()["huge stream size"]
+        with CFBFReader(data) as cfbf:
+            self.assertLessEqual(cfbf.open_stream("WordDocument", lazy=True).size, len(data))
+        with self.assertRaises(LimitExceededError) as caught:
+            CFBFReader(data, limits=Limits(max_stream_bytes=4096)).open_stream("WordDocument")
+        self.assertEqual("max_stream_bytes", caught.exception.limit)
+
+    def test_piece_and_output_limits(self) -> None:
+        data = build_doc(sample_text(20_000), pieces=50)
+        with DocReader(data, limits=Limits(max_pieces=10)) as reader:
+            with self.assertRaises(LimitExceededError):
+                reader.read_text()
+        with DocReader(data, limits=Limits(max_output_chars=1000)) as reader:
+            with self.assertRaises(LimitExceededError):
+                reader.read_text()
+            self.assertEqual(500, len(reader.read_range(0, 500)))
+
+    def test_word_fib_and_piece_table_reject_garbage(self) -> None:
+        for size in (0, 2, FIB_MIN_SIZE - 1):
+            with self.assertRaises(ValueError):
+                WordFIB.from_bytes((b"\xec\xa5" + b"\xff" * FIB_MIN_SIZE)[:size])
+        plc = struct.pack("<2I", 0, 0xFFFFFFFF) + struct.pack("<HIH", 0, 0x7FFFFFFF, 0)
+        clx = b"\x02" + struct.pack("<I", len(plc)) + plc
+        table = PieceTable(clx, 0, len(clx))
+        self.assertEqual(0xFFFFFFFF, table.char_count)
+        with self.assertRaises(ValueError):
+            PieceTable(clx, 0, 0x7FFFFFFF)
+
+    def test_random_mutations_are_bounded(self) -> None:
+        seeds = {
+            "synthetic": build_doc(sample_text(6000, seed=3), pieces=40, unicode_ratio=0.3, scatter_sectors=True),
+            "mini stream": build_doc(sample_text(500, seed=4), pieces=5, min_stream_size=0),
+            "v4": build_doc(sample_text(3000, seed=5), sector_size=4096, min_stream_size=0),
+            "fixture": (DOC_DIR / "hnw14-vdw79.doc").read_bytes(),
+            "formatted": build_doc(
+                sample_text(4000, seed=6), pieces=8, runs=[(0, 900, RunProperties(bold=True))], paragraph_styles=[1, 2]
+            ),
+        }
+        for seed, (name, data) in enumerate(seeds.items()):
+            for index, mutated in enumerate(mutations(data, ITERATIONS // len(seeds), seed=seed)):
+                with self.subTest(f"{name} #{index}"):
+                    self.assertBounded(name, mutated)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import unittest
+
+from zddoc.incremental import ChangedRange, ExtractionSnapshot
+from zddoc.reader import DocReader
+from zddoc.stats import ExtractionStats
+from zddoc.testing import build_doc, fast_save, sample_text
+
+TEXT = sample_text(200_000, seed=4)
+
+
+class IncrementalTest(unittest.TestCase):
+    def _extract(self, data: bytes, previous=None, sample: bool = False, **options):
+        with DocReader(data, **options) as reader:
+            return reader.extract_incremental(previous, sample), reader.read_text()
+
+    def test_first_extraction_decodes_everything(self) -> None:
+        data = build_doc(TEXT, pieces=12, unicode_ratio=0.4)
+        result, text = self._extract(data)
+        self.assertEqual(text, result.text)
+        self.assertEqual([ChangedRange(0, len(TEXT), 0, 0)], result.changes)
+        self.assertEqual((len(TEXT), 0), (result.decoded_chars, result.reused_chars))
+        with DocReader(data) as reader:
+            word_stream, piece_table = reader._load()
+            self.assertEqual(piece_table.fingerprints(word_stream), result.snapshot.pieces)
+
+    def test_fast_saved_edits_decode_only_new_pieces(self) -> None:
+        base = build_doc(TEXT, pieces=12, unicode_ratio=0.4)
+        first, _ = self._extract(base)
+        edits = [(1000, 1010, "replacement"), (50_000, 50_000, "inserted 中\r"), (150_000, 160_000, "")]
+        edited = fast_save(base, edits)
+        stats = ExtractionStats()
+        second, text = self._extract(edited, first.snapshot, stats=stats)
+        self.assertEqual(text, second.text)
+        self.assertEqual(
+            [
+                ChangedRange(1000, 1011, 1000, 1010),
+                ChangedRange(50_000, 50_011, 49_999, 49_999),
+                ChangedRange(150_000, 150_000, 149_988, 159_988),
+            ],
+            second.changes,
+        )
+        self.assertEqual(11 + 11, second.decoded_chars)
+        self.assertEqual(stats.counters["reused_chars"], second.reused_chars)
+        with DocReader(edited) as reader:
+            self.assertEqual("inserted 中\n", reader.read_range(50_000, 50_011))
+
+        # The snapshot survives JSON and feeds the next version.
+        snapshot = ExtractionSnapshot.from_dict(json.loads(json.dumps(second.snapshot.to_dict())))
+        third, text = self._extract(fast_save(edited, [(0, 5, "")]), snapshot)
+        self.assertEqual(text, third.text)
+        self.assertEqual([ChangedRange(0, 0, 0, 5)], third.changes)
+        self.assertEqual(0, third.decoded_chars)
+
+    def test_changed_bytes_are_never_reused(self) -> None:
+        first, _ = self._extract(build_doc(TEXT, pieces=12))
+        # Same layout, different text: every old piece fails its digest check.
+        other = TEXT.replace("lorem", "LOREM")
+        result, text = self._extract(build_doc(other, pieces=12), first.snapshot)
+        self.assertEqual(text, result.text)
+        self.assertEqual(len(other), result.decoded_chars)
+        self.assertEqual([ChangedRange(0, len(other), 0, len(TEXT))], result.changes)
+        # Sampling the ends of each piece still catches a snapshot of another document.
+        unrelated = sample_text(len(TEXT), seed=5)
+        result, text = self._extract(build_doc(unrelated, pieces=12), first.snapshot, sample=True)
+        self.assertEqual(text, result.text)
+        self.assertEqual(len(unrelated), result.decoded_chars)
+
+    def test_same_length_edit_inside_a_piece_is_found(self) -> None:
+        base = build_doc(TEXT, pieces=12, shuffle_pieces=True)
+        first, _ = self._extract(base)
+        middle = TEXT.index(" ", 100_000) + 1
+        word = TEXT[middle : TEXT.index(" ", middle)]
+        # The same layout with one word overwritten: every piece keeps its offset and length.
+        edited = build_doc(TEXT[:middle] + "#" * len(word) + TEXT[middle + len(word) :], pieces=12, shuffle_pieces=True)
+        result, text = self._extract(edited, first.snapshot)
+        self.assertIn("#" * len(word), text)
+        self.assertEqual(text, result.text)
+        self.assertEqual(1, len(result.changes))
+        self.assertLessEqual(result.changes[0].cp_start, middle)
+        self.assertGreaterEqual(result.changes[0].cp_end, middle + len(word))
+        self.assertLess(result.decoded_chars, len(TEXT) // 6)
+
+    def test_reused_pieces_are_not_read_again(self) -> None:
+        base = build_doc(TEXT + "\x13 PAGE \x14" + TEXT[:1000] + "\x15\r", pieces=3, shuffle_pieces=True)
+        first, _ = self._extract(base)
+        self.assertEqual([True, True, False], first.snapshot.plain)
+        # An unterminated field begins inside the reused text: what follows it is hidden.
+        edited = fast_save(base, [(10, 10, "\x13 XE \x14"), (150_000, 150_010, "\rnew\r")])
+        reads = []
+        with DocReader(edited) as reader:
+            word_stream, _ = reader._load()
+            read = word_stream.read
+            word_stream.read = lambda size=-1: reads.append(size) or read(size)
+            result = reader.extract_incremental(first.snapshot, sample=True)
+            word_stream.read = read
+            self.assertEqual(reader.read_text(), result.text)
+        # Two small samples per reused old piece, then the inserted text.
+        self.assertLess(sum(reads), 1000)
+        self.assertEqual(b"", result.snapshot.pieces[0].digest)
+        # Pieces cut from old ones while sampling have no digest and are decoded again by default.
+        again, _ = self._extract(edited, result.snapshot)
+        unread = sum(piece.cp_end - piece.cp_start for piece in result.snapshot.pieces if not piece.digest)
+        self.assertEqual(unread, again.decoded_chars)
+        self.assertGreater(again.reused_chars, 60_000)
+
+    def test_text_that_does_not_index_by_cp_is_decoded_again(self) -> None:
+        text = "emoji \U0001F600 here\rand \x81 undefined\r" * 50
+        base = build_doc(text, pieces=3, unicode_ratio=0.5, seed=2)
+        first, _ = self._extract(base)
+        result, text_read = self._extract(fast_save(base, [(10, 12, "x")]), first.snapshot)
+        # CPs 10-12 are "er" of the first "here": the emoji before them is two CPs.
+        self.assertEqual(("emoji \U0001F600 hxe\r" + text[13:]).replace("\r", "\n"), result.text)
+        self.assertEqual(text_read, result.text)
+        self.assertEqual(1, result.decoded_chars)
+
+    def test_snapshot_version_is_checked(self) -> None:
+        with self.assertRaises(ValueError):
+            ExtractionSnapshot.from_dict({"version": 99, "pieces": [], "texts": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
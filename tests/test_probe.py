@@ -0,0 +1,58 @@
+import io
+import unittest
+from pathlib import Path
+
+import zddoc
+from zddoc.testing import build_doc, sample_text
+
+DOC_DIR = Path(__file__).resolve().parents[1] / "test_doc"
+
+
+class _CountingReads(io.BytesIO):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.reads = 0
+
+    def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        return super().read(size)
+
+
+class ProbeTest(unittest.TestCase):
+    def test_probes_fixtures(self) -> None:
+        result = zddoc.probe(DOC_DIR / "a15a2-6pwn0.doc")
+        self.assertTrue(result.valid and result.supported)
+        self.assertFalse(result.is_encrypted)
+        self.assertEqual((0xC1, "1Table", 149), (result.nFib, result.table_stream_name, result.text_chars))
+        # WordDocument of this file lives in the mini stream.
+        self.assertEqual(24, zddoc.probe(DOC_DIR / "hnw14-vdw79.doc").text_chars)
+
+    def test_reports_encryption_and_old_versions(self) -> None:
+        encrypted = zddoc.probe(build_doc("secret", encrypted=True))
+        self.assertTrue(encrypted.valid and encrypted.is_encrypted)
+        self.assertFalse(encrypted.supported)
+        word95 = zddoc.probe(build_doc("old", nfib=0x68))
+        self.assertTrue(word95.valid)
+        self.assertFalse(word95.supported)
+
+    def test_rejects_invalid_input_without_raising(self) -> None:
+        self.assertFalse(zddoc.probe(b"PK\x03\x04" + b"\x00" * 600).valid)
+        self.assertFalse(zddoc.probe(b"\xd0\xcf").valid)
+        no_word = zddoc.testing.build_compound_file({"Other": b"x" * 5000})
+        result = zddoc.probe(no_word)
+        self.assertFalse(result.valid)
+        self.assertIn("WordDocument", result.reason)
+
+    def test_reads_a_few_sectors_of_a_large_file(self) -> None:
+        text = sample_text(2_000_000, seed=3)
+        data = build_doc(text, min_fat_sectors=150, scatter_sectors=True)
+        source = _CountingReads(data)
+        result = zddoc.probe(source)
+        self.assertEqual(len(text), result.text_chars)
+        self.assertLess(source.reads, 10)
+        for options in (dict(sector_size=4096), dict(min_stream_size=0)):
+            self.assertEqual(5, zddoc.probe(build_doc("hello", **options)).text_chars)
+
+
+if __name__ == "__main__":
+    unittest.main()
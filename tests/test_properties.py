@@ -0,0 +1,104 @@
+import struct
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import zddoc
+from zddoc.cfbf import DocFormatError
+from zddoc.properties import (
+    SUMMARY_INFORMATION,
+    VT_FILETIME,
+    VT_I2,
+    VT_I4,
+    VT_LPSTR,
+    VT_LPWSTR,
+    parse_property_set,
+)
+from zddoc.reader import DocReader
+from zddoc.testing import build_compound_file
+
+DOC_DIR = Path(__file__).resolve().parents[1] / "test_doc"
+
+
+def _property_set(properties) -> bytes:
+    """Serialize ``[(pid, vtype, payload_bytes)]`` as a one-section property-set stream."""
+    values = bytearray()
+    index = bytearray()
+    header_size = 8 + 8 * len(properties)
+    for pid, vtype, payload in properties:
+        index += struct.pack("<II", pid, header_size + len(values))
+        values += struct.pack("<HH", vtype, 0) + payload
+        values += b"\x00" * (-len(values) % 4)
+    section = struct.pack("<II", header_size + len(values), len(properties)) + index + values
+    header = struct.pack("<HHI16sI", 0xFFFE, 0, 0x00020006, b"\x00" * 16, 1)
+    return header + b"\xe0\x85\x9f\xf2\xf9\x4f\x68\x10\xab\x91\x08\x00\x2b\x27\xb3\xd9" + struct.pack("<I", 48) + section
+
+
+class PropertySetTest(unittest.TestCase):
+    def test_parses_strings_counts_and_dates(self) -> None:
+        created = datetime(2020, 5, 17, 8, 30, tzinfo=timezone.utc)
+        ticks = (created - datetime(1601, 1, 1, tzinfo=timezone.utc)) // timedelta(microseconds=1) * 10
+        title = "Grüße".encode("cp1252") + b"\x00"
+        author = "Ada".encode("utf-16le") + b"\x00\x00"
+        data = _property_set(
+            [
+                (0x01, VT_I2, struct.pack("<h", 1252)),
+                (0x02, VT_LPSTR, struct.pack("<I", len(title)) + title),
+                (0x04, VT_LPWSTR, struct.pack("<I", 4) + author),
+                (0x0A, VT_FILETIME, struct.pack("<Q", 600_000_000)),
+                (0x0C, VT_FILETIME, struct.pack("<Q", ticks)),
+                (0x0E, VT_I4, struct.pack("<i", 3)),
+            ]
+        )
+        values = parse_property_set(data, durations=frozenset({0x0A}))
+        self.assertEqual("Grüße", values[0x02])
+        self.assertEqual("Ada", values[0x04])
+        self.assertEqual(timedelta(seconds=60), values[0x0A])
+        self.assertEqual(created, values[0x0C])
+        self.assertEqual(3, values[0x0E])
+
+    def test_rejects_malformed_streams(self) -> None:
+        with self.assertRaises(DocFormatError):
+            parse_property_set(b"\x00" * 64)
+        with self.assertRaises(DocFormatError):
+            parse_property_set(_property_set([(0x02, VT_I4, b"\x01\x00\x00\x00")])[:60])
+
+    def test_corrupt_values_are_skipped(self) -> None:
+        title = b"Report\x00"
+        data = _property_set(
+            [
+                (0x01, VT_LPSTR, struct.pack("<I", 5) + b"1252\x00"),
+                (0x02, VT_LPSTR, struct.pack("<I", len(title)) + title),
+                (0x0C, VT_FILETIME, struct.pack("<Q", 0xFFFF_FFFF_FFFF_FFFF)),
+            ]
+        )
+        self.assertEqual({0x02: "Report", 0x0C: None}, parse_property_set(data))
+
+    def test_metadata_does_not_need_word_document(self) -> None:
+        title = b"Report\x00"
+        stream = _property_set([(0x02, VT_LPSTR, struct.pack("<I", len(title)) + title)])
+        data = build_compound_file({SUMMARY_INFORMATION: stream})
+        metadata = zddoc.read_metadata(data)
+        self.assertEqual("Report", metadata.title)
+        self.assertIsNone(metadata.company)
+        self.assertEqual({"title": "Report"}, metadata.to_dict())
+
+
+class DocReaderMetadataTest(unittest.TestCase):
+    def test_reads_fixture_metadata(self) -> None:
+        with DocReader(DOC_DIR / "a15a2-6pwn0.doc") as reader:
+            metadata = reader.metadata()
+        self.assertEqual("Normal", metadata.template)
+        self.assertEqual("Microsoft Office Word", metadata.application)
+        self.assertEqual("Aspose", metadata.author)
+        self.assertEqual(datetime(2011, 3, 4, 12, 56, tzinfo=timezone.utc), metadata.created)
+        self.assertEqual(1, metadata.paragraph_count)
+
+    def test_utf8_codepage(self) -> None:
+        metadata = zddoc.read_metadata(DOC_DIR / "hnw14-vdw79.doc")
+        self.assertEqual("0", metadata.revision)
+        self.assertIsNone(metadata.title)
+
+
+if __name__ == "__main__":
+    unittest.main()
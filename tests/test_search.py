@@ -0,0 +1,120 @@
+import contextlib
+import io
+import re
+import unittest
+from pathlib import Path
+
+from zddoc import cli
+from zddoc.reader import DocReader, normalize_text
+from zddoc.search import Match, Searcher
+from zddoc.stats import ExtractionStats
+from zddoc.testing import build_doc, sample_text
+
+DOC_DIR = Path(__file__).resolve().parents[1] / "test_doc"
+
+
+def _spans(matches):
+    return [(match.cp_start, match.cp_end, match.text) for match in matches]
+
+
+class SearcherTest(unittest.TestCase):
+    def _feed(self, searcher: Searcher, blocks) -> list:
+        matches = []
+        cp = 0
+        for block in blocks:
+            if isinstance(block, bytes):
+                matches += searcher.feed(cp, raw=block)
+                cp += len(block)
+            else:
+                matches += searcher.feed(cp, text=block)
+                cp += len(block.encode("utf-16le")) // 2
+        return matches + searcher.finish()
+
+    def test_matches_span_blocks_and_come_out_in_cp_order(self) -> None:
+        searcher = Searcher(["needle", "dle h"])
+        blocks = [b"a ne", "e", b"dle hay ", "needl", b"e"]
+        self.assertEqual(
+            [(2, 8, "needle"), (5, 10, "dle h"), (13, 19, "needle")], _spans(self._feed(searcher, blocks))
+        )
+
+    def test_bytes_search_and_case_folding(self) -> None:
+        searcher = Searcher(["CAFÉ", "Tea"], ignore_case=True)
+        self.assertEqual([True, False], [pattern.encoded is None for pattern in searcher._patterns])
+        blocks = ["café ".encode("cp1252"), b"TEA", " CafÉ"]
+        self.assertEqual([(0, 4, "café"), (5, 8, "TEA"), (9, 13, "CafÉ")], _spans(self._feed(searcher, blocks)))
+
+    def test_regex_matches_grow_across_blocks(self) -> None:
+        searcher = Searcher([re.compile(r"\d+")])
+        blocks = [b"a 12", "3", b"45 b 6"]
+        self.assertEqual([(2, 7, "12345"), (10, 11, "6")], _spans(self._feed(searcher, blocks)))
+
+    def test_surrogate_pairs_count_as_two_cps(self) -> None:
+        searcher = Searcher(["x"])
+        matches = self._feed(searcher, ["x", "\U0001F600", "yx", "\U0001F600x"])
+        self.assertEqual([(0, 1), (4, 5), (7, 8)], [(match.cp_start, match.cp_end) for match in matches])
+
+    def test_max_count_and_gaps(self) -> None:
+        searcher = Searcher(["ab"], max_count=1)
+        self.assertEqual([Match("ab", 0, 2, "ab")], searcher.feed(0, raw=b"ab ab") + searcher.feed(5, raw=b"ab"))
+        self.assertTrue(searcher.done)
+        self.assertEqual([], searcher.feed(7, raw=b"ab") + searcher.finish())
+        searcher = Searcher(["ab"])
+        self.assertEqual([], self._feed(searcher, []))
+        self.assertEqual([], searcher.feed(0, raw=b"xa") + searcher.feed(10, raw=b"bx") + searcher.finish())
+        with self.assertRaises(ValueError):
+            Searcher([])
+        with self.assertRaises(TypeError):
+            Searcher([re.compile(b"x")])
+
+
+class DocSearchTest(unittest.TestCase):
+    def test_matches_agree_with_decoded_text(self) -> None:
+        text = sample_text(40_000, seed=8).replace("table", "tablé") + " final words\r"
+        patterns = ["lorem ipsum", "tablé", re.compile(r"doc\w+")]
+        for options in ({}, dict(pieces=400), dict(pieces=400, unicode_ratio=0.5, shuffle_pieces=True)):
+            with self.subTest(**options), DocReader(build_doc(text, **options)) as reader:
+                matches = list(reader.search(patterns))
+                regexes = [re.compile(re.escape(pattern)) for pattern in patterns[:2]] + [patterns[2]]
+                expected = sorted(
+                    (match.start(), match.end(), index)
+                    for index, regex in enumerate(regexes)
+                    for match in regex.finditer(text)
+                )
+                self.assertEqual([span[:2] for span in expected], [(m.cp_start, m.cp_end) for m in matches])
+                self.assertEqual("tablé", reader.read_range(matches[1].cp_start, matches[1].cp_end))
+                self.assertEqual(
+                    [Match("final", 40_001, 40_006, "final")], list(reader.search(["final"], story="main"))
+                )
+
+    def test_normalize_text_maps_raw_matches(self) -> None:
+        with DocReader(build_doc("one\r\ntwo\x13 PAGE \x143\x15\x07\r")) as reader:
+            match = next(reader.search([re.compile("one.+\x07", re.DOTALL)]))
+        self.assertEqual("one\r\ntwo\x13 PAGE \x143\x15\x07", match.text)
+        self.assertEqual("one\ntwo PAGE 3\t", normalize_text(match.text))
+
+    def test_early_exit_reads_little(self) -> None:
+        text = "needle " + sample_text(2_000_000, seed=9)
+        stats = ExtractionStats()
+        with DocReader(build_doc(text, pieces=50), stats=stats) as reader:
+            self.assertEqual(Match("NEEDLE", 0, 6, "needle"), next(reader.search("NEEDLE", ignore_case=True)))
+            self.assertLess(stats.counters["compressed_chars"], 200_000)
+            self.assertEqual(3, len(list(reader.search(["lorem"], max_count=3))))
+
+    def test_fixture_and_grep(self) -> None:
+        with DocReader(DOC_DIR / "hnw14-vdw79.doc") as reader:
+            self.assertEqual([Match("python", 17, 23, "python")], list(reader.search("python")))
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(0, cli.grep_main(["-i", "PYTHON", str(DOC_DIR / "hnw14-vdw79.doc")]))
+            self.assertEqual(1, cli.grep_main(["-q", "absent", str(DOC_DIR)]))
+            self.assertEqual(0, cli.grep_main(["-c", "-E", "-e", r"te?st", str(DOC_DIR / "hnw14-vdw79.doc")]))
+        self.assertEqual(
+            [f"{DOC_DIR / 'hnw14-vdw79.doc'}:17:python", f"{DOC_DIR / 'hnw14-vdw79.doc'}:1"],
+            out.getvalue().splitlines(),
+        )
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(2, cli.grep_main(["python", str(DOC_DIR / "missing.doc")]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from zddoc import cli
+from zddoc.reader import DocReader
+from zddoc.client import _call, request_extract, wait_ready
+from zddoc.server import ExtractionServer
+from zddoc.testing import build_doc
+
+DOC_DIR = Path(__file__).resolve().parents[1] / "test_doc"
+SAMPLE = DOC_DIR / "hnw14-vdw79.doc"
+
+
+class ServerTest(unittest.TestCase):
+    def _start(self, address, **options) -> ExtractionServer:
+        server = ExtractionServer(address, jobs=1, **options)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.close)
+        self.addCleanup(thread.join)
+        self.addCleanup(server.shutdown)
+        self.assertTrue(wait_ready(server.address))
+        return server
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.tmp = Path(self._tmp.name)
+
+    def test_unix_socket_paths_uploads_and_errors(self) -> None:
+        server = self._start(f"unix:{self.tmp / 'zddoc.sock'}")
+        status, ready = _call(server.address, "GET", "/ready", None, {}, 5.0)
+        self.assertEqual((200, True, 1), (status, ready["ready"], ready["workers"]))
+
+        record = request_extract(server.address, path=SAMPLE, metadata=True)
+        self.assertTrue(record["ok"])
+        self.assertIn("my test file for python", record["text"])
+        self.assertIn("revision", record["metadata"])
+
+        data = build_doc("Body\rNote\r", story_counts={"ccpText": 5, "ccpFtn": 5})
+        record = request_extract(server.address, data=data, stories=["footnotes"])
+        self.assertEqual(("<upload>", "Note\n"), (record["path"], record["text"]))
+
+        broken = request_extract(server.address, data=b"not a compound file" * 40)
+        self.assertEqual("DocFormatError", broken["error_type"])
+        missing = request_extract(server.address, path=self.tmp / "missing.doc")
+        self.assertEqual("FileNotFoundError", missing["error_type"])
+
+    def test_limits_and_bad_requests(self) -> None:
+        server = self._start(("127.0.0.1", 0), max_requests=1, max_upload_bytes=1024)
+        headers = {"Content-Type": "application/json"}
+        status, _ = _call(server.address, "POST", "/extract", b'{"nope": 1}', headers, 5.0)
+        self.assertEqual(400, status)
+        self.assertEqual(404, _call(server.address, "GET", "/missing", None, {}, 5.0)[0])
+        status, record = _call(server.address, "POST", "/extract", b"x", {"Content-Length": "-1"}, 5.0)
+        self.assertEqual((400, False), (status, record["ok"]))
+        # A value handle_request does not expect fails in the worker; the client still gets JSON.
+        body = json.dumps({"path": str(SAMPLE), "stories": [["main"]]}).encode()
+        status, record = _call(server.address, "POST", "/extract", body, headers, 5.0)
+        self.assertEqual((500, "TypeError"), (status, record["error_type"]))
+        with self.assertRaisesRegex(ConnectionError, "413"):
+            request_extract(server.address, data=b"x" * 2048)
+        server.slots.acquire()
+        try:
+            with self.assertRaisesRegex(ConnectionError, "503"):
+                request_extract(server.address, path=SAMPLE)
+        finally:
+            server.slots.release()
+        self.assertTrue(request_extract(server.address, path=SAMPLE)["ok"])
+
+    def test_cli_client(self) -> None:
+        server = self._start(f"unix:{self.tmp / 'cli.sock'}")
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            cli.main(["--server", server.address, str(SAMPLE)])
+        with DocReader(SAMPLE) as reader:
+            self.assertEqual(reader.read_text() + "\n", out.getvalue())
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            cli.main(["--server", server.address, str(self.tmp / "missing.doc")])
+
+    def test_client_does_not_import_the_server(self) -> None:
+        code = (
+            "import sys, zddoc.cli, zddoc.client; "
+            "print(sorted({'http.server', 'concurrent.futures.process', 'tarfile'} & set(sys.modules)))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=DOC_DIR.parent
+        )
+        self.assertEqual("[]", output.stdout.strip())
+
+
+if __name__ == "__main__":
+    unittest.main()
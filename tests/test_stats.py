@@ -0,0 +1,50 @@
+import io
+import unittest
+
+from zddoc.reader import DocReader
+from zddoc.stats import ExtractionStats, StatsHook
+from zddoc.testing import build_doc, sample_text
+
+
+class _RecordingHook(StatsHook):
+    def __init__(self) -> None:
+        self.stages = []
+        self.closed = None
+
+    def on_stage(self, name: str, seconds: float) -> None:
+        self.stages.append(name)
+
+    def on_close(self, stats: ExtractionStats) -> None:
+        self.closed = stats
+
+
+class ExtractionStatsTest(unittest.TestCase):
+    def test_reader_records_stages_and_counters(self) -> None:
+        text = sample_text(20_000, seed=2)
+        data = build_doc(text, pieces=40, unicode_ratio=0.5, shuffle_pieces=True)
+        hook = _RecordingHook()
+        stats = ExtractionStats(hooks=[hook])
+        with DocReader(io.BytesIO(data), stats=stats) as reader:
+            self.assertIs(stats, reader.stats)
+            reader.read_text()
+        for stage in ("open", "build_fat", "read_directory", "fib", "piece_table", "decode", "normalize"):
+            self.assertIn(stage, stats.stages)
+            self.assertIn(stage, hook.stages)
+        counters = stats.counters
+        self.assertEqual(40, counters["pieces"])
+        self.assertEqual(len(text), counters["compressed_chars"] + counters["unicode_chars"])
+        self.assertGreater(counters["seeks"], 0)
+        self.assertGreater(counters["sectors_read"], 0)
+        self.assertGreaterEqual(counters["bytes_copied"], len(text))
+        self.assertIs(stats, hook.closed)
+
+    def test_memory_mapped_sources_issue_no_seeks(self) -> None:
+        stats = ExtractionStats()
+        with DocReader(build_doc(sample_text(5_000)), stats=stats) as reader:
+            reader.read_text()
+        self.assertEqual(0, stats.counters["seeks"])
+        self.assertIsNone(DocReader(build_doc("x\r")).stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from zddoc.cfbf import CFBFReader
+from zddoc.reader import DocReader
+from zddoc.testing import build_doc, sample_text, split_text
+
+TEXT = sample_text(12_000, seed=7) + "\rnon-cp1252 Ω ☃ text\r"
+
+
+class SyntheticDocTest(unittest.TestCase):
+    def assertRoundTrip(self, data: bytes) -> None:
+        with DocReader(data) as reader:
+            self.assertEqual(DocReader._normalize(TEXT), reader.read_text())
+            self.assertEqual(len(TEXT), reader.char_count())
+
+    def test_split_text(self) -> None:
+        self.assertEqual(["a", "bc", "de"], split_text("abcde", 3))
+        self.assertEqual("abcde", "".join(split_text("abcde", 10)))
+
+    def test_traits_round_trip(self) -> None:
+        variants = {
+            "default": {},
+            "fragmented": dict(pieces=300, unicode_ratio=0.5, shuffle_pieces=True),
+            "unicode": dict(unicode_ratio=1.0),
+            "mini stream": dict(min_stream_size=0),
+            "scattered sectors": dict(scatter_sectors=True),
+            "v4 sectors": dict(sector_size=4096),
+            "difat": dict(min_fat_sectors=130),
+        }
+        for name, options in variants.items():
+            with self.subTest(name):
+                self.assertRoundTrip(build_doc(TEXT, **options))
+
+    def test_characters_outside_the_bmp_take_two_cps(self) -> None:
+        for ratio in (0.0, 1.0):
+            data = build_doc("a\U0001F600b\r", unicode_ratio=ratio)
+            with self.subTest(unicode_ratio=ratio), DocReader(data) as reader:
+                self.assertEqual("a\U0001F600b\n", reader.read_text())
+                self.assertEqual(5, reader.char_count())
+
+    def test_difat_and_mini_stream_are_exercised(self) -> None:
+        with CFBFReader(build_doc(TEXT, min_fat_sectors=130)) as cfbf:
+            self.assertEqual(130, len(cfbf._fat_sectors))
+            self.assertEqual(1, cfbf._difat_sectors)
+        with CFBFReader(build_doc("tiny\r", min_stream_size=0)) as cfbf:
+            self.assertLess(cfbf._entries["1Table"].stream_size, cfbf.mini_stream_cutoff)
+            self.assertIsNotNone(cfbf._mini_stream)
+
+
+if __name__ == "__main__":
+    unittest.main()
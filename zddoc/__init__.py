@@ -1,8 +1,23 @@
 """zddoc: pure-Python reader for Word 97-2003 binary documents."""
 
-from .reader import DocReader
+from .reader import DocReader, normalize_text, read_metadata
 from .cfbf import CFBFReader
 from .fib import WordFIB
+from .limits import LimitExceededError, Limits
 from .piece_table import PieceTable
+from .probe import ProbeResult, probe
+from .properties import DocumentMetadata
 
-__all__ = ["DocReader", "CFBFReader", "WordFIB", "PieceTable"]
+__all__ = [
+    "DocReader",
+    "CFBFReader",
+    "WordFIB",
+    "PieceTable",
+    "Limits",
+    "LimitExceededError",
+    "DocumentMetadata",
+    "read_metadata",
+    "normalize_text",
+    "ProbeResult",
+    "probe",
+]
@@ -0,0 +1,257 @@
+"""asyncio front-end that runs extraction on an executor instead of the event loop."""
+
+import asyncio
+import inspect
+import os
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Optional, Tuple, Union
+
+from .extract import RECORDED_ERRORS
+from .reader import DocReader
+
+DEFAULT_SPILL_THRESHOLD = 16 * 1024 * 1024
+_READ_SIZE = 1024 * 1024
+
+
+@dataclass
+class ExtractionResult:
+    index: int
+    text: Optional[str] = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _is_async_source(source: Any) -> bool:
+    read = getattr(source, "read", None)
+    return hasattr(source, "__aiter__") or (read is not None and inspect.iscoroutinefunction(read))
+
+
+async def _iter_async_chunks(source: Any) -> AsyncIterator[bytes]:
+    if hasattr(source, "__aiter__"):
+        async for chunk in source:
+            yield chunk
+        return
+    while True:
+        chunk = await source.read(_READ_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _materialize(source: Any, spill_threshold: int) -> Tuple[Any, Optional[str]]:
+    """Turn an async byte source into ``bytes`` or, past ``spill_threshold``, a spill file.
+
+    Returns the source to hand to :class:`DocReader` and the spill file path to
+    delete afterwards.  Paths, bytes and synchronous file objects pass through.
+    """
+    if not _is_async_source(source):
+        return source, None
+    loop = asyncio.get_running_loop()
+    buffer = bytearray()
+    spill = None
+    try:
+        async for chunk in _iter_async_chunks(source):
+            if spill is not None:
+                await loop.run_in_executor(None, spill.write, chunk)
+                continue
+            buffer += chunk
+            if len(buffer) > spill_threshold:
+                spill = tempfile.NamedTemporaryFile(prefix="zddoc-", suffix=".doc", delete=False)
+                await loop.run_in_executor(None, spill.write, bytes(buffer))
+                buffer = bytearray()
+    except BaseException:
+        if spill is not None:
+            spill.close()
+            os.unlink(spill.name)
+        raise
+    if spill is None:
+        return bytes(buffer), None
+    spill.close()
+    # A path (not the open handle) so that process pools can receive it too.
+    return spill.name, spill.name
+
+
+def _read_text(source: Union[str, Path, bytes]) -> str:
+    with DocReader(source) as reader:
+        return reader.read_text()
+
+
+def _call(source: Union[str, Path, bytes], method: str, *args: Any) -> Any:
+    """Open ``source`` in the worker and call one reader method, for executors that cannot share a reader."""
+    with DocReader(source) as reader:
+        return getattr(reader, method)(*args)
+
+
+class AsyncDocReader:
+    """Async wrapper around :class:`DocReader`.
+
+    Parsing and decoding run on ``executor`` (the loop's default thread pool
+    when omitted), so awaiting them never blocks the event loop::
+
+        async with AsyncDocReader(source) as reader:
+            text = await reader.read_text()
+
+    ``source`` may also be an async byte source: an object with a coroutine
+    ``read(n)`` method or an async iterable of ``bytes``.
+
+    A reader holds an mmap and cannot be sent between processes, so with a
+    ``ProcessPoolExecutor`` every call opens the source again in the worker;
+    the source must then be a path, ``bytes`` or an async byte source.
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        executor: Optional[Executor] = None,
+        spill_threshold: int = DEFAULT_SPILL_THRESHOLD,
+    ):
+        self._source = source
+        self._executor = executor
+        self._spill_threshold = spill_threshold
+        self._spill_path: Optional[str] = None
+        self._reader: Optional[DocReader] = None
+        # What process workers open on every call, in place of a shared reader.
+        self._worker_source: Optional[Union[str, Path, bytes]] = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def open(self) -> "AsyncDocReader":
+        if self._reader is None and self._worker_source is None:
+            source, self._spill_path = await _materialize(self._source, self._spill_threshold)
+            if not isinstance(self._executor, ProcessPoolExecutor):
+                self._reader = await self._run(DocReader, source)
+            elif isinstance(source, (str, bytes, os.PathLike)):
+                # Parse once so that a malformed source fails here, as it does with threads.
+                await self._run(_call, source, "close")
+                self._worker_source = source
+            else:
+                raise TypeError("process executors need a path, bytes or async byte source")
+        return self
+
+    async def _call(self, method: str, *args: Any) -> Any:
+        await self.open()
+        if self._reader is None:
+            return await self._run(_call, self._worker_source, method, *args)
+        return await self._run(getattr(self._reader, method), *args)
+
+    async def read_text(self) -> str:
+        return await self._call("read_text")
+
+    async def read_range(self, cp_start: int, cp_end: Optional[int] = None) -> str:
+        return await self._call("read_range", cp_start, cp_end)
+
+    async def char_count(self) -> int:
+        return await self._call("char_count")
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            await self._run(self._reader.close)
+            self._reader = None
+        self._worker_source = None
+        if self._spill_path is not None:
+            os.unlink(self._spill_path)
+            self._spill_path = None
+
+    async def __aenter__(self) -> "AsyncDocReader":
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+
+async def _iter_sources(sources: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(sources, "__aiter__"):
+        async for source in sources:
+            yield source
+    else:
+        for source in sources:
+            yield source
+
+
+async def extract_many(
+    sources: Union[Iterable[Any], AsyncIterable[Any]],
+    concurrency: int = 8,
+    executor: Optional[Executor] = None,
+    spill_threshold: int = DEFAULT_SPILL_THRESHOLD,
+) -> AsyncIterator[ExtractionResult]:
+    """Extract ``sources`` concurrently and yield results as they complete.
+
+    At most ``concurrency`` documents are in flight, and finished results wait
+    in a queue of the same size, so a slow consumer pauses the producer
+    instead of buffering unbounded text.  Without ``executor`` a thread pool of
+    ``concurrency`` workers is used; a ``ProcessPoolExecutor`` also works for
+    path and bytes sources (async sources are buffered or spilled first).
+    Failures to read a document are reported on the result's ``error``
+    fields; other exceptions, such as a ``TypeError`` for a source that is
+    not a document, are raised by the iteration.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be positive")
+    loop = asyncio.get_running_loop()
+    owned = executor is None
+    if owned:
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="zddoc")
+    slots = asyncio.Semaphore(concurrency)
+    results: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=concurrency)
+    done = object()
+    tasks = set()
+
+    async def extract(index: int, source: Any) -> None:
+        result = ExtractionResult(index)
+        spill_path = None
+        try:
+            try:
+                source, spill_path = await _materialize(source, spill_threshold)
+                result.text = await loop.run_in_executor(executor, _read_text, source)
+            except RECORDED_ERRORS as exc:
+                result.error = str(exc) or exc.__class__.__name__
+                result.error_type = exc.__class__.__name__
+            finally:
+                if spill_path is not None:
+                    os.unlink(spill_path)
+            await results.put(result)
+        except Exception as exc:
+            # Not a document failure (an unsupported source, a broken executor): the consumer re-raises it.
+            await results.put(exc)
+        finally:
+            slots.release()
+
+    async def produce() -> None:
+        try:
+            index = 0
+            async for source in _iter_sources(sources):
+                await slots.acquire()
+                task = asyncio.ensure_future(extract(index, source))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                index += 1
+            if tasks:
+                await asyncio.gather(*tasks)
+        except Exception as exc:
+            await results.put(exc)
+            return
+        await results.put(done)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item = await results.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for task in (producer, *tasks):
+            task.cancel()
+        await asyncio.gather(producer, *tasks, return_exceptions=True)
+        if owned:
+            executor.shutdown(wait=False)
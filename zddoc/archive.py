@@ -0,0 +1,330 @@
+"""Extraction of .doc members straight out of zip and tar archives.
+
+Members are parsed from memory, or from a bounded spooled buffer when they
+are larger than ``spool_threshold``, so archives never have to be unpacked
+to disk first.  A member is addressed as ``"<archive>!<member name>"``.
+"""
+
+import fnmatch
+import os
+import posixpath
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .cache import ExtractionCache
+from .extract import RECORDED_ERRORS, BatchResult, extract_file, extract_source
+
+try:
+    from lzma import LZMAError
+except ImportError:  # pragma: no cover - Python built without lzma
+    LZMAError = zlib.error
+
+MEMBER_SEPARATOR = "!"
+DEFAULT_SPOOL_THRESHOLD = 64 * 1024 * 1024
+# Tar variants that can only be read front to back; their members are
+# extracted in one sequential pass instead of being opened one by one.
+COMPRESSED_TAR_SUFFIXES = (".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ARCHIVE_SUFFIXES = (".zip", ".tar") + COMPRESSED_TAR_SUFFIXES
+# Archives an :class:`OpenArchives` keeps open at once.
+MAX_OPEN_ARCHIVES = 4
+
+# Corrupt, encrypted or unsupported archives and members.
+ARCHIVE_ERRORS = (
+    zipfile.BadZipFile,
+    tarfile.TarError,
+    zlib.error,
+    LZMAError,
+    EOFError,
+    RuntimeError,
+    NotImplementedError,
+)
+
+Source = Union[bytes, BinaryIO]
+
+
+def is_archive(path: Union[str, Path]) -> bool:
+    """True when ``path`` names a zip or tar archive (judged by its suffix)."""
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def is_sequential(path: Union[str, Path]) -> bool:
+    """True for compressed tar archives, which have no random access."""
+    return str(path).lower().endswith(COMPRESSED_TAR_SUFFIXES)
+
+
+def member_path(archive: Union[str, Path], name: str) -> str:
+    return f"{archive}{MEMBER_SEPARATOR}{name}"
+
+
+def split_member_path(item: str) -> Optional[Tuple[str, str]]:
+    """Split ``"<archive>!<member>"`` into its parts, or return ``None`` for plain paths."""
+    archive, separator, name = item.partition(MEMBER_SEPARATOR)
+    while separator:
+        if is_archive(archive) and Path(archive).is_file():
+            return archive, name
+        head, separator, name = name.partition(MEMBER_SEPARATOR)
+        archive = archive + MEMBER_SEPARATOR + head
+    return None
+
+
+def _matches(name: str, pattern: str) -> bool:
+    return fnmatch.fnmatch(posixpath.basename(name).lower(), pattern.lower())
+
+
+def list_members(archive: Union[str, Path], pattern: str = "*.doc") -> Iterator[str]:
+    """Yield the names of the regular-file members matching ``pattern`` (case-insensitive)."""
+    if str(archive).lower().endswith(".zip"):
+        with zipfile.ZipFile(archive) as handle:
+            for info in handle.infolist():
+                if not info.is_dir() and _matches(info.filename, pattern):
+                    yield info.filename
+        return
+    with tarfile.open(archive) as handle:
+        for info in handle:
+            if info.isfile() and _matches(info.name, pattern):
+                yield info.name
+
+
+def _spool(fileobj: BinaryIO, size: int, spool_threshold: int) -> Source:
+    """Return the member as bytes, or as a spooled file when it is too large."""
+    if size <= spool_threshold:
+        return fileobj.read()
+    spooled = tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+    shutil.copyfileobj(fileobj, spooled, 1024 * 1024)
+    spooled.seek(0)
+    return spooled
+
+
+class ArchiveMembers:
+    """A zip or uncompressed tar archive opened once, from which members are read by name.
+
+    The zip central directory or the tar headers are read once, so reading
+    many members costs one pass over the index rather than one per member.
+    """
+
+    def __init__(self, archive: Union[str, Path]):
+        self.archive = str(archive)
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        self._tar_index: Optional[Dict[str, tarfile.TarInfo]] = None
+        if self.archive.lower().endswith(".zip"):
+            self._zip = zipfile.ZipFile(archive)
+        else:
+            self._tar = tarfile.open(archive)
+
+    def open(self, name: str, spool_threshold: int = DEFAULT_SPOOL_THRESHOLD) -> Source:
+        """Read member ``name``; raises ``KeyError`` when there is none."""
+        if self._zip is not None:
+            info = self._zip.getinfo(name)
+            with self._zip.open(info) as member:
+                return _spool(member, info.file_size, spool_threshold)
+        if self._tar_index is None:
+            # TarFile.getmember searches its member list linearly on every call.
+            self._tar_index = {info.name: info for info in self._tar.getmembers()}
+        info = self._tar_index.get(name.rstrip("/"))
+        if info is None:
+            raise KeyError(f"filename {name!r} not found")
+        member = self._tar.extractfile(info)
+        if member is None:
+            raise ValueError(f"{name!r} is not a regular file")
+        with member:
+            return _spool(member, info.size, spool_threshold)
+
+    def close(self) -> None:
+        for handle in (self._zip, self._tar):
+            if handle is not None:
+                handle.close()
+
+    def __enter__(self) -> "ArchiveMembers":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class OpenArchives:
+    """The most recently used :class:`ArchiveMembers`, kept open between members.
+
+    Batch workers receive the members of one archive over many chunks; the
+    last :data:`MAX_OPEN_ARCHIVES` archives stay open so each worker reads an
+    archive's index once.  An archive whose size or modification time
+    changed is opened again.
+    """
+
+    def __init__(self, limit: int = MAX_OPEN_ARCHIVES):
+        self.limit = limit
+        self._open: "OrderedDict[Tuple[str, int, int], ArchiveMembers]" = OrderedDict()
+
+    def get(self, archive: Union[str, Path]) -> ArchiveMembers:
+        """Return the open :class:`ArchiveMembers` for ``archive``, opening it if needed."""
+        stat = os.stat(archive)
+        key = (str(archive), stat.st_mtime_ns, stat.st_size)
+        members = self._open.pop(key, None)
+        if members is None:
+            members = ArchiveMembers(archive)
+            while len(self._open) >= self.limit:
+                self._open.popitem(last=False)[1].close()
+        self._open[key] = members
+        return members
+
+    def close(self) -> None:
+        while self._open:
+            self._open.popitem()[1].close()
+
+    def __enter__(self) -> "OpenArchives":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def open_member(archive: Union[str, Path], name: str, spool_threshold: int = DEFAULT_SPOOL_THRESHOLD) -> Source:
+    """Read one member of a zip or uncompressed tar archive."""
+    with ArchiveMembers(archive) as members:
+        return members.open(name, spool_threshold)
+
+
+def iter_members(
+    archive: Union[str, Path], pattern: str = "*.doc", spool_threshold: int = DEFAULT_SPOOL_THRESHOLD
+) -> Iterator[Tuple[str, int, Source]]:
+    """Yield ``(name, size, source)`` for each matching member in archive order.
+
+    Archives are read in one forward pass (tar archives in streaming mode),
+    so this also works for compressed tars.  A spooled source is closed when
+    the iteration moves on to the next member.
+    """
+    if str(archive).lower().endswith(".zip"):
+        with zipfile.ZipFile(archive) as handle:
+            for info in handle.infolist():
+                if info.is_dir() or not _matches(info.filename, pattern):
+                    continue
+                with handle.open(info) as member:
+                    source = _spool(member, info.file_size, spool_threshold)
+                yield from _yield_and_close(info.filename, info.file_size, source)
+        return
+    with tarfile.open(archive, mode="r|*") as handle:
+        for info in handle:
+            if not info.isfile() or not _matches(info.name, pattern):
+                continue
+            member = handle.extractfile(info)
+            source = _spool(member, info.size, spool_threshold)
+            yield from _yield_and_close(info.name, info.size, source)
+
+
+def _yield_and_close(name: str, size: int, source: Source) -> Iterator[Tuple[str, int, Source]]:
+    try:
+        yield name, size, source
+    finally:
+        if not isinstance(source, bytes):
+            source.close()
+
+
+def extract_member(
+    item: str,
+    timeout: Optional[float] = None,
+    cache: Optional[ExtractionCache] = None,
+    spool_threshold: int = DEFAULT_SPOOL_THRESHOLD,
+    archives: Optional[OpenArchives] = None,
+) -> BatchResult:
+    """Extract the member addressed by ``"<archive>!<member>"``.
+
+    With ``archives`` the archive is taken from (and left open in) that
+    set instead of being opened for this one member.
+    """
+    archive, name = split_member_path(item)
+    started = time.perf_counter()
+    try:
+        if archives is not None:
+            source = archives.get(archive).open(name, spool_threshold)
+        else:
+            source = open_member(archive, name, spool_threshold)
+    except RECORDED_ERRORS + ARCHIVE_ERRORS + (KeyError,) as exc:
+        result = BatchResult(item, error=str(exc) or exc.__class__.__name__, error_type=exc.__class__.__name__)
+        result.seconds = time.perf_counter() - started
+        return result
+    try:
+        size = len(source) if isinstance(source, bytes) else source.seek(0, 2)
+        if not isinstance(source, bytes):
+            source.seek(0)
+        result = extract_source(item, source, size, timeout, cache)
+    finally:
+        if not isinstance(source, bytes):
+            source.close()
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def extract_archive(
+    archive: Union[str, Path],
+    pattern: str = "*.doc",
+    timeout: Optional[float] = None,
+    cache: Optional[ExtractionCache] = None,
+    spool_threshold: int = DEFAULT_SPOOL_THRESHOLD,
+) -> Iterator[BatchResult]:
+    """Extract every matching member of ``archive`` in one sequential pass.
+
+    Each member gets its own :class:`~zddoc.batch.BatchResult`.  If the
+    archive itself is unreadable (or becomes so part-way), one failed result
+    for the archive path is yielded and iteration stops.
+    """
+    members = iter_members(archive, pattern, spool_threshold)
+    while True:
+        started = time.perf_counter()
+        try:
+            name, size, source = next(members)
+        except StopIteration:
+            return
+        except ARCHIVE_ERRORS + (OSError,) as exc:
+            result = BatchResult(str(archive), error=str(exc) or exc.__class__.__name__)
+            result.error_type = exc.__class__.__name__
+            result.seconds = time.perf_counter() - started
+            yield result
+            return
+        result = extract_source(member_path(archive, name), source, size, timeout, cache)
+        result.seconds = time.perf_counter() - started
+        yield result
+
+
+def extract_items(
+    items: Iterable[str],
+    timeout: Optional[float] = None,
+    cache: Optional[ExtractionCache] = None,
+    archives: Optional[OpenArchives] = None,
+) -> List[BatchResult]:
+    """Extract files, ``"<archive>!<member>"`` items and whole archives (see :func:`expand_archives`)."""
+    results = []
+    for item in items:
+        if split_member_path(item) is not None:
+            results.append(extract_member(item, timeout, cache, archives=archives))
+        elif is_archive(item):
+            results.extend(extract_archive(item, timeout=timeout, cache=cache))
+        else:
+            results.append(extract_file(item, timeout, cache))
+    return results
+
+
+def expand_archives(paths: Iterator[str], pattern: str = "*.doc") -> Iterator[str]:
+    """Replace zip and uncompressed tar archives in ``paths`` by their member paths.
+
+    Compressed tars are passed through unchanged; :func:`extract_archive`
+    handles them in a single pass.  An unreadable archive is also passed
+    through so its error is reported by the worker.
+    """
+    for path in paths:
+        if not is_archive(path) or is_sequential(path):
+            yield path
+            continue
+        try:
+            members = list(list_members(path, pattern))
+        except ARCHIVE_ERRORS + (OSError,):
+            yield path
+            continue
+        for name in members:
+            yield member_path(path, name)
@@ -0,0 +1,169 @@
+"""Parallel text extraction over many documents using a process pool."""
+
+import fnmatch
+import glob
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .archive import OpenArchives, extract_items
+from .cache import ExtractionCache
+from .extract import BatchResult
+
+DEFAULT_CHUNK_SIZE = 16
+
+# The archives a pool worker keeps open across the chunks it is given (see _init_worker).
+_worker_archives: Optional[OpenArchives] = None
+
+
+@dataclass
+class BatchStats:
+    files: int = 0
+    failed: int = 0
+    input_bytes: int = 0
+    output_chars: int = 0
+    seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return self.files - self.failed
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.input_bytes / (1024 * 1024) / self.seconds if self.seconds else 0.0
+
+    def add(self, result: BatchResult) -> None:
+        self.files += 1
+        self.input_bytes += result.input_bytes
+        if result.ok:
+            self.output_chars += len(result.text)
+        else:
+            self.failed += 1
+
+    def summary(self) -> str:
+        return (
+            f"{self.files} files ({self.succeeded} ok, {self.failed} failed) in {self.seconds:.2f}s: "
+            f"{self.files_per_second:.1f} files/s, {self.mb_per_second:.2f} MB/s"
+        )
+
+
+def expand_paths(inputs: Iterable[str], pattern: str = "*.doc") -> Iterator[str]:
+    """Expand files, directories (searched recursively for ``pattern``, case-insensitive) and globs."""
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for match in sorted(path.rglob("*")):
+                if fnmatch.fnmatch(match.name.lower(), pattern.lower()) and match.is_file():
+                    yield str(match)
+        elif path.exists():
+            yield str(path)
+        else:
+            matches = sorted(glob.glob(item, recursive=True))
+            if matches:
+                yield from (match for match in matches if os.path.isfile(match))
+            else:
+                # Keep the entry so the missing file is reported as a per-file error.
+                yield item
+
+
+def _init_worker() -> None:
+    global _worker_archives
+    # Lives as long as this worker, i.e. one extract_batch call: the next chunks
+    # usually hold more members of the same archives.
+    _worker_archives = OpenArchives()
+
+
+def _extract_chunk(
+    paths: Sequence[str], timeout: Optional[float], cache: Optional[ExtractionCache] = None
+) -> List[BatchResult]:
+    return extract_items(paths, timeout, cache, _worker_archives)
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def extract_batch(
+    paths: Iterable[str],
+    jobs: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    timeout: Optional[float] = None,
+    stats: Optional[BatchStats] = None,
+    cache: Optional[ExtractionCache] = None,
+) -> Iterator[BatchResult]:
+    """Extract ``paths`` in parallel and yield results in completion order.
+
+    Paths are submitted to a process pool in chunks of ``chunk_size``, with at
+    most two chunks per worker in flight so huge inputs are never queued up
+    front.  ``jobs=1`` runs in the calling process.  When ``stats`` is given it
+    is updated as results are produced.  A ``cache`` is shared by all workers.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    jobs = jobs or os.cpu_count() or 1
+    started = time.perf_counter()
+    chunks = _chunked(paths, chunk_size)
+    archives = OpenArchives()
+    try:
+        if jobs == 1:
+            results = (result for chunk in chunks for result in extract_items(chunk, timeout, cache, archives))
+        else:
+            results = _extract_in_pool(chunks, jobs, timeout, cache)
+        for result in results:
+            if stats is not None:
+                stats.add(result)
+                stats.seconds = time.perf_counter() - started
+            yield result
+    finally:
+        if stats is not None:
+            stats.seconds = time.perf_counter() - started
+        archives.close()
+
+
+def _extract_in_pool(
+    chunks: Iterator[List[str]], jobs: int, timeout: Optional[float], cache: Optional[ExtractionCache]
+) -> Iterator[BatchResult]:
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        in_flight: Dict[Future, List[str]] = {}
+
+        def submit_more() -> None:
+            while len(in_flight) < jobs * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                try:
+                    future = pool.submit(_extract_chunk, chunk, timeout, cache)
+                except BrokenProcessPool as exc:
+                    future = Future()
+                    future.set_exception(exc)
+                in_flight[future] = chunk
+
+        submit_more()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = in_flight.pop(future)
+                try:
+                    results = future.result()
+                except BrokenProcessPool as exc:
+                    # A worker died (e.g. killed by the OS); report its whole chunk.
+                    results = [
+                        BatchResult(path, error=str(exc), error_type=exc.__class__.__name__)
+                        for path in chunk
+                    ]
+                yield from results
+            submit_more()
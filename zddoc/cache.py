@@ -0,0 +1,147 @@
+"""Persistent, size-bounded cache of extracted text."""
+
+import hashlib
+import os
+import tempfile
+import zlib
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+# Bump when extraction output changes so stale entries stop matching.
+CACHE_FORMAT = 2
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+_RESCAN_EVERY = 256
+_HASH_CHUNK = 1024 * 1024
+
+
+class ExtractionCache:
+    """Content-addressed store of compressed document text on disk.
+
+    Path sources are keyed cheaply by resolved path, size, mtime and inode;
+    bytes and file objects are keyed by a BLAKE2 hash of their content.
+    Entries are zlib-compressed files written atomically (temp file plus
+    ``os.replace``), so several processes may share one directory.  Reads
+    refresh an entry's mtime, and once the directory grows past
+    ``max_bytes`` the least recently used entries are deleted.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES, level: int = 6):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.level = level
+        self._approx_bytes: Optional[int] = None
+        self._puts = 0
+
+    def __getstate__(self):
+        # Worker processes start with a fresh size estimate.
+        state = self.__dict__.copy()
+        state["_approx_bytes"] = None
+        state["_puts"] = 0
+        return state
+
+    def key_for(self, source: Union[str, Path, bytes, BinaryIO], variant: str = "") -> str:
+        """Return the cache key of ``source``; ``variant`` separates extraction options."""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(b"zddoc-%d:%s:" % (CACHE_FORMAT, variant.encode()))
+        if isinstance(source, (str, Path)):
+            path = Path(source).resolve()
+            info = path.stat()
+            digest.update(f"path:{path}:{info.st_size}:{info.st_mtime_ns}:{info.st_dev}:{info.st_ino}".encode())
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            digest.update(b"content:")
+            digest.update(source)
+        else:
+            digest.update(b"content:")
+            position = source.tell()
+            source.seek(0)
+            for chunk in iter(lambda: source.read(_HASH_CHUNK), b""):
+                digest.update(chunk)
+            source.seek(position)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.z"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as handle:
+                payload = handle.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # A read-only cache still serves hits; the entry just ages as if unread.
+            pass
+        try:
+            return zlib.decompress(payload).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError):
+            # Torn or corrupt entry: drop it and treat as a miss.
+            self._remove(path)
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        path = self._entry_path(key)
+        payload = zlib.compress(text.encode("utf-8"), self.level)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(payload)
+            os.replace(temp_name, path)
+        except BaseException:
+            self._remove(Path(temp_name))
+            raise
+        self._puts += 1
+        if self._approx_bytes is None or self._puts % _RESCAN_EVERY == 0:
+            self._approx_bytes = self._scan_size()
+        else:
+            self._approx_bytes += len(payload)
+        if self._approx_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        if not self.directory.is_dir():
+            return entries
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(".z"):
+                    continue
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, Path(entry.path)))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache is under 90% of ``max_bytes``."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+        self._approx_bytes = total
+
+    def clear(self) -> None:
+        for _, _, path in self._entries():
+            self._remove(path)
+        self._approx_bytes = 0
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            # Another process evicted it first.
+            pass
@@ -1,16 +1,30 @@
 """Minimal OLE2 CFBF reader implemented with the standard library."""
 
 import io
+import mmap
 import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import nullcontext
 from dataclasses import dataclass
 from pathlib import Path
-from typing import BinaryIO, Dict, Iterable, Sequence, Union
+from typing import BinaryIO, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .limits import DEFAULT_LIMITS, Limits
+from .stats import ExtractionStats
 
 OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
 FREESECT = 0xFFFFFFFF
 ENDOFCHAIN = 0xFFFFFFFE
 FATSECT = 0xFFFFFFFD
 
+# FAT and mini FAT sectors kept decoded per reader (least recently used are dropped).
+FAT_CACHE_PAGES = 64
+# Longest run of sectors a lazy stream maps (and reads) at once.
+MAX_RUN_BYTES = 1024 * 1024
+
 
 class DocFormatError(Exception):
     """Raised when the container is not a valid OLE2 file."""
@@ -20,6 +34,171 @@ class MissingStreamError(Exception):
     """Raised when a required stream cannot be found."""
 
 
+def _iter_sector_runs(sectors: Iterable[int], max_count: int = 0) -> Iterator[Tuple[int, int]]:
+    """Group a sector chain into ``(first_sector, count)`` runs of consecutive sectors.
+
+    With ``max_count`` the runs start at one sector and double in length up
+    to ``max_count``, so a lazy reader walks only as much of the chain as it
+    actually reads.
+    """
+    limit = 1 if max_count else 0
+    start = previous = -2
+    count = 0
+    for sector in sectors:
+        if count and sector == previous + 1:
+            count += 1
+        else:
+            if count:
+                yield start, count
+                limit = min(limit * 2, max_count)
+            start, count = sector, 1
+        previous = sector
+        if count == limit:
+            yield start, count
+            limit = min(limit * 2, max_count)
+            count = 0
+    if count:
+        yield start, count
+
+
+def _sector_runs(sectors: Iterable[int]) -> List[Tuple[int, int]]:
+    """Group a sector chain into ``(first_sector, count)`` runs of consecutive sectors."""
+    return list(_iter_sector_runs(sectors))
+
+
+def _unpack_sector_table(data) -> array:
+    """Decode little-endian 32-bit sector numbers into a compact array."""
+    table = array("I")
+    table.frombytes(data)
+    if sys.byteorder == "big":
+        table.byteswap()
+    return table
+
+
+class _PagedTable:
+    """A sector table (FAT or mini FAT) decoded one sector-sized page at a time.
+
+    Pages are read through ``read_page(index)`` on first use and kept in a
+    small LRU cache, so memory does not grow with the size of the file.
+    """
+
+    def __init__(self, read_page: Callable[[int], bytes], page_count: int, entries_per_page: int):
+        self._read_page = read_page
+        self._page_count = page_count
+        self.entries_per_page = entries_per_page
+        self._pages: "OrderedDict[int, array]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self._page_count * self.entries_per_page
+
+    def page(self, index: int) -> array:
+        page = self._pages.get(index)
+        if page is not None:
+            self._pages.move_to_end(index)
+            return page
+        if not 0 <= index < self._page_count:
+            raise IndexError("sector table index out of range")
+        page = _unpack_sector_table(self._read_page(index))
+        self._pages[index] = page
+        if len(self._pages) > FAT_CACHE_PAGES:
+            self._pages.popitem(last=False)
+        return page
+
+    def __getitem__(self, index: int) -> int:
+        page_index, slot = divmod(index, self.entries_per_page)
+        return self.page(page_index)[slot]
+
+
+class StreamView(io.RawIOBase):
+    """Seekable, read-only view over a stream stored as a list of extents.
+
+    Each extent is an ``(offset, length)`` pair in the backing storage (the
+    container file or the mini stream).  ``extents`` may be a lazy iterable:
+    it is only consumed as far as ``read``/``readinto`` calls reach, and only
+    the extents touched are fetched, so opening a large stream is free.
+    """
+
+    def __init__(
+        self,
+        read_into: Callable[[int, memoryview], None],
+        extents: Iterable[Tuple[int, int]],
+        size: int,
+    ):
+        super().__init__()
+        self._read_into = read_into
+        self._pending: Optional[Iterator[Tuple[int, int]]] = iter(extents)
+        self._extents: List[Tuple[int, int]] = []
+        self._starts: List[int] = []
+        self._mapped = 0
+        self._size = size
+        self._pos = 0
+
+    def _map_until(self, position: int) -> None:
+        """Consume extents until ``position`` is covered or the chain ends."""
+        while self._mapped <= position and self._pending is not None:
+            extent = next(self._pending, None)
+            if extent is None:
+                # The chain is shorter than the directory claims.
+                self._pending = None
+                self._size = min(self._size, self._mapped)
+                return
+            self._extents.append(extent)
+            self._starts.append(self._mapped)
+            self._mapped += extent[1]
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError("invalid whence (%r)" % whence)
+        if position < 0:
+            raise ValueError("negative seek position %d" % position)
+        self._pos = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        target = memoryview(buffer).cast("B")
+        wanted = max(0, min(len(target), self._size - self._pos))
+        if not wanted:
+            return 0
+        self._map_until(self._pos + wanted - 1)
+        wanted = max(0, min(wanted, self._size - self._pos))
+        written = 0
+        index = bisect_right(self._starts, self._pos) - 1
+        while written < wanted:
+            offset, length = self._extents[index]
+            within = self._pos + written - self._starts[index]
+            take = min(length - within, wanted - written)
+            self._read_into(offset + within, target[written : written + take])
+            written += take
+            index += 1
+        self._pos += written
+        return written
+
+    def readall(self) -> bytes:
+        data = bytearray(max(0, self._size - self._pos))
+        filled = self.readinto(data)
+        del data[filled:]
+        return bytes(data)
+
+
 @dataclass
 class DirectoryEntry:
     name: str
@@ -29,43 +208,143 @@ class DirectoryEntry:
 
 
 class CFBFReader:
-    """Provide transparent access to streams stored in a Compound File."""
+    """Provide transparent access to streams stored in a Compound File.
 
-    def __init__(self, source: Union[str, Path, BinaryIO, bytes]):
-        self._stream = self._open_source(source)
+    Opening a file reads the header, the DIFAT and the directory.  FAT and
+    mini FAT sectors are decoded on demand through a small page cache and
+    the mini stream is read lazily, so memory is proportional to the
+    streams actually read rather than to the size of the file.  Both version
+    3 (512-byte sectors) and version 4 (4096-byte sectors) files are
+    supported.
+
+    Untrusted input cannot make the reader loop or over-allocate: sector
+    chains are checked for cycles and for sectors past the end of the file,
+    stream sizes are clamped to what the file can hold, and streams larger
+    than ``limits.max_stream_bytes`` raise
+    :class:`~zddoc.limits.LimitExceededError`.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Path, BinaryIO, bytes],
+        stats: Optional[ExtractionStats] = None,
+        limits: Optional[Limits] = None,
+    ):
+        self._stats = stats
+        self._limits = DEFAULT_LIMITS if limits is None else limits
+        self._stream: Optional[BinaryIO] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
         self._owns_stream = isinstance(source, (str, Path))
-        self._header = self._read_exact(512)
-        self._validate_header()
-        self._fat_sectors = []
-        self._fat: Sequence[int] = ()
+        with self._stage("open"):
+            self._open_source(source)
+            self._file_size = len(self._view) if self._view is not None else self._stream.seek(0, io.SEEK_END)
+            self._header = self._read_exact(512)
+            self._validate_header()
+        self._fat_sectors = array("I")
+        self._fat: Union[_PagedTable, Tuple[()]] = ()
         self._entries: Dict[str, DirectoryEntry] = {}
-        self._mini_stream_data = b""
-        self._mini_fat: Sequence[int] = []
-        self._build_fat()
-        self._read_directory()
-        self._load_mini_stream()
-
-    def _open_source(self, source: Union[str, Path, BinaryIO, bytes]) -> BinaryIO:
-        if isinstance(source, bytes):
-            return io.BytesIO(source)
+        self._mini_stream: Optional[StreamView] = None
+        self._mini_sector_count = 0
+        self._mini_fat: Union[_PagedTable, Tuple[()]] = ()
+        with self._stage("build_fat"):
+            self._build_fat()
+        with self._stage("read_directory"):
+            self._read_directory()
+        with self._stage("load_mini_stream"):
+            self._load_mini_stream()
+
+    def _stage(self, name: str) -> ContextManager:
+        return nullcontext() if self._stats is None else self._stats.stage(name)
+
+    def _open_source(self, source: Union[str, Path, BinaryIO, bytes]) -> None:
+        """Select the sector backend for ``source``.
+
+        Paths are memory-mapped and ``bytes`` are wrapped in a memoryview so that
+        sector runs are served as zero-copy slices.  Seekable file objects are
+        read with one ``seek``/``read`` per run; anything that cannot seek is
+        buffered into memory once.
+        """
+        if isinstance(source, (bytes, bytearray)):
+            self._view = memoryview(source)
+            return
         if isinstance(source, (str, Path)):
-            return open(source, "rb")
-        if hasattr(source, "read") and hasattr(source, "seek"):
-            return source
-        raise TypeError("source must be path, bytes, or file-like")
+            self._stream = open(source, "rb")
+            try:
+                self._mmap = mmap.mmap(self._stream.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Empty files and special files cannot be mapped; read them instead.
+                return
+            self._view = memoryview(self._mmap)
+            return
+        if not hasattr(source, "read"):
+            raise TypeError("source must be path, bytes, or file-like")
+        seekable = getattr(source, "seekable", None)
+        if hasattr(source, "seek") and (seekable is None or seekable()):
+            self._stream = source
+            return
+        self._view = memoryview(source.read())
 
-    def _read_exact(self, size: int) -> bytes:
+    def _read_at(self, offset: int, size: int) -> Union[bytes, memoryview]:
+        """Return ``size`` bytes at ``offset`` (possibly fewer at end of file)."""
+        if self._view is not None:
+            return self._view[offset : offset + size]
+        try:
+            self._stream.seek(offset)
+        except OSError as exc:
+            raise DocFormatError("failed to seek offset %d" % offset) from exc
         data = self._stream.read(size)
+        if self._stats is not None:
+            self._stats.count("seeks")
+            self._stats.count("bytes_copied", len(data))
+        return data
+
+    def _readinto_at(self, offset: int, target: memoryview) -> None:
+        """Fill ``target`` with the container bytes starting at ``offset``."""
+        if self._stats is not None:
+            first = offset // self.sector_size
+            last = (offset + len(target) - 1) // self.sector_size
+            self._stats.count("sectors_read", last - first + 1)
+            self._stats.count("bytes_copied", len(target))
+            if self._view is None:
+                self._stats.count("seeks")
+        if self._view is not None:
+            data = self._view[offset : offset + len(target)]
+            if len(data) != len(target):
+                raise DocFormatError("offset %d is truncated" % offset)
+            target[:] = data
+            return
+        try:
+            self._stream.seek(offset)
+        except OSError as exc:
+            raise DocFormatError("failed to seek offset %d" % offset) from exc
+        readinto = getattr(self._stream, "readinto", None)
+        if readinto is not None:
+            filled = readinto(target)
+        else:
+            data = self._stream.read(len(target))
+            filled = len(data)
+            target[:filled] = data
+        if filled != len(target):
+            raise DocFormatError("offset %d is truncated" % offset)
+
+    def _read_exact(self, size: int) -> bytes:
+        data = self._read_at(0, size)
         if len(data) != size:
             raise DocFormatError("container header is truncated")
-        return data
+        return bytes(data)
 
     def _validate_header(self) -> None:
         if self._header[:8] != OLE_SIGNATURE:
             raise DocFormatError("not an OLE2 container")
+        self.major_version = struct.unpack_from("<H", self._header, 0x1A)[0]
         sector_shift = struct.unpack_from("<H", self._header, 0x1E)[0]
         mini_sector_shift = struct.unpack_from("<H", self._header, 0x20)[0]
+        if sector_shift not in (9, 12):
+            raise DocFormatError("unsupported sector size 2**%d" % sector_shift)
         self.sector_size = 1 << sector_shift
+        # Sectors after the header, counting a truncated last sector; no chain can be longer.
+        self._sector_count = max(0, (self._file_size - 1) // self.sector_size)
         self.mini_sector_size = 1 << mini_sector_shift
         self._dir_start_sector = struct.unpack_from("<I", self._header, 0x30)[0]
         self.mini_stream_cutoff = struct.unpack_from("<I", self._header, 0x38)[0]
@@ -78,48 +357,110 @@ class CFBFReader:
     def _sector_offset(self, sector_index: int) -> int:
         return self.sector_size * (sector_index + 1)
 
-    def _read_sector(self, sector_index: int) -> bytes:
-        try:
-            self._stream.seek(self._sector_offset(sector_index))
-        except OSError as exc:
-            raise DocFormatError("failed to seek sector %d" % sector_index) from exc
-        sector = self._stream.read(self.sector_size)
-        if len(sector) != self.sector_size:
-            raise DocFormatError("sector %d is truncated" % sector_index)
-        return sector
+    def _read_run(self, first_sector: int, count: int, size: Optional[int] = None) -> Union[bytes, memoryview]:
+        """Read ``count`` consecutive sectors (or their first ``size`` bytes) at once."""
+        expected = count * self.sector_size if size is None else size
+        if self._stats is not None:
+            self._stats.count("sectors_read", -(-expected // self.sector_size))
+        data = self._read_at(self._sector_offset(first_sector), expected)
+        if len(data) != expected:
+            missing = first_sector + len(data) // self.sector_size
+            raise DocFormatError("sector %d is truncated" % missing)
+        return data
+
+    def _read_sector(self, sector_index: int) -> Union[bytes, memoryview]:
+        return self._read_run(sector_index, 1)
+
+    def _read_sectors(self, sectors: Iterable[int], size: Optional[int] = None) -> bytes:
+        """Concatenate ``sectors``, trimmed to ``size`` bytes, reading each run once."""
+        remaining = sys.maxsize if size is None else size
+        parts = []
+        for first_sector, count in _iter_sector_runs(sectors):
+            if remaining <= 0:
+                break
+            length = min(count * self.sector_size, remaining)
+            parts.append(self._read_run(first_sector, count, length))
+            remaining -= length
+        data = b"".join(parts)
+        if self._stats is not None and (self._view is not None or len(parts) > 1):
+            self._stats.count("bytes_copied", len(data))
+        return data
 
     def _build_fat(self) -> None:
-        self._fat_sectors = [idx for idx in self._difat_entries if idx not in (FREESECT, ENDOFCHAIN)]
+        """Collect the FAT sector numbers from the header and the DIFAT chain.
+
+        Only the (small) DIFAT is read here; FAT sectors themselves are read
+        on demand through :class:`_PagedTable`.
+        """
+        fat_sectors = array("I", (idx for idx in self._difat_entries if idx not in (FREESECT, ENDOFCHAIN)))
         next_sector = self._difat_start
-        entries_per_sector = (self.sector_size - 4) // 4
+        entries_per_sector = self.sector_size // 4 - 1
         fmt = f"<{entries_per_sector}I"
-        while next_sector not in (FREESECT, ENDOFCHAIN):
+        remaining = min(self._difat_sectors, self._sector_count)
+        while next_sector not in (FREESECT, ENDOFCHAIN) and remaining > 0:
+            if next_sector >= self._sector_count:
+                raise DocFormatError("DIFAT chain points past the end of the file")
             block = self._read_sector(next_sector)
-            self._fat_sectors.extend(
+            fat_sectors.extend(
                 idx for idx in struct.unpack_from(fmt, block, 0) if idx not in (FREESECT, ENDOFCHAIN)
             )
             next_sector = struct.unpack_from("<I", block, entries_per_sector * 4)[0]
-        fat_data = bytearray()
-        for sector in self._fat_sectors:
-            fat_data.extend(self._read_sector(sector))
-        self._fat = struct.unpack(f"<{len(fat_data) // 4}I", fat_data) if fat_data else ()
+            remaining -= 1
+        if len(fat_sectors) > self._sector_count:
+            raise DocFormatError("DIFAT lists more FAT sectors than the file holds")
+        self._fat_sectors = fat_sectors
+        self._fat = _PagedTable(self._read_fat_page, len(fat_sectors), self.sector_size // 4)
 
-    def _iter_chain(self, start_sector: int) -> Iterable[int]:
+    def _read_fat_page(self, index: int) -> Union[bytes, memoryview]:
+        return self._read_sector(self._fat_sectors[index])
+
+    def _iter_chain(self, start_sector: int) -> Iterator[int]:
+        fat = self._fat
+        if not fat:
+            if start_sector not in (FREESECT, ENDOFCHAIN):
+                raise DocFormatError("FAT chain is corrupt")
+            return
+        per_page = fat.entries_per_page
+        page_index = -1
+        page = None
+        sector_count = self._sector_count
+        # One bit per sector of the file: a chain may visit each sector once.
+        visited = bytearray((sector_count + 7) >> 3)
         sector = start_sector
         while sector not in (FREESECT, ENDOFCHAIN):
+            if sector >= sector_count:
+                raise DocFormatError("FAT chain points past the end of the file")
+            byte, bit = sector >> 3, 1 << (sector & 7)
+            if visited[byte] & bit:
+                raise DocFormatError("FAT chain contains a cycle")
+            visited[byte] |= bit
             yield sector
-            try:
-                sector = self._fat[sector]
-            except IndexError as exc:
-                raise DocFormatError("FAT chain is corrupt") from exc
+            index, slot = divmod(sector, per_page)
+            if index != page_index:
+                try:
+                    page = fat.page(index)
+                except IndexError as exc:
+                    raise DocFormatError("FAT chain is corrupt") from exc
+                page_index = index
+            sector = page[slot]
 
-    def _read_chain(self, start_sector: int) -> bytes:
+    def _read_chain(self, start_sector: int, size: Optional[int] = None) -> bytes:
         if start_sector in (FREESECT, ENDOFCHAIN):
             return b""
-        data = bytearray()
-        for sector in self._iter_chain(start_sector):
-            data.extend(self._read_sector(sector))
-        return bytes(data)
+        return self._read_sectors(self._iter_chain(start_sector), size)
+
+    def _chain_extents(self, start_sector: int, size: int) -> Iterator[Tuple[int, int]]:
+        """Lazily map the first ``size`` bytes of a FAT chain to container extents."""
+        remaining = size
+        if start_sector in (FREESECT, ENDOFCHAIN):
+            return
+        max_count = max(1, MAX_RUN_BYTES // self.sector_size)
+        for first_sector, count in _iter_sector_runs(self._iter_chain(start_sector), max_count):
+            if remaining <= 0:
+                break
+            length = min(count * self.sector_size, remaining)
+            yield self._sector_offset(first_sector), length
+            remaining -= length
 
     def _read_directory(self) -> None:
         raw = self._read_chain(self._dir_start_sector)
@@ -134,54 +475,129 @@ class CFBFReader:
             object_type = entry[0x42]
             start_sector = struct.unpack_from("<I", entry, 0x74)[0]
             stream_size = struct.unpack_from("<Q", entry, 0x78)[0]
+            if self.sector_size == 512:
+                # Version 3 writers may leave garbage in the high 32 bits.
+                stream_size &= 0xFFFFFFFF
             self._entries[name] = DirectoryEntry(name, object_type, start_sector, stream_size)
 
     def _load_mini_stream(self) -> None:
+        """Set up lazy access to the mini stream and the paged mini FAT."""
         root = self._entries.get("Root Entry")
         if not root or root.stream_size == 0:
             return
-        self._mini_stream_data = self._read_chain(root.start_sector)[: root.stream_size]
+        size = self._clamp_size(root.stream_size, self._sector_count * self.sector_size)
+        self._mini_stream = StreamView(self._readinto_at, self._chain_extents(root.start_sector, size), size)
+        self._mini_sector_count = -(-size // self.mini_sector_size)
         if self._mini_fat_start in (FREESECT, ENDOFCHAIN):
             return
-        mini_fat_bytes = bytearray()
-        for sector in self._iter_chain(self._mini_fat_start):
-            mini_fat_bytes.extend(self._read_sector(sector))
-        if mini_fat_bytes:
-            self._mini_fat = struct.unpack(f"<{len(mini_fat_bytes) // 4}I", mini_fat_bytes)
+        pages = self._mini_fat_sectors or sum(1 for _ in self._iter_chain(self._mini_fat_start))
+        pages = min(pages, self._sector_count)
+        size = pages * self.sector_size
+        mini_fat_view = StreamView(self._readinto_at, self._chain_extents(self._mini_fat_start, size), size)
+
+        def read_mini_fat_page(index: int) -> bytearray:
+            page = bytearray(self.sector_size)
+            mini_fat_view.seek(index * self.sector_size)
+            if mini_fat_view.readinto(page) != len(page):
+                raise DocFormatError("mini FAT is truncated")
+            return page
+
+        self._mini_fat = _PagedTable(read_mini_fat_page, pages, self.sector_size // 4)
 
-    def open_stream(self, name: str) -> io.BytesIO:
+    def _clamp_size(self, size: int, capacity: int) -> int:
+        """Bound a declared stream size by what the storage can hold, then check the limit."""
+        size = min(size, capacity)
+        self._limits.check("max_stream_bytes", size)
+        return size
+
+    def open_stream(self, name: str, lazy: bool = False) -> Union[io.BytesIO, StreamView]:
+        """Open stream ``name``.
+
+        By default the whole stream is read into an ``io.BytesIO``.  With
+        ``lazy=True`` a :class:`StreamView` is returned instead and sectors are
+        only read when a ``read``/``readinto`` touches them.
+        """
         entry = self._entries.get(name)
         if not entry:
             raise MissingStreamError(f"stream {name!r} not found")
         if entry.stream_size == 0:
-            return io.BytesIO(b"")
+            return StreamView(self._readinto_at, [], 0) if lazy else io.BytesIO(b"")
         use_mini = (
             entry.stream_size < self.mini_stream_cutoff
             and entry.start_sector not in (FREESECT, ENDOFCHAIN)
-            and self._mini_stream_data
+            and self._mini_stream is not None
             and self._mini_fat
         )
         if use_mini:
-            data = self._read_mini_chain(entry.start_sector)
+            size = self._clamp_size(entry.stream_size, self._mini_stream.size)
         else:
-            data = self._read_chain(entry.start_sector)
-        return io.BytesIO(data[: entry.stream_size])
+            size = self._clamp_size(entry.stream_size, self._sector_count * self.sector_size)
+        if lazy:
+            if use_mini:
+                extents = self._mini_chain_extents(entry.start_sector, size)
+                return StreamView(self._readinto_mini_at, extents, size)
+            return StreamView(self._readinto_at, self._chain_extents(entry.start_sector, size), size)
+        if use_mini:
+            data = self._read_mini_chain(entry.start_sector, size)
+        else:
+            data = self._read_chain(entry.start_sector, size)
+        return io.BytesIO(data)
 
-    def _read_mini_chain(self, start_sector: int) -> bytes:
-        if not self._mini_stream_data or not self._mini_fat:
+    def _iter_mini_chain(self, start_sector: int) -> Iterator[int]:
+        if self._mini_stream is None or not self._mini_fat:
             raise DocFormatError("mini stream data is unavailable")
-        data = bytearray()
+        sector_count = min(self._mini_sector_count, len(self._mini_fat))
+        visited = bytearray((sector_count + 7) >> 3)
         sector = start_sector
         while sector not in (FREESECT, ENDOFCHAIN):
-            offset = sector * self.mini_sector_size
-            data.extend(self._mini_stream_data[offset : offset + self.mini_sector_size])
-            if sector >= len(self._mini_fat):
+            if sector >= sector_count:
                 raise DocFormatError("mini FAT is corrupt")
+            byte, bit = sector >> 3, 1 << (sector & 7)
+            if visited[byte] & bit:
+                raise DocFormatError("mini FAT chain contains a cycle")
+            visited[byte] |= bit
+            yield sector
             sector = self._mini_fat[sector]
+
+    def _mini_chain_extents(self, start_sector: int, size: int) -> Iterator[Tuple[int, int]]:
+        """Lazily map the first ``size`` bytes of a mini FAT chain to mini stream extents."""
+        remaining = size
+        for first_sector, count in _iter_sector_runs(self._iter_mini_chain(start_sector)):
+            if remaining <= 0:
+                break
+            length = min(count * self.mini_sector_size, remaining)
+            yield first_sector * self.mini_sector_size, length
+            remaining -= length
+
+    def _readinto_mini_at(self, offset: int, target: memoryview) -> None:
+        self._mini_stream.seek(offset)
+        if self._mini_stream.readinto(target) != len(target):
+            raise DocFormatError("mini stream offset %d is truncated" % offset)
+
+    def _read_mini_chain(self, start_sector: int, size: Optional[int] = None) -> bytes:
+        if size is None:
+            size = self._mini_stream.size if self._mini_stream is not None else 0
+        data = bytearray(size)
+        view = memoryview(data)
+        position = 0
+        for offset, length in self._mini_chain_extents(start_sector, size):
+            self._readinto_mini_at(offset, view[position : position + length])
+            position += length
+        view.release()
+        del data[position:]
         return bytes(data)
 
     def close(self) -> None:
-        if self._owns_stream:
+        if self._mmap is not None:
+            self._view.release()
+            self._view = None
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A caller still holds a slice; the mapping is freed with it.
+                pass
+            self._mmap = None
+        if self._owns_stream and self._stream is not None:
             self._stream.close()
 
     def __enter__(self) -> "CFBFReader":
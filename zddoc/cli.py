@@ -1,24 +1,269 @@
 """Command-line helper to dump text from a Word 97-2003 document."""
 
 import argparse
+import json
+import os
+import re
+import signal
+import sys
 from pathlib import Path
+from typing import List, Optional
 
+from .cache import DEFAULT_MAX_BYTES, ExtractionCache
 from .cfbf import DocFormatError
-from .reader import DocReader
+from .fib import STORIES
+from .limits import LimitExceededError
+from .reader import DocReader, normalize_text
+from .stats import ExtractionStats
 
+# The batch, archive, server and client modules pull in the process pool, the
+# HTTP stack and tarfile/zipfile; they are imported by the subcommands that use
+# them so that plain extraction (and the --server client) starts quickly.
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Dump text from a binary .doc file using pure Python")
+
+def _add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--cache-dir", type=Path, help="reuse extracted text from this on-disk cache")
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="evict least recently used cache entries beyond this size",
+    )
+
+
+def _cache_from_args(args: argparse.Namespace) -> Optional[ExtractionCache]:
+    if args.cache_dir is None:
+        return None
+    return ExtractionCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        status = COMMANDS[argv[0]](argv[1:])
+        if status:
+            sys.exit(status)
+        return
+    parser = argparse.ArgumentParser(
+        description="Dump text from a binary .doc file using pure Python",
+        epilog="subcommands: " + ", ".join(f"'zddoc {name} --help'" for name in COMMANDS),
+    )
     parser.add_argument("document", type=Path, help="path to the .doc file")
     parser.add_argument("--no-newline", action="store_true", help="do not append final newline")
-    args = parser.parse_args()
+    parser.add_argument("--stats", action="store_true", help="print per-stage timings and I/O counters as JSON to stderr")
+    parser.add_argument(
+        "--story",
+        action="append",
+        choices=[name for name, _ in STORIES],
+        help="only print this story (repeatable; default: the whole document)",
+    )
+    parser.add_argument(
+        "--keep-field-codes", action="store_true", help="keep field instructions such as HYPERLINK or PAGE"
+    )
+    parser.add_argument(
+        "--server",
+        default=os.environ.get("ZDDOC_SERVER"),
+        metavar="ADDRESS",
+        help="extract through a running 'zddoc serve' (unix:/path or host:port; default: $ZDDOC_SERVER)",
+    )
+    _add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.server:
+        _client_main(parser, args)
+        return
+    stats = ExtractionStats() if args.stats else None
+    cache = _cache_from_args(args)
     try:
-        with DocReader(args.document) as reader:
-            text = reader.read_text()
-    except DocFormatError as exc:
+        with DocReader(args.document, stats=stats, cache=cache, keep_field_codes=args.keep_field_codes) as reader:
+            if args.story:
+                for _, text in reader.iter_stories(args.story):
+                    sys.stdout.write(text)
+            else:
+                reader.write_text(sys.stdout)
+    except (DocFormatError, LimitExceededError) as exc:
         parser.error(str(exc))
-    end = "" if args.no_newline else "\n"
-    print(text, end=end)
+    if not args.no_newline:
+        sys.stdout.write("\n")
+    if stats is not None:
+        sys.stdout.flush()
+        print(json.dumps(stats.to_dict(), indent=2, sort_keys=True), file=sys.stderr)
+
+
+def _client_main(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    from .client import request_extract
+
+    if args.stats or args.cache_dir:
+        parser.error("--stats and --cache-dir are not available with --server")
+    try:
+        record = request_extract(
+            args.server, path=args.document, stories=args.story, keep_field_codes=args.keep_field_codes
+        )
+    except OSError as exc:
+        parser.error(f"cannot use server {args.server}: {exc}")
+    if not record["ok"]:
+        parser.error(record["error"])
+    sys.stdout.write(record["text"])
+    if not args.no_newline:
+        sys.stdout.write("\n")
+
+
+def serve_main(argv: List[str]) -> None:
+    from .server import DEFAULT_HOST, DEFAULT_MAX_UPLOAD_BYTES, DEFAULT_PORT, UNIX_PREFIX, ExtractionServer
+
+    parser = argparse.ArgumentParser(
+        prog="zddoc serve",
+        description="Serve extraction requests from a warm worker pool over HTTP (Unix socket or localhost)",
+    )
+    parser.add_argument("--socket", type=Path, help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="TCP address to bind (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port (default: %(default)s)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument(
+        "--max-requests", type=int, default=None, help="concurrent requests before answering 503 (default: 2 x jobs)"
+    )
+    parser.add_argument(
+        "--max-upload-mb",
+        type=int,
+        default=DEFAULT_MAX_UPLOAD_BYTES // (1024 * 1024),
+        help="largest accepted upload",
+    )
+    parser.add_argument("--timeout", type=float, default=None, help="per-document time limit in seconds")
+    parser.add_argument("--verbose", "-v", action="store_true", help="log every request to stderr")
+    _add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+    address = UNIX_PREFIX + str(args.socket) if args.socket else (args.host, args.port)
+    with ExtractionServer(
+        address,
+        jobs=args.jobs,
+        max_requests=args.max_requests,
+        max_upload_bytes=args.max_upload_mb * 1024 * 1024,
+        timeout=args.timeout,
+        cache=_cache_from_args(args),
+        verbose=args.verbose,
+    ) as server:
+        # serve_forever runs in the main thread; turn SIGTERM into a clean exit.
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        server.start_workers()
+        print(f"zddoc serving on {server.address} with {server.jobs} workers", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def batch_main(argv: List[str]) -> None:
+    from .archive import expand_archives
+    from .batch import DEFAULT_CHUNK_SIZE, BatchStats, expand_paths, extract_batch
+
+    parser = argparse.ArgumentParser(
+        prog="zddoc batch",
+        description="Extract many .doc files in parallel and write one JSON record per file",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="files, directories (searched recursively), glob patterns, or zip/tar archives of .doc files",
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--output", "-o", type=Path, help="JSON Lines output file (default: stdout)")
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="files handed to a worker per task"
+    )
+    parser.add_argument("--timeout", type=float, default=None, help="per-file time limit in seconds")
+    _add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+    stats = BatchStats()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        results = extract_batch(
+            expand_archives(expand_paths(args.inputs)),
+            jobs=args.jobs,
+            chunk_size=args.chunk_size,
+            timeout=args.timeout,
+            stats=stats,
+            cache=_cache_from_args(args),
+        )
+        for result in results:
+            out.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(stats.summary(), file=sys.stderr)
+
+
+def grep_main(argv: List[str]) -> int:
+    from .batch import expand_paths
+
+    parser = argparse.ArgumentParser(
+        prog="zddoc grep",
+        description="Find terms in .doc files without extracting their text; prints FILE:CP:MATCH per match",
+        epilog="exit status is 0 if a match was found, 1 if none was, 2 if a file could not be read",
+    )
+    parser.add_argument("pattern", nargs="?", help="term to find (omit when using -e)")
+    parser.add_argument("inputs", nargs="+", help="files, directories (searched recursively) or glob patterns")
+    parser.add_argument(
+        "--regexp", "-e", action="append", default=[], metavar="PATTERN", help="term to find; may be repeated"
+    )
+    parser.add_argument(
+        "--extended-regexp", "-E", action="store_true", help="treat patterns as Python regular expressions"
+    )
+    parser.add_argument("--ignore-case", "-i", action="store_true", help="ignore case distinctions")
+    parser.add_argument(
+        "--max-count", "-m", type=int, default=None, metavar="NUM", help="stop after NUM matches per file"
+    )
+    parser.add_argument("--files-with-matches", "-l", action="store_true", help="print only names of matching files")
+    parser.add_argument("--count", "-c", action="store_true", help="print the number of matches per file")
+    parser.add_argument("--quiet", "-q", action="store_true", help="print nothing; stop at the first match")
+    parser.add_argument(
+        "--story", choices=[name for name, _ in STORIES], help="search only this story (main, footnotes, ...)"
+    )
+    args = parser.parse_args(argv)
+    terms = list(args.regexp)
+    inputs = list(args.inputs)
+    if args.pattern is not None:
+        if terms:
+            inputs.insert(0, args.pattern)
+        else:
+            terms.append(args.pattern)
+    if not terms:
+        parser.error("no pattern given")
+    if args.extended_regexp:
+        try:
+            flags = re.IGNORECASE if args.ignore_case else 0
+            patterns = [re.compile(term, flags) for term in terms]
+        except re.error as exc:
+            parser.error(f"invalid pattern: {exc}")
+    else:
+        patterns = terms
+    max_count = 1 if args.quiet or args.files_with_matches else args.max_count
+    status = 1
+    for path in expand_paths(inputs):
+        try:
+            with DocReader(path) as reader:
+                matches = reader.search(patterns, ignore_case=args.ignore_case, max_count=max_count, story=args.story)
+                found = 0
+                for match in matches:
+                    found += 1
+                    if not (args.quiet or args.files_with_matches or args.count):
+                        # Paragraph marks inside a match must not break the one-line-per-match output.
+                        text = " ".join(normalize_text(match.text).splitlines())
+                        sys.stdout.write(f"{path}:{match.cp_start}:{text}\n")
+        except (OSError, ValueError, DocFormatError, LimitExceededError) as exc:
+            print(f"zddoc grep: {path}: {exc}", file=sys.stderr)
+            status = 2
+            continue
+        if found and status == 1:
+            status = 0
+        if args.quiet and found:
+            return 0
+        if args.files_with_matches and found:
+            sys.stdout.write(f"{path}\n")
+        elif args.count:
+            sys.stdout.write(f"{path}:{found}\n")
+    return status
+
+
+COMMANDS = {"batch": batch_main, "serve": serve_main, "grep": grep_main}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""Client for a running ``zddoc serve``.
+
+Kept apart from :mod:`zddoc.server` so that callers (the ``zddoc --server``
+command line among them) do not import the HTTP server or the worker pool.
+"""
+
+import http.client
+import json
+import socket
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+UNIX_PREFIX = "unix:"
+# How long the client waits for a response; generous because documents may be large.
+CLIENT_TIMEOUT = 300.0
+
+Address = Union[str, Tuple[str, int]]
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+def _connect(address: str, timeout: float) -> http.client.HTTPConnection:
+    if address.startswith(UNIX_PREFIX):
+        return _UnixHTTPConnection(address[len(UNIX_PREFIX) :], timeout)
+    if "://" in address:
+        address = urlsplit(address).netloc
+    host, _, port = address.rpartition(":")
+    return http.client.HTTPConnection(host or DEFAULT_HOST, int(port or DEFAULT_PORT), timeout=timeout)
+
+
+def _call(address: str, method: str, url: str, body: Optional[bytes], headers: Dict[str, str], timeout: float):
+    connection = _connect(address, timeout)
+    try:
+        connection.request(method, url, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b"{}")
+    finally:
+        connection.close()
+
+
+def request_extract(
+    address: str,
+    path: Union[str, Path, None] = None,
+    data: Optional[bytes] = None,
+    stories: Optional[List[str]] = None,
+    keep_field_codes: bool = False,
+    metadata: bool = False,
+    timeout: float = CLIENT_TIMEOUT,
+) -> Dict[str, object]:
+    """Ask the server at ``address`` to extract ``path`` (resolved here) or the bytes ``data``.
+
+    Returns the response record (``ok``, ``text``, ``error``, ...).  A
+    request the server refuses (busy, not ready, malformed) raises
+    ``ConnectionError`` with the server's message.
+    """
+    if (path is None) == (data is None):
+        raise ValueError("pass exactly one of path and data")
+    if path is not None:
+        options = {
+            "path": str(Path(path).resolve()),
+            "stories": stories or [],
+            "keep_field_codes": keep_field_codes,
+            "metadata": metadata,
+        }
+        body = json.dumps(options).encode("utf-8")
+        status, payload = _call(address, "POST", "/extract", body, {"Content-Type": "application/json"}, timeout)
+    else:
+        query = "&".join(
+            [f"story={story}" for story in stories or ()]
+            + [f"{name}=1" for name, on in (("keep_field_codes", keep_field_codes), ("metadata", metadata)) if on]
+        )
+        url = "/extract" + ("?" + query if query else "")
+        headers = {"Content-Type": "application/octet-stream"}
+        status, payload = _call(address, "POST", url, data, headers, timeout)
+    if status != 200:
+        raise ConnectionError(f"server refused the request ({status}): {payload.get('error')}")
+    return payload
+
+
+def wait_ready(address: str, timeout: float = 30.0) -> bool:
+    """Poll ``GET /ready`` until the server reports ready or ``timeout`` expires."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            status, _ = _call(address, "GET", "/ready", None, {}, timeout=5.0)
+            if status == 200:
+                return True
+        except (OSError, http.client.HTTPException, ValueError):
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
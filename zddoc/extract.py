@@ -0,0 +1,102 @@
+"""Extraction of one document with expected failures recorded rather than raised.
+
+Shared by the batch, archive and server front-ends: each document becomes
+a :class:`BatchResult` holding either its text or the error that stopped it.
+"""
+
+import os
+import signal
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Dict, Optional, Union
+
+from .cache import ExtractionCache
+from .cfbf import DocFormatError, MissingStreamError
+from .limits import LimitExceededError
+from .reader import DocReader
+
+RECORDED_ERRORS = (DocFormatError, MissingStreamError, LimitExceededError, ValueError, OSError, struct.error)
+
+
+class ExtractionTimeout(TimeoutError):
+    """Raised inside a worker when a single document exceeds its time budget."""
+
+
+@dataclass
+class BatchResult:
+    path: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    input_bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, object]:
+        record = asdict(self)
+        record["ok"] = self.ok
+        return record
+
+
+@contextmanager
+def _deadline(seconds: Optional[float]):
+    """Raise :class:`ExtractionTimeout` after ``seconds`` (POSIX main thread only)."""
+    if (
+        not seconds
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def _expired(signum, frame):
+        raise ExtractionTimeout(f"extraction exceeded {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, _expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def extract_file(
+    path: str, timeout: Optional[float] = None, cache: Optional[ExtractionCache] = None
+) -> BatchResult:
+    """Extract one document, recording expected failures instead of raising."""
+    started = time.perf_counter()
+    try:
+        input_bytes = os.path.getsize(path)
+    except OSError as exc:
+        result = BatchResult(path, error=str(exc) or exc.__class__.__name__, error_type=exc.__class__.__name__)
+    else:
+        result = extract_source(path, path, input_bytes, timeout, cache)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def extract_source(
+    name: str,
+    source: Union[str, bytes, BinaryIO],
+    input_bytes: int,
+    timeout: Optional[float] = None,
+    cache: Optional[ExtractionCache] = None,
+) -> BatchResult:
+    """Extract ``source`` (a path, bytes or seekable file) and report it as ``name``."""
+    result = BatchResult(name, input_bytes=input_bytes)
+    started = time.perf_counter()
+    try:
+        with _deadline(timeout), DocReader(source, cache=cache) as reader:
+            result.text = reader.read_text()
+    except RECORDED_ERRORS as exc:
+        result.error = str(exc) or exc.__class__.__name__
+        result.error_type = exc.__class__.__name__
+    result.seconds = time.perf_counter() - started
+    return result
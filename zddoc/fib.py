@@ -2,16 +2,45 @@
 
 import struct
 from dataclasses import dataclass
-from typing import Final
+from typing import Dict, Final, Tuple
 
+FIB_IDENT: Final[int] = 0xA5EC
+# Word 97 and later; older nFib values use a different FIB layout.
+NFIB_WORD97: Final[int] = 0x00C1
 FC_CLX_OFFSET: Final[int] = 0x01A2
 LCB_CLX_OFFSET: Final[int] = 0x01A6
 FIB_MIN_SIZE: Final[int] = 0x01AA
+# FibRgFcLcb97: bin tables locating the character (CHPX) and paragraph (PAPX) FKPs.
+FC_PLCF_BTE_CHPX_OFFSET: Final[int] = 0x00FA
+LCB_PLCF_BTE_CHPX_OFFSET: Final[int] = 0x00FE
+FC_PLCF_BTE_PAPX_OFFSET: Final[int] = 0x0102
+LCB_PLCF_BTE_PAPX_OFFSET: Final[int] = 0x0106
+# FibRgLw97: character counts of each story, in document CP order.
+CCP_OFFSETS: Final[Dict[str, int]] = {
+    "ccpText": 0x004C,
+    "ccpFtn": 0x0050,
+    "ccpHdd": 0x0054,
+    "ccpAtn": 0x005C,
+    "ccpEdn": 0x0060,
+    "ccpTxbx": 0x0064,
+    "ccpHdrTxbx": 0x0068,
+}
+# Story names and the FIB count of each, in the order the stories follow
+# one another in CP space (the unused macro story, ccpMcr, is always empty).
+STORIES: Final[Tuple[Tuple[str, str], ...]] = (
+    ("main", "ccpText"),
+    ("footnotes", "ccpFtn"),
+    ("headers", "ccpHdd"),
+    ("comments", "ccpAtn"),
+    ("endnotes", "ccpEdn"),
+    ("textboxes", "ccpTxbx"),
+    ("header_textboxes", "ccpHdrTxbx"),
+)
 
 
 @dataclass
 class WordFIB:
-    """Minimal view of the Fib needed to locate the Piece Table."""
+    """Minimal view of the Fib: where the Piece Table and bin tables are and how long each story is."""
 
     fWhichTblStm: bool
     table_stream_name: str
@@ -19,6 +48,17 @@ class WordFIB:
     lcbClx: int
     is_encrypted: bool
     nFib: int
+    ccpText: int = 0
+    ccpFtn: int = 0
+    ccpHdd: int = 0
+    ccpAtn: int = 0
+    ccpEdn: int = 0
+    ccpTxbx: int = 0
+    ccpHdrTxbx: int = 0
+    fcPlcfBteChpx: int = 0
+    lcbPlcfBteChpx: int = 0
+    fcPlcfBtePapx: int = 0
+    lcbPlcfBtePapx: int = 0
 
     @classmethod
     def from_bytes(cls, data: bytes) -> "WordFIB":
@@ -31,4 +71,27 @@ class WordFIB:
         fcClx = struct.unpack_from("<I", data, FC_CLX_OFFSET)[0]
         lcbClx = struct.unpack_from("<I", data, LCB_CLX_OFFSET)[0]
         table_stream_name = "1Table" if fWhichTblStm else "0Table"
-        return cls(fWhichTblStm, table_stream_name, fcClx, lcbClx, is_encrypted, nFib)
+        counts = {name: struct.unpack_from("<i", data, offset)[0] for name, offset in CCP_OFFSETS.items()}
+        return cls(
+            fWhichTblStm,
+            table_stream_name,
+            fcClx,
+            lcbClx,
+            is_encrypted,
+            nFib,
+            **counts,
+            fcPlcfBteChpx=struct.unpack_from("<I", data, FC_PLCF_BTE_CHPX_OFFSET)[0],
+            lcbPlcfBteChpx=struct.unpack_from("<I", data, LCB_PLCF_BTE_CHPX_OFFSET)[0],
+            fcPlcfBtePapx=struct.unpack_from("<I", data, FC_PLCF_BTE_PAPX_OFFSET)[0],
+            lcbPlcfBtePapx=struct.unpack_from("<I", data, LCB_PLCF_BTE_PAPX_OFFSET)[0],
+        )
+
+    def story_ranges(self) -> Dict[str, Tuple[int, int]]:
+        """Return the ``[cp_start, cp_end)`` range of every story, keyed by story name."""
+        ranges = {}
+        position = 0
+        for name, field in STORIES:
+            length = max(0, getattr(self, field))
+            ranges[name] = (position, position + length)
+            position += length
+        return ranges
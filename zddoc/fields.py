@@ -0,0 +1,191 @@
+"""Streaming, nesting-aware handling of Word fields.
+
+A field is stored inline in the text as ``\\x13 instruction \\x14 result
+\\x15`` (the separator and result are optional) and fields nest freely in
+both parts: a TOC result holds HYPERLINK and PAGEREF fields, an IF
+instruction holds other fields.  :class:`FieldScanner` consumes decoded
+text chunk by chunk and passes through only what Word displays, i.e. text
+that is not inside the instruction part of any open field.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .piece_table import cp_length
+
+FIELD_BEGIN = "\x13"
+FIELD_SEPARATOR = "\x14"
+FIELD_END = "\x15"
+
+_MARKERS = re.compile("[\x13\x14\x15]")
+_QUOTED_OR_WORD = re.compile(r'"([^"]*)"|(\S+)')
+
+
+@dataclass
+class Field:
+    """One complete field: its CP range, instruction and displayed result.
+
+    ``instruction`` excludes the instructions of nested fields but includes
+    their results, which is what Word evaluates.  ``result`` is empty for
+    fields without a separator.
+    """
+
+    cp_start: int
+    cp_end: int
+    instruction: str
+    result: str
+    depth: int
+
+    @property
+    def code(self) -> str:
+        """The field type, e.g. ``HYPERLINK``, ``PAGEREF`` or ``TOC``."""
+        words = self.instruction.split(None, 1)
+        return words[0].upper() if words else ""
+
+    @property
+    def target(self) -> Optional[str]:
+        """URL of a HYPERLINK field (``#bookmark`` for ``\\l`` links), else ``None``."""
+        if self.code != "HYPERLINK":
+            return None
+        url = None
+        anchor = None
+        tokens = [quoted or word for quoted, word in _QUOTED_OR_WORD.findall(self.instruction)][1:]
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            if token.lower() == "\\l" and index + 1 < len(tokens):
+                anchor = tokens[index + 1]
+                index += 2
+                continue
+            if token.startswith("\\"):
+                # Switches such as \o "tooltip" or \t "frame" take one argument.
+                index += 2 if token.lower() in ("\\o", "\\t") else 1
+                continue
+            if url is None:
+                url = token
+            index += 1
+        if anchor is not None:
+            return (url or "") + "#" + anchor
+        return url
+
+
+@dataclass
+class _OpenField:
+    cp_start: int
+    separated: bool = False
+    instruction: List[str] = field(default_factory=list)
+    result: List[str] = field(default_factory=list)
+
+
+class FieldScanner:
+    """Drop field instructions and markers from a stream of text chunks.
+
+    Call :meth:`feed` with consecutive chunks of raw decoded text starting
+    at ``cp_start`` (characters outside the BMP count as two CPs, and
+    undecodable bytes must be kept as replacement characters so that
+    positions stay in step with CPs); each call returns the
+    displayed text of that chunk.  Work is linear in the input: chunks
+    without markers outside any field are returned as is.  With
+    ``collect=True`` every closed field is appended to :attr:`fields` as a
+    :class:`Field`; collecting buffers each field's text, so it costs memory
+    proportional to the field contents times the nesting depth.
+
+    Stray separators and end markers are ignored.
+    """
+
+    def __init__(self, collect: bool = False, cp_start: int = 0):
+        self.collect = collect
+        self.position = cp_start
+        self.fields: List[Field] = []
+        # One flag per open field: has its separator been seen?
+        self._separated: List[bool] = []
+        self._open: List[_OpenField] = []
+        self._hidden = 0
+
+    @property
+    def in_field(self) -> bool:
+        """Whether a field is open, so that text fed next may be hidden or change its result."""
+        return bool(self._separated)
+
+    def feed(self, text: str) -> str:
+        if not self._separated and FIELD_BEGIN not in text:
+            self.position += cp_length(text)
+            if FIELD_SEPARATOR in text or FIELD_END in text:
+                return _MARKERS.sub("", text)
+            return text
+        if self.collect:
+            return self._feed_collecting(text)
+        # Inlined state machine: this is the hot path for TOC-heavy documents.
+        separated = self._separated
+        hidden = self._hidden
+        output = []
+        start = 0
+        for match in _MARKERS.finditer(text):
+            index = match.start()
+            if not hidden and index > start:
+                output.append(text[start:index])
+            marker = text[index]
+            if marker == FIELD_BEGIN:
+                separated.append(False)
+                hidden += 1
+            elif separated:
+                if marker == FIELD_SEPARATOR:
+                    if not separated[-1]:
+                        separated[-1] = True
+                        hidden -= 1
+                elif not separated.pop():
+                    hidden -= 1
+            start = index + 1
+        if not hidden and start < len(text):
+            output.append(text[start:])
+        self._hidden = hidden
+        self.position += cp_length(text)
+        return "".join(output)
+
+    def _feed_collecting(self, text: str) -> str:
+        output: List[str] = []
+        start = 0
+        for match in _MARKERS.finditer(text):
+            if match.start() > start:
+                self._run(text[start : match.start()], output)
+            self._marker(match.group())
+            self.position += 1
+            start = match.end()
+        if start < len(text):
+            self._run(text[start:], output)
+        return "".join(output)
+
+    def _run(self, run: str, output: List[str]) -> None:
+        self.position += cp_length(run)
+        if not self._hidden:
+            output.append(run)
+        if self._open:
+            top = self._open[-1]
+            (top.result if top.separated else top.instruction).append(run)
+
+    def _marker(self, marker: str) -> None:
+        if marker == FIELD_BEGIN:
+            self._open.append(_OpenField(self.position))
+            self._separated.append(False)
+            self._hidden += 1
+            return
+        if not self._open:
+            return
+        top = self._open[-1]
+        if marker == FIELD_SEPARATOR:
+            if not top.separated:
+                top.separated = self._separated[-1] = True
+                self._hidden -= 1
+            return
+        self._open.pop()
+        self._separated.pop()
+        if not top.separated:
+            self._hidden -= 1
+        result = "".join(top.result)
+        self.fields.append(
+            Field(top.cp_start, self.position + 1, "".join(top.instruction).strip(), result, len(self._open))
+        )
+        if self._open and result:
+            parent = self._open[-1]
+            (parent.result if parent.separated else parent.instruction).append(result)
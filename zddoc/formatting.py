@@ -0,0 +1,266 @@
+"""Paragraph and character formatting from the FKP bin tables.
+
+Word stores formatting in 512-byte formatted disk pages (FKPs) inside the
+``WordDocument`` stream.  Each FKP maps runs of file offsets (FCs) to a
+property list: CHPX FKPs hold character properties, PAPX FKPs paragraph
+properties.  The PlcBteChpx and PlcBtePapx bin tables in the table stream
+say which FKP covers which FC range.  :class:`FkpIndex` resolves an FC to
+its run by bisecting the bin table and then the page, decoding pages on
+first use and keeping only a few of them in an LRU cache.
+"""
+
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Generic, Iterator, List, Tuple, TypeVar
+
+FKP_SIZE = 512
+# Decoded FKPs kept per bin table (least recently used are dropped).
+FKP_CACHE_PAGES = 32
+# Paragraphs without a style use Normal; runs without one use Default Paragraph Font.
+DEFAULT_PARAGRAPH_STYLE = 0
+DEFAULT_CHARACTER_STYLE = 10
+
+SPRM_C_F_BOLD = 0x0835
+SPRM_C_F_ITALIC = 0x0836
+SPRM_C_ISTD = 0x4A30
+# Operand sizes by the spra field (bits 13-15) of a sprm; 0 marks a variable-length operand.
+_SPRA_OPERAND_SIZES = (1, 1, 2, 4, 2, 2, 0, 3)
+_SPRM_T_DEF_TABLE = 0xD608
+_SPRM_P_CHG_TABS = 0xC615
+# PAPX FKPs follow each FC with a 13-byte BxPap whose first byte locates the properties.
+_BX_PAP_SIZE = 13
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RunProperties:
+    """The character properties zddoc decodes for a run of text.
+
+    ``bold`` and ``italic`` reflect direct formatting only: values that
+    defer to the style count as off, toggles relative to it as on.
+    """
+
+    bold: bool = False
+    italic: bool = False
+    style_index: int = DEFAULT_CHARACTER_STYLE
+
+
+@dataclass
+class Run:
+    """Consecutive characters of one paragraph sharing :class:`RunProperties`."""
+
+    cp_start: int
+    cp_end: int
+    text: str
+    properties: RunProperties
+
+    @property
+    def bold(self) -> bool:
+        return self.properties.bold
+
+    @property
+    def italic(self) -> bool:
+        return self.properties.italic
+
+    @property
+    def style_index(self) -> int:
+        return self.properties.style_index
+
+
+@dataclass
+class Paragraph:
+    """One paragraph: its CP range (including the paragraph mark), style and runs.
+
+    ``style_index`` is the paragraph style's index (istd) in the style
+    sheet; 0 is Normal and Word's built-in headings are 1 to 9.
+    """
+
+    cp_start: int
+    cp_end: int
+    style_index: int
+    runs: List[Run] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """The displayed text without the paragraph mark."""
+        return "".join(run.text for run in self.runs)
+
+
+def iter_sprms(grpprl) -> Iterator[Tuple[int, bytes]]:
+    """Yield ``(sprm, operand)`` for each property modifier in ``grpprl``."""
+    data = bytes(grpprl)
+    position = 0
+    end = len(data)
+    while position + 2 <= end:
+        sprm = data[position] | data[position + 1] << 8
+        position += 2
+        size = _SPRA_OPERAND_SIZES[sprm >> 13]
+        if not size:
+            if sprm == _SPRM_T_DEF_TABLE and position + 2 <= end:
+                size = (data[position] | data[position + 1] << 8) + 1
+            elif position < end:
+                size = data[position] + 1
+                if sprm == _SPRM_P_CHG_TABS and data[position] == 255:
+                    # The real size is spread over the deleted and added tab lists.
+                    deleted = data[position + 1] if position + 1 < end else 0
+                    added_at = position + 2 + deleted * 4
+                    added = data[added_at] if added_at < end else 0
+                    size = 2 + deleted * 4 + 1 + added * 3
+            else:
+                return
+        if position + size > end:
+            return
+        yield sprm, data[position : position + size]
+        position += size
+
+
+def _toggle(operand: bytes) -> bool:
+    # 0 off, 1 on, 0x80 as in the style, 0x81 the opposite of the style.
+    return operand[0] in (1, 0x81)
+
+
+def run_properties(grpprl) -> RunProperties:
+    """Decode bold, italic and the character style from a CHPX property list."""
+    bold = italic = False
+    style_index = DEFAULT_CHARACTER_STYLE
+    for sprm, operand in iter_sprms(grpprl):
+        if sprm == SPRM_C_F_BOLD:
+            bold = _toggle(operand)
+        elif sprm == SPRM_C_F_ITALIC:
+            italic = _toggle(operand)
+        elif sprm == SPRM_C_ISTD:
+            style_index = struct.unpack_from("<H", operand)[0]
+    return RunProperties(bold, italic, style_index)
+
+
+def _unpack_u32(data) -> array:
+    values = array("I")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _decode_chpx_page(page: bytes) -> Tuple[array, List[RunProperties]]:
+    crun = page[FKP_SIZE - 1]
+    rgb_start = 4 * (crun + 1)
+    if rgb_start + crun > FKP_SIZE - 1:
+        raise ValueError("CHPX FKP is malformed")
+    fcs = _unpack_u32(page[:rgb_start])
+    values = []
+    default = RunProperties()
+    for word_offset in page[rgb_start : rgb_start + crun]:
+        offset = word_offset * 2
+        if not offset:
+            values.append(default)
+            continue
+        size = page[offset]
+        values.append(run_properties(page[offset + 1 : offset + 1 + size]))
+    return fcs, values
+
+
+def _decode_papx_page(page: bytes) -> Tuple[array, List[int]]:
+    cpara = page[FKP_SIZE - 1]
+    bx_start = 4 * (cpara + 1)
+    if bx_start + _BX_PAP_SIZE * cpara > FKP_SIZE - 1:
+        raise ValueError("PAPX FKP is malformed")
+    fcs = _unpack_u32(page[:bx_start])
+    values = []
+    for index in range(cpara):
+        offset = page[bx_start + index * _BX_PAP_SIZE] * 2
+        if not offset:
+            values.append(DEFAULT_PARAGRAPH_STYLE)
+            continue
+        # PapxInFkp: cb, or 0 followed by cb' for longer lists; GrpPrlAndIstd starts with the istd.
+        start = offset + 1 if page[offset] else offset + 2
+        istd = page[start : start + 2]
+        values.append(istd[0] | istd[1] << 8 if len(istd) == 2 else DEFAULT_PARAGRAPH_STYLE)
+    return fcs, values
+
+
+class FkpIndex(Generic[T]):
+    """A PlcBte bin table plus an LRU cache of the FKPs it points to.
+
+    ``read_page(pn)`` returns the 512 bytes of FKP number ``pn`` (at offset
+    ``pn * 512`` of the ``WordDocument`` stream) and ``decode`` turns them
+    into the page's FC boundaries and one value per run.  FCs no run covers
+    resolve to ``default``.
+    """
+
+    def __init__(
+        self,
+        plc: bytes,
+        read_page: Callable[[int], bytes],
+        decode: Callable[[bytes], Tuple[array, List[T]]],
+        default: T,
+    ):
+        count = (len(plc) - 4) // 8 if len(plc) >= 4 else 0
+        if len(plc) != count * 8 + 4 and plc:
+            raise ValueError("bin table is malformed")
+        self._fcs = _unpack_u32(plc[: 4 * (count + 1)]) if count else array("I")
+        self._pns = array("I", (pn & 0x3FFFFF for pn in _unpack_u32(plc[4 * (count + 1) :])))
+        self._read_page = read_page
+        self._decode = decode
+        self.default = default
+        self._pages: "OrderedDict[int, Tuple[array, List[T]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._pns)
+
+    def page(self, index: int) -> Tuple[array, List[T]]:
+        """Decoded FKP ``index`` of the bin table, from the cache when possible."""
+        page = self._pages.get(index)
+        if page is not None:
+            self._pages.move_to_end(index)
+            return page
+        page = self._decode(self._read_page(self._pns[index]))
+        self._pages[index] = page
+        if len(self._pages) > FKP_CACHE_PAGES:
+            self._pages.popitem(last=False)
+        return page
+
+    def lookup(self, fc: int) -> Tuple[int, T]:
+        """Return ``(fc_end, value)`` for the run containing ``fc``.
+
+        ``fc_end`` is where the run stops (``sys.maxsize`` past the last
+        run), so callers can step from run to run.
+        """
+        fcs = self._fcs
+        index = bisect_right(fcs, fc) - 1
+        if index < 0:
+            return (fcs[0] if fcs else sys.maxsize), self.default
+        if index >= len(self._pns):
+            return sys.maxsize, self.default
+        page_fcs, values = self.page(index)
+        slot = bisect_right(page_fcs, fc) - 1
+        if slot < 0:
+            return page_fcs[0], self.default
+        if slot >= len(values):
+            return fcs[index + 1], self.default
+        return page_fcs[slot + 1], values[slot]
+
+
+def _page_reader(word_stream: BinaryIO) -> Callable[[int], bytes]:
+    def read_page(pn: int) -> bytes:
+        word_stream.seek(pn * FKP_SIZE)
+        page = word_stream.read(FKP_SIZE)
+        if len(page) != FKP_SIZE:
+            raise ValueError(f"FKP {pn} is truncated")
+        return page
+
+    return read_page
+
+
+def character_index(plc: bytes, word_stream: BinaryIO) -> "FkpIndex[RunProperties]":
+    """Index the CHPX FKPs listed by a PlcBteChpx."""
+    return FkpIndex(plc, _page_reader(word_stream), _decode_chpx_page, RunProperties())
+
+
+def paragraph_index(plc: bytes, word_stream: BinaryIO) -> "FkpIndex[int]":
+    """Index the PAPX FKPs listed by a PlcBtePapx; values are paragraph style indexes."""
+    return FkpIndex(plc, _page_reader(word_stream), _decode_papx_page, DEFAULT_PARAGRAPH_STYLE)
@@ -0,0 +1,290 @@
+"""Incremental re-extraction between versions of one document.
+
+Word's fast save appends new text to the ``WordDocument`` stream and
+writes a new piece table; the text that did not change keeps its file
+offset and is only re-cut into pieces around each edit.  An
+:class:`ExtractionSnapshot` records, for every piece of a previous
+extraction, its CP range, file offset, a hash of its bytes and its text.
+:func:`reextract` matches the new piece table against it: a new piece
+lying inside an old piece at the same offset reuses a slice of that
+piece's text, and only the remaining pieces are decoded.  Most pieces are
+stored already normalized, so their slices are spliced into the output
+without being scanned for fields or normalized again.  The result also
+lists the CP ranges that changed, so callers can re-index just those.
+
+An old piece is trusted when its bytes still hash to the recorded digest.
+``sample=True`` trades that for speed: a piece is trusted once its first
+and last characters still match its text, so an edit that keeps its offset
+and length in the middle of a piece goes unnoticed.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass, field, replace
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .fields import FieldScanner
+from .limits import DEFAULT_LIMITS, Limits
+from .piece_table import PieceFingerprint, PieceSegment, coalesce_segments, piece_digest
+
+SNAPSHOT_VERSION = 2
+# Characters compared at each end of an old piece when sampling.
+SAMPLE_CHARS = 16
+# Pieces holding none of these are stored normalized: the mapping can be undone.
+_NOT_PLAIN = "\x13\x14\x15\n\x0c"
+
+
+@dataclass
+class ExtractionSnapshot:
+    """Per-piece fingerprints and text of one extraction.
+
+    When ``plain[i]`` is set, ``texts[i]`` is the normalized text of piece
+    ``i``: the piece has one character per CP and no field characters,
+    ``\n`` or ``\x0c``, so normalizing maps it one to one and only turns
+    ``\r`` into ``\n``.  Otherwise ``texts[i]`` is the raw decoded text.
+    Pieces cut out of an old piece while sampling have an empty digest.
+
+    Keep it next to the extracted text and pass it to the next re-extraction;
+    :meth:`to_dict` and :meth:`from_dict` convert it to and from JSON-friendly
+    values.
+    """
+
+    pieces: List[PieceFingerprint] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    plain: List[bool] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "pieces": [
+                [piece.cp_start, piece.cp_end, piece.offset, piece.encoding, piece.byte_length, piece.digest.hex()]
+                for piece in self.pieces
+            ],
+            "texts": list(self.texts),
+            "plain": list(self.plain),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "ExtractionSnapshot":
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {data.get('version')!r}")
+        pieces = [
+            PieceFingerprint(cp_start, cp_end, offset, encoding, byte_length, bytes.fromhex(digest))
+            for cp_start, cp_end, offset, encoding, byte_length, digest in data["pieces"]
+        ]
+        texts = list(data["texts"])
+        plain = [bool(flag) for flag in data["plain"]]
+        if not len(pieces) == len(texts) == len(plain):
+            raise ValueError("snapshot has a different number of pieces and texts")
+        return cls(pieces, texts, plain)
+
+
+@dataclass(frozen=True)
+class ChangedRange:
+    """CPs ``[cp_start, cp_end)`` of the new version replaced ``[old_cp_start, old_cp_end)`` of the old one.
+
+    Either range may be empty: pure insertions have ``old_cp_start ==
+    old_cp_end`` and pure deletions ``cp_start == cp_end``.
+    """
+
+    cp_start: int
+    cp_end: int
+    old_cp_start: int
+    old_cp_end: int
+
+
+@dataclass
+class IncrementalResult:
+    """Text of the new version, what changed, and the snapshot for the next round."""
+
+    text: str
+    changes: List[ChangedRange]
+    snapshot: ExtractionSnapshot
+    decoded_chars: int = 0
+    reused_chars: int = 0
+
+
+def _width(encoding: str) -> int:
+    return 1 if encoding == "cp1252" else 2
+
+
+class _PreviousPieces:
+    """The old pieces indexed by file offset, checked against the stream on first use."""
+
+    def __init__(self, snapshot: ExtractionSnapshot, stream: BinaryIO, normalize: Callable[[str], str], sample: bool):
+        self._snapshot = snapshot
+        self._stream = stream
+        self._normalize = normalize
+        self._sample = sample
+        self._order = sorted(range(len(snapshot.pieces)), key=lambda index: snapshot.pieces[index].offset)
+        self._offsets = [snapshot.pieces[index].offset for index in self._order]
+        self._unchanged: Dict[int, bool] = {}
+        # Bytes of the most recently hashed piece: the pieces split off one old piece usually follow each other.
+        self._cached: Tuple[int, bytes] = (-1, b"")
+
+    def containing(self, segment: PieceSegment) -> Optional[int]:
+        """Index of an old piece whose bytes cover all of ``segment``."""
+        position = bisect_right(self._offsets, segment.offset) - 1
+        if position < 0:
+            return None
+        index = self._order[position]
+        piece = self._snapshot.pieces[index]
+        if piece.encoding != segment.encoding:
+            return None
+        start = segment.offset - piece.offset
+        if start + segment.byte_length > piece.byte_length or start % _width(piece.encoding):
+            return None
+        return index
+
+    def unchanged(self, index: int) -> bool:
+        """Whether old piece ``index`` still holds the bytes its text was decoded from."""
+        if index not in self._unchanged:
+            self._unchanged[index] = self._check(index)
+        return self._unchanged[index]
+
+    def _check(self, index: int) -> bool:
+        piece = self._snapshot.pieces[index]
+        text = self._snapshot.texts[index]
+        if not self._sample or len(text) != piece.cp_end - piece.cp_start:
+            # Text that does not index by CP cannot be sampled; it is decoded again from these bytes.
+            if not piece.digest:
+                return False
+            data = _read(self._stream, piece.offset, piece.byte_length)
+            if piece_digest(data) != piece.digest:
+                return False
+            self._cached = (index, data)
+            return True
+        width = _width(piece.encoding)
+        count = min(SAMPLE_CHARS, len(text))
+        for start in {0, len(text) - count}:
+            sample = str(_read(self._stream, piece.offset + start * width, count * width), piece.encoding, "ignore")
+            if self._snapshot.plain[index]:
+                sample = self._normalize(sample)
+            if sample != text[start : start + count]:
+                return False
+        return True
+
+    def segment_bytes(self, index: int, segment: PieceSegment) -> bytes:
+        """The bytes of ``segment``, which lies inside old piece ``index``."""
+        if self._cached[0] == index:
+            start = segment.offset - self._snapshot.pieces[index].offset
+            return self._cached[1][start : start + segment.byte_length]
+        return _read(self._stream, segment.offset, segment.byte_length)
+
+
+def _read(stream: BinaryIO, offset: int, size: int) -> bytes:
+    stream.seek(offset)
+    return stream.read(size)
+
+
+def _old_text(snapshot: ExtractionSnapshot, index: int, segment: PieceSegment) -> Optional[str]:
+    """Slice ``segment`` out of old piece ``index``'s text, when characters map one to one to CPs."""
+    piece = snapshot.pieces[index]
+    text = snapshot.texts[index]
+    if len(text) != piece.cp_end - piece.cp_start:
+        # Undecodable bytes were dropped or surrogate pairs joined; CPs no longer index the text.
+        return None
+    start = (segment.offset - piece.offset) // _width(piece.encoding)
+    return text[start : start + segment.cp_end - segment.cp_start]
+
+
+class _Output:
+    """Join piece texts into the displayed, normalized document text."""
+
+    def __init__(self, normalize: Callable[[str], str], scanner: Optional[FieldScanner]):
+        self._normalize = normalize
+        self._scanner = scanner
+        self._parts: List[str] = []
+        # The displayed text so far ends with a \r, which a leading \n of the next piece joins.
+        self._after_cr = False
+
+    def add(self, text: str, plain: bool, cps: int) -> Tuple[str, bool]:
+        """Append one piece (normalized if ``plain``, else raw); return what to store for it."""
+        # One substring test per character is much faster than a regular expression here.
+        if not plain and len(text) == cps and not any(char in text for char in _NOT_PLAIN):
+            text, plain = self._normalize(text), True
+        if plain and (self._scanner is None or not self._scanner.in_field):
+            # Displayed as it is, and it cannot start with the \n of a \r\n pair.
+            if text:
+                self._parts.append(text)
+                self._after_cr = text[-1] == "\n"
+            return text, plain
+        raw = text.replace("\n", "\r") if plain else text
+        displayed = raw if self._scanner is None else self._scanner.feed(raw)
+        if self._after_cr and displayed.startswith("\n"):
+            displayed = displayed[1:]
+            self._after_cr = False
+        if displayed:
+            self._after_cr = displayed[-1] == "\r"
+            self._parts.append(self._normalize(displayed))
+        return text, plain
+
+    def text(self) -> str:
+        return "".join(self._parts)
+
+
+def reextract(
+    segments: Iterable[PieceSegment],
+    stream: BinaryIO,
+    normalize: Callable[[str], str],
+    previous: Optional[ExtractionSnapshot] = None,
+    scanner: Optional[FieldScanner] = None,
+    limits: Limits = DEFAULT_LIMITS,
+    sample: bool = False,
+) -> IncrementalResult:
+    """Extract ``segments`` (the pieces of the new version, in CP order) reusing ``previous``.
+
+    ``normalize`` maps raw text to output text as ``DocReader`` does, and
+    ``scanner`` drops field instructions (``None`` keeps them).  Old pieces
+    are checked by hashing their bytes in ``stream``; old pieces with an
+    empty digest count as changed.  With ``sample`` only the first and last
+    characters of each old piece are compared.
+    """
+    previous = previous or ExtractionSnapshot()
+    old = _PreviousPieces(previous, stream, normalize, sample)
+    output = _Output(normalize, scanner)
+    snapshot = ExtractionSnapshot()
+    changes: List[ChangedRange] = []
+    decoded = reused = planned = 0
+    # End of the last stretch that is equal in both versions, as (old CP, new CP).
+    old_end = new_end = 0
+    # Merged like DocReader merges them, so that a surrogate pair split between two pieces decodes the same.
+    for segment in coalesce_segments(segments):
+        length = segment.cp_end - segment.cp_start
+        planned += length
+        limits.check("max_output_chars", planned)
+        index = old.containing(segment)
+        if index is None or not old.unchanged(index):
+            data = _read(stream, segment.offset, segment.byte_length)
+            text, plain = str(data, segment.encoding, "ignore"), False
+            decoded += length
+            fingerprint = PieceFingerprint.of(segment, data)
+        else:
+            piece = previous.pieces[index]
+            text, plain, data = _old_text(previous, index, segment), previous.plain[index], None
+            if text is None:
+                data = old.segment_bytes(index, segment)
+                text = str(data, segment.encoding, "ignore")
+            reused += length
+            old_start = piece.cp_start + (segment.offset - piece.offset) // _width(piece.encoding)
+            # Text moved before earlier unchanged text counts as changed.
+            if old_start >= old_end:
+                if (old_start, segment.cp_start) != (old_end, new_end):
+                    changes.append(ChangedRange(new_end, segment.cp_start, old_end, old_start))
+                old_end, new_end = old_start + length, segment.cp_end
+            if (segment.offset, segment.byte_length) == (piece.offset, piece.byte_length):
+                fingerprint = replace(piece, cp_start=segment.cp_start, cp_end=segment.cp_end)
+            elif not sample:
+                fingerprint = PieceFingerprint.of(segment, data or old.segment_bytes(index, segment))
+            else:
+                fingerprint = PieceFingerprint(
+                    segment.cp_start, segment.cp_end, segment.offset, segment.encoding, segment.byte_length, b""
+                )
+        text, plain = output.add(text, plain, length)
+        snapshot.pieces.append(fingerprint)
+        snapshot.texts.append(text)
+        snapshot.plain.append(plain)
+    old_total = previous.pieces[-1].cp_end if previous.pieces else 0
+    new_total = snapshot.pieces[-1].cp_end if snapshot.pieces else 0
+    if (old_end, new_end) != (old_total, new_total):
+        changes.append(ChangedRange(new_end, new_total, old_end, old_total))
+    return IncrementalResult(output.text(), changes, snapshot, decoded, reused)
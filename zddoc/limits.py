@@ -0,0 +1,44 @@
+"""Resource limits for parsing untrusted documents.
+
+Structural problems (cyclic FAT chains, sizes pointing past the end of the
+file) are always rejected with :class:`~zddoc.cfbf.DocFormatError`.  The
+limits here bound the work a structurally valid but hostile document can
+cause; exceeding one raises :class:`LimitExceededError`.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+class LimitExceededError(Exception):
+    """Raised when a document exceeds one of the configured :class:`Limits`."""
+
+    def __init__(self, limit: str, value: int, maximum: int):
+        super().__init__(f"{limit} exceeded: {value} > {maximum}")
+        self.limit = limit
+        self.value = value
+        self.maximum = maximum
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Upper bounds applied while parsing; ``None`` disables a limit.
+
+    ``max_stream_bytes`` caps the size of any stream that is opened,
+    ``max_pieces`` the number of piece-table entries and
+    ``max_output_chars`` the number of characters decoded per call.
+    """
+
+    max_stream_bytes: Optional[int] = 512 * 1024 * 1024
+    max_pieces: Optional[int] = 1 << 20
+    max_output_chars: Optional[int] = 256 * 1024 * 1024
+
+    def check(self, limit: str, value: int) -> None:
+        """Raise :class:`LimitExceededError` when ``value`` is over ``limit``."""
+        maximum = getattr(self, limit)
+        if maximum is not None and value > maximum:
+            raise LimitExceededError(limit, value, maximum)
+
+
+DEFAULT_LIMITS = Limits()
+UNLIMITED = Limits(None, None, None)
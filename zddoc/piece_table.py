@@ -1,12 +1,19 @@
 """Decodes the Piece Table (PlcPcd) to enumerate document segments."""
 
+import hashlib
 import io
 import struct
-from dataclasses import dataclass
-from typing import Iterable, List
+import sys
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
 
+from .limits import DEFAULT_LIMITS, Limits
 
-@dataclass
+
+@dataclass(slots=True)
 class PieceSegment:
     cp_start: int
     cp_end: int
@@ -15,13 +22,103 @@ class PieceSegment:
     byte_length: int
 
 
+def cp_length(text: str) -> int:
+    """CPs ``text`` covers in a piece: characters outside the BMP are two UTF-16 code units."""
+    if text.isascii() or max(text) <= "\uffff":
+        return len(text)
+    return len(text) + sum(1 for char in text if char > "\uffff")
+
+
+def piece_digest(data) -> bytes:
+    """Hash of a piece's bytes, as stored in :class:`PieceFingerprint`."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+@dataclass(frozen=True)
+class PieceFingerprint:
+    """Where a piece's text lives and a hash of its bytes, to tell whether it changed."""
+
+    cp_start: int
+    cp_end: int
+    offset: int
+    encoding: str
+    byte_length: int
+    digest: bytes
+
+    @classmethod
+    def of(cls, segment: PieceSegment, data) -> "PieceFingerprint":
+        """Fingerprint ``segment`` given its bytes ``data``."""
+        return cls(
+            segment.cp_start, segment.cp_end, segment.offset, segment.encoding, segment.byte_length, piece_digest(data)
+        )
+
+
+def coalesce_segments(segments: Iterable[PieceSegment]) -> Iterator[PieceSegment]:
+    """Merge consecutive pieces that are also contiguous in the file and share an encoding."""
+    pending = None
+    for segment in segments:
+        if (
+            pending is not None
+            and segment.encoding == pending.encoding
+            and segment.cp_start == pending.cp_end
+            and segment.offset == pending.offset + pending.byte_length
+        ):
+            pending = PieceSegment(
+                pending.cp_start,
+                segment.cp_end,
+                pending.offset,
+                pending.encoding,
+                pending.byte_length + segment.byte_length,
+            )
+            continue
+        if pending is not None:
+            yield pending
+        pending = segment
+    if pending is not None:
+        yield pending
+
+
+def _unpack_u32(data) -> array:
+    """Decode little-endian unsigned 32-bit integers into an array."""
+    values = array("I")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
 class PieceTable:
-    """Translates the CLX/Pcdt into text segments."""
+    """Translates the CLX/Pcdt into text segments.
 
-    def __init__(self, table_stream: bytes, fc_clx: int, lcb_clx: int):
+    Pieces are stored column-wise: ``array('I')`` columns for the first CP,
+    the character count and the file offset of each piece, plus a bitmap of
+    compressed (cp1252) pieces.  That keeps tables with hundreds of
+    thousands of pieces small; :meth:`segments` materializes
+    :class:`PieceSegment` objects lazily on top of the columns.
+
+    Tables with more than ``limits.max_pieces`` entries raise
+    :class:`~zddoc.limits.LimitExceededError` before anything is allocated.
+    """
+
+    def __init__(self, table_stream: bytes, fc_clx: int, lcb_clx: int, limits: Optional[Limits] = None):
         self._table = table_stream
+        self._limits = DEFAULT_LIMITS if limits is None else limits
         self._clx = self._extract_clx(self._table, fc_clx, lcb_clx)
-        self._segments = self._parse()
+        self._cp_starts, self._lengths, self._offsets, self._compressed = self._parse()
+
+    @classmethod
+    def from_stream(
+        cls, table_stream: BinaryIO, fc_clx: int, lcb_clx: int, limits: Optional[Limits] = None
+    ) -> "PieceTable":
+        """Build the table reading only the CLX bytes from a seekable stream."""
+        # Check against the stream size first so a bogus lcbClx cannot size the read buffer.
+        if fc_clx < 0 or fc_clx + lcb_clx > table_stream.seek(0, io.SEEK_END):
+            raise ValueError("Table stream is too short for CLX")
+        table_stream.seek(fc_clx)
+        clx = table_stream.read(lcb_clx)
+        if len(clx) != lcb_clx:
+            raise ValueError("Table stream is too short for CLX")
+        return cls(clx, 0, lcb_clx, limits)
 
     @staticmethod
     def _extract_clx(table_stream: bytes, fc_clx: int, lcb_clx: int) -> bytes:
@@ -30,39 +127,107 @@ class PieceTable:
             raise ValueError("Table stream is too short for CLX")
         return table_stream[fc_clx:end]
 
-    def _parse(self) -> List[PieceSegment]:
+    def _parse(self) -> Tuple[array, array, array, bytearray]:
         marker = b"\x02"
         idx = self._clx.find(marker)
         if idx == -1 or idx + 5 > len(self._clx):
             raise ValueError("Pcdt header missing in CLX")
         length = struct.unpack_from("<I", self._clx, idx + 1)[0]
         start = idx + 5
-        plc = self._clx[start : start + length]
+        plc = memoryview(self._clx)[start : start + length]
         if len(plc) < 4 or (len(plc) - 4) % 12 != 0:
             raise ValueError("PlcPcd is malformed")
         count = (len(plc) - 4) // 12
-        cp_values = struct.unpack_from(f"<{count + 1}I", plc, 0)
+        self._limits.check("max_pieces", count)
+        cp_values = _unpack_u32(plc[: 4 * (count + 1)])
         pcds = plc[4 * (count + 1) :]
         if len(pcds) != count * 8:
             raise ValueError("Pcd array size mismatch")
-        segments: List[PieceSegment] = []
-        for i in range(count):
-            cp_start = cp_values[i]
-            cp_end = cp_values[i + 1]
-            if cp_end <= cp_start:
-                continue
-            pcd_offset = i * 8
-            fc_raw = struct.unpack_from("<H I H", pcds, pcd_offset)[1]
-            is_compressed = bool(fc_raw & 0x40000000)
-            fc_value = fc_raw & 0x3FFFFFFF
-            file_offset = fc_value // 2 if is_compressed else fc_value
-            char_count = cp_end - cp_start
-            byte_length = char_count if is_compressed else char_count * 2
-            encoding = "cp1252" if is_compressed else "utf-16le"
-            segments.append(
-                PieceSegment(cp_start, cp_end, file_offset, encoding, byte_length)
-            )
-        return segments
+        cp_starts = array("I")
+        lengths = array("I")
+        offsets = array("I")
+        compressed = bytearray((count + 7) // 8)
+        add_start, add_length, add_offset = cp_starts.append, lengths.append, offsets.append
+        kept = 0
+        cp_start = cp_values[0] if count else 0
+        for (fc_raw,), cp_end in zip(struct.iter_unpack("<2xI2x", pcds), islice(cp_values, 1, None)):
+            if cp_end > cp_start:
+                add_start(cp_start)
+                add_length(cp_end - cp_start)
+                if fc_raw & 0x40000000:
+                    add_offset((fc_raw & 0x3FFFFFFF) >> 1)
+                    compressed[kept >> 3] |= 1 << (kept & 7)
+                else:
+                    add_offset(fc_raw & 0x3FFFFFFF)
+                kept += 1
+            cp_start = cp_end
+        del compressed[(kept + 7) // 8 :]
+        return cp_starts, lengths, offsets, compressed
+
+    def is_compressed(self, index: int) -> bool:
+        """True when piece ``index`` is stored as 8-bit cp1252 text."""
+        return bool(self._compressed[index >> 3] & (1 << (index & 7)))
+
+    def segment(self, index: int) -> PieceSegment:
+        """Return piece ``index`` (in CP order) as a :class:`PieceSegment`."""
+        cp_start = self._cp_starts[index]
+        length = self._lengths[index]
+        if self.is_compressed(index):
+            return PieceSegment(cp_start, cp_start + length, self._offsets[index], "cp1252", length)
+        return PieceSegment(cp_start, cp_start + length, self._offsets[index], "utf-16le", length * 2)
 
     def segments(self) -> Iterable[PieceSegment]:
-        return iter(self._segments)
+        return map(self.segment, range(len(self._cp_starts)))
+
+    def __len__(self) -> int:
+        return len(self._cp_starts)
+
+    def fingerprints(self, word_stream: BinaryIO) -> List[PieceFingerprint]:
+        """Fingerprint every piece (merged as :func:`coalesce_segments` does), reading the ``WordDocument`` stream."""
+        fingerprints = []
+        for segment in coalesce_segments(self.segments()):
+            word_stream.seek(segment.offset)
+            fingerprints.append(PieceFingerprint.of(segment, word_stream.read(segment.byte_length)))
+        return fingerprints
+
+    @property
+    def char_count(self) -> int:
+        """Number of character positions covered by the table."""
+        return self._cp_starts[-1] + self._lengths[-1] if self._cp_starts else 0
+
+    def piece_index(self, cp: int) -> int:
+        """Return the index of the piece containing ``cp``, by bisect over the CP column.
+
+        Raises ``IndexError`` when no piece covers ``cp``.
+        """
+        index = bisect_right(self._cp_starts, cp) - 1
+        if index < 0 or cp >= self._cp_starts[index] + self._lengths[index]:
+            raise IndexError(f"CP {cp} is not covered by the piece table")
+        return index
+
+    def segments_in_range(self, cp_start: int, cp_end: int) -> Iterator[PieceSegment]:
+        """Yield the pieces overlapping ``[cp_start, cp_end)``, clipped to that range.
+
+        The first piece is located with a bisect over the CP boundaries, so
+        only the overlapping pieces are visited.
+        """
+        index = max(0, bisect_right(self._cp_starts, cp_start) - 1)
+        for index in range(index, len(self._cp_starts)):
+            if self._cp_starts[index] >= cp_end:
+                break
+            segment = self.segment(index)
+            if segment.cp_end <= cp_start:
+                continue
+            start = max(cp_start, segment.cp_start)
+            end = min(cp_end, segment.cp_end)
+            if start == segment.cp_start and end == segment.cp_end:
+                yield segment
+                continue
+            char_width = 1 if segment.encoding == "cp1252" else 2
+            yield replace(
+                segment,
+                cp_start=start,
+                cp_end=end,
+                offset=segment.offset + (start - segment.cp_start) * char_width,
+                byte_length=(end - start) * char_width,
+            )
@@ -0,0 +1,68 @@
+"""Cheap sniffing of .doc files: validity, encryption, version and size."""
+
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from .cfbf import CFBFReader, DocFormatError, MissingStreamError
+from .fib import FIB_IDENT, FIB_MIN_SIZE, NFIB_WORD97, WordFIB
+from .limits import LimitExceededError
+
+
+@dataclass
+class ProbeResult:
+    """What :func:`probe` learned about one file.
+
+    ``reason`` explains why ``valid`` is false; the FIB fields are ``None``
+    when the file is not a readable Word document.  ``text_chars`` is the
+    main-document character count and ``total_chars`` adds footnotes,
+    headers, comments, endnotes and textboxes, both as recorded in the FIB.
+    """
+
+    valid: bool
+    reason: Optional[str] = None
+    is_encrypted: Optional[bool] = None
+    nFib: Optional[int] = None
+    table_stream_name: Optional[str] = None
+    text_chars: Optional[int] = None
+    total_chars: Optional[int] = None
+
+    @property
+    def supported(self) -> bool:
+        """True when :class:`~zddoc.reader.DocReader` is expected to extract text."""
+        return self.valid and not self.is_encrypted and (self.nFib or 0) >= NFIB_WORD97
+
+
+def probe(source: Union[str, Path, BinaryIO, bytes]) -> ProbeResult:
+    """Sniff ``source`` without loading the FAT or decoding any text.
+
+    Reads the container header, the DIFAT, the directory sectors (plus the
+    FAT sectors that link them) and the first FIB sector of
+    ``WordDocument``; :class:`~zddoc.cfbf.CFBFReader` resolves FAT links one
+    page at a time, so nothing else is touched.  Malformed input yields ``valid=False``
+    with a ``reason`` instead of raising; I/O errors such as a missing file
+    still propagate.
+    """
+    try:
+        reader = CFBFReader(source)
+    except (DocFormatError, LimitExceededError) as exc:
+        return ProbeResult(False, str(exc))
+    try:
+        head = reader.open_stream("WordDocument", lazy=True).read(FIB_MIN_SIZE)
+        if len(head) < 2 or struct.unpack_from("<H", head, 0)[0] != FIB_IDENT:
+            return ProbeResult(False, "WordDocument does not start with a FIB")
+        fib = WordFIB.from_bytes(head)
+    except (DocFormatError, MissingStreamError, LimitExceededError, ValueError, struct.error) as exc:
+        return ProbeResult(False, str(exc))
+    finally:
+        reader.close()
+    stories = (fib.ccpText, fib.ccpFtn, fib.ccpHdd, fib.ccpAtn, fib.ccpEdn, fib.ccpTxbx, fib.ccpHdrTxbx)
+    return ProbeResult(
+        valid=True,
+        is_encrypted=fib.is_encrypted,
+        nFib=fib.nFib,
+        table_stream_name=fib.table_stream_name,
+        text_chars=fib.ccpText,
+        total_chars=sum(max(0, count) for count in stories),
+    )
@@ -0,0 +1,224 @@
+"""Reads document metadata from the OLE property-set streams (MS-OLEPS)."""
+
+import codecs
+import struct
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from .cfbf import CFBFReader, DocFormatError, MissingStreamError
+
+SUMMARY_INFORMATION = "\x05SummaryInformation"
+DOCUMENT_SUMMARY_INFORMATION = "\x05DocumentSummaryInformation"
+
+PID_CODEPAGE = 0x0001
+
+VT_I2 = 0x0002
+VT_I4 = 0x0003
+VT_R4 = 0x0004
+VT_R8 = 0x0005
+VT_BOOL = 0x000B
+VT_UI2 = 0x0012
+VT_UI4 = 0x0013
+VT_I8 = 0x0014
+VT_UI8 = 0x0015
+VT_INT = 0x0016
+VT_UINT = 0x0017
+VT_LPSTR = 0x001E
+VT_LPWSTR = 0x001F
+VT_FILETIME = 0x0040
+
+_FIXED_TYPES = {
+    VT_I2: "<h",
+    VT_I4: "<i",
+    VT_R4: "<f",
+    VT_R8: "<d",
+    VT_UI2: "<H",
+    VT_UI4: "<I",
+    VT_I8: "<q",
+    VT_UI8: "<Q",
+    VT_INT: "<i",
+    VT_UINT: "<I",
+}
+_FILETIME_EPOCH = datetime(1601, 1, 1, tzinfo=timezone.utc)
+
+# Property identifiers of the SummaryInformation set.
+_SUMMARY_FIELDS = {
+    0x02: "title",
+    0x03: "subject",
+    0x04: "author",
+    0x05: "keywords",
+    0x06: "comments",
+    0x07: "template",
+    0x08: "last_author",
+    0x09: "revision",
+    0x0A: "edit_time",
+    0x0B: "last_printed",
+    0x0C: "created",
+    0x0D: "last_saved",
+    0x0E: "page_count",
+    0x0F: "word_count",
+    0x10: "char_count",
+    0x12: "application",
+    0x13: "security",
+}
+# Property identifiers of the DocumentSummaryInformation set.
+_DOCUMENT_SUMMARY_FIELDS = {
+    0x02: "category",
+    0x05: "line_count",
+    0x06: "paragraph_count",
+    0x0E: "manager",
+    0x0F: "company",
+}
+
+# What decoding one corrupt property value can raise; the property is then skipped.
+_VALUE_ERRORS = (struct.error, OverflowError, ValueError, TypeError)
+
+
+@dataclass
+class DocumentMetadata:
+    """Title, author, dates and counts stored by Word alongside the body."""
+
+    title: Optional[str] = None
+    subject: Optional[str] = None
+    author: Optional[str] = None
+    keywords: Optional[str] = None
+    comments: Optional[str] = None
+    template: Optional[str] = None
+    last_author: Optional[str] = None
+    revision: Optional[str] = None
+    application: Optional[str] = None
+    category: Optional[str] = None
+    manager: Optional[str] = None
+    company: Optional[str] = None
+    created: Optional[datetime] = None
+    last_saved: Optional[datetime] = None
+    last_printed: Optional[datetime] = None
+    edit_time: Optional[timedelta] = None
+    page_count: Optional[int] = None
+    word_count: Optional[int] = None
+    char_count: Optional[int] = None
+    line_count: Optional[int] = None
+    paragraph_count: Optional[int] = None
+    security: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        """Return the populated fields with JSON-friendly values."""
+        record: Dict[str, object] = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if value is None:
+                continue
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, timedelta):
+                value = value.total_seconds()
+            record[field.name] = value
+        return record
+
+
+def _codec_for(codepage: object) -> str:
+    if not isinstance(codepage, int):
+        # Missing, or stored with a type other than an integer.
+        return "cp1252"
+    codepage &= 0xFFFF
+    if codepage == 65001:
+        return "utf-8"
+    if codepage == 1200:
+        return "utf-16le"
+    try:
+        return codecs.lookup(f"cp{codepage}").name
+    except LookupError:
+        return "cp1252"
+
+
+def _read_value(data: bytes, offset: int, codec: str, as_duration: bool = False) -> object:
+    vtype = struct.unpack_from("<H", data, offset)[0]
+    offset += 4
+    if vtype in _FIXED_TYPES:
+        return struct.unpack_from(_FIXED_TYPES[vtype], data, offset)[0]
+    if vtype == VT_BOOL:
+        return struct.unpack_from("<H", data, offset)[0] != 0
+    if vtype == VT_LPSTR:
+        size = struct.unpack_from("<I", data, offset)[0]
+        raw = data[offset + 4 : offset + 4 + size]
+        if codec == "utf-16le":
+            return raw.decode(codec, errors="replace").split("\x00", 1)[0]
+        return raw.split(b"\x00", 1)[0].decode(codec, errors="replace")
+    if vtype == VT_LPWSTR:
+        count = struct.unpack_from("<I", data, offset)[0]
+        raw = data[offset + 4 : offset + 4 + count * 2]
+        return raw.decode("utf-16le", errors="replace").split("\x00", 1)[0]
+    if vtype == VT_FILETIME:
+        ticks = struct.unpack_from("<Q", data, offset)[0]
+        if as_duration:
+            return timedelta(microseconds=ticks // 10)
+        if ticks == 0:
+            return None
+        try:
+            return _FILETIME_EPOCH + timedelta(microseconds=ticks // 10)
+        except OverflowError:
+            # Past the year 9999, which only a corrupt file stores.
+            return None
+    # Vectors, blobs, clipboard thumbnails and other types are not needed here.
+    return None
+
+
+def parse_property_set(data: bytes, durations: frozenset = frozenset()) -> Dict[int, object]:
+    """Parse the first property set of a property-set stream into ``{pid: value}``.
+
+    Properties whose identifier is in ``durations`` store a FILETIME that is
+    a time span rather than a date and are returned as ``timedelta``.
+    """
+    try:
+        if len(data) < 48 or struct.unpack_from("<H", data, 0)[0] != 0xFFFE:
+            raise DocFormatError("property set stream header is invalid")
+        if struct.unpack_from("<I", data, 24)[0] < 1:
+            return {}
+        base = struct.unpack_from("<I", data, 44)[0]
+        count = struct.unpack_from("<I", data, base + 4)[0]
+        if base + 8 + count * 8 > len(data):
+            raise DocFormatError("property set is truncated")
+        offsets = {}
+        for index in range(count):
+            pid, offset = struct.unpack_from("<II", data, base + 8 + index * 8)
+            offsets[pid] = base + offset
+        codec = "cp1252"
+        if PID_CODEPAGE in offsets:
+            try:
+                codec = _codec_for(_read_value(data, offsets[PID_CODEPAGE], "cp1252"))
+            except _VALUE_ERRORS:
+                pass
+        values: Dict[int, object] = {}
+        for pid, offset in offsets.items():
+            if pid == PID_CODEPAGE or pid == 0:
+                continue
+            try:
+                values[pid] = _read_value(data, offset, codec, pid in durations)
+            except _VALUE_ERRORS:
+                continue
+        return values
+    except struct.error as exc:
+        raise DocFormatError("property set is malformed") from exc
+
+
+def read_properties(cfbf: CFBFReader) -> DocumentMetadata:
+    """Collect :class:`DocumentMetadata` from the property-set streams of ``cfbf``.
+
+    Only the two small property-set streams are read; missing streams leave
+    their fields as ``None``.
+    """
+    metadata = DocumentMetadata()
+    for stream_name, mapping, durations in (
+        (SUMMARY_INFORMATION, _SUMMARY_FIELDS, frozenset({0x0A})),
+        (DOCUMENT_SUMMARY_INFORMATION, _DOCUMENT_SUMMARY_FIELDS, frozenset()),
+    ):
+        try:
+            data = cfbf.open_stream(stream_name).getvalue()
+        except MissingStreamError:
+            continue
+        for pid, value in parse_property_set(data, durations).items():
+            name = mapping.get(pid)
+            if name is not None and value is not None:
+                setattr(metadata, name, value)
+    return metadata
@@ -1,53 +1,605 @@
 """Facade that exposes the steps needed to read text from binary .doc files."""
 
-import io
-from typing import Iterable
+import codecs
+import dataclasses
+import re
+from contextlib import nullcontext
+from typing import BinaryIO, ContextManager, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
-from .cfbf import CFBFReader, DocFormatError
-from .fib import WordFIB
-from .piece_table import PieceSegment, PieceTable
+from .cache import ExtractionCache
+from .cfbf import CFBFReader, DocFormatError, StreamView
+from .fib import FIB_MIN_SIZE, WordFIB
+from .fields import Field, FieldScanner
+from .formatting import FkpIndex, Paragraph, Run, RunProperties, character_index, paragraph_index
+from .incremental import ExtractionSnapshot, IncrementalResult, reextract
+from .limits import DEFAULT_LIMITS, Limits
+from .piece_table import PieceSegment, PieceTable, coalesce_segments, cp_length
+from .properties import DocumentMetadata, read_properties
+from .search import DEFAULT_MAX_MATCH_CHARS, Match, Searcher, SearchPattern
+from .stats import ExtractionStats
+
+DEFAULT_CHUNK_CHARS = 64 * 1024
+
+# Paragraph/cell/page marks become whitespace; field delimiters are dropped.
+_CONTROL_TRANSLATION = str.maketrans(
+    {"\r": "\n", "\x0c": "\n", "\x07": "\t", "\x13": None, "\x14": None, "\x15": None}
+)
+# Paragraph marks and table cell/row marks both end a paragraph.
+_PARAGRAPH_MARKS = re.compile("[\r\x07]")
 
 
 class DocReader:
-    """High-level API to load text from a pure Python CFBF reader."""
+    """High-level API to load text from a pure Python CFBF reader.
+
+    ``limits`` bounds stream sizes, piece counts and the characters decoded
+    per call (see :class:`~zddoc.limits.Limits`); exceeding one raises
+    :class:`~zddoc.limits.LimitExceededError`.
+    """
+
+    def __init__(
+        self,
+        source,
+        stats: Optional[ExtractionStats] = None,
+        cache: Optional[ExtractionCache] = None,
+        keep_field_codes: bool = False,
+        limits: Optional[Limits] = None,
+    ):
+        self._source = source
+        self._limits = DEFAULT_LIMITS if limits is None else limits
+        self._stats = stats
+        self._cache = cache
+        self._keep_field_codes = keep_field_codes
+        self._cfbf_reader: Optional[CFBFReader] = None
+        self._word_stream: Optional[StreamView] = None
+        self._piece_table: Optional[PieceTable] = None
+        self._fib: Optional[WordFIB] = None
+        self._formatting: Optional[Tuple[FkpIndex[RunProperties], FkpIndex[int]]] = None
+        if cache is None:
+            # Without a cache the container is always needed; fail fast on bad input.
+            self._cfbf_reader = CFBFReader(source, stats=stats, limits=self._limits)
 
-    def __init__(self, source):
-        self._cfbf = CFBFReader(source)
+    @property
+    def _cfbf(self) -> CFBFReader:
+        if self._cfbf_reader is None:
+            self._cfbf_reader = CFBFReader(self._source, stats=self._stats, limits=self._limits)
+        return self._cfbf_reader
+
+    @property
+    def stats(self) -> Optional[ExtractionStats]:
+        """The instrumentation object passed to the constructor, if any."""
+        return self._stats
+
+    def _stage(self, name: str) -> ContextManager:
+        return nullcontext() if self._stats is None else self._stats.stage(name)
+
+    def _load(self) -> Tuple[StreamView, PieceTable]:
+        if self._piece_table is None:
+            with self._stage("fib"):
+                word_stream = self._cfbf.open_stream("WordDocument", lazy=True)
+                fib = WordFIB.from_bytes(word_stream.read(FIB_MIN_SIZE))
+            if fib.is_encrypted:
+                raise DocFormatError("encrypted documents are not supported")
+            with self._stage("piece_table"):
+                table_stream = self._cfbf.open_stream(fib.table_stream_name, lazy=True)
+                self._piece_table = PieceTable.from_stream(table_stream, fib.fcClx, fib.lcbClx, self._limits)
+            if self._stats is not None:
+                self._stats.count("pieces", len(self._piece_table))
+            self._word_stream = word_stream
+            self._fib = fib
+        return self._word_stream, self._piece_table
 
     def read_text(self) -> str:
-        word_stream = self._cfbf.open_stream("WordDocument")
-        word_bytes = word_stream.getvalue()
-        fib = WordFIB.from_bytes(word_bytes)
-        if fib.is_encrypted:
-            raise DocFormatError("encrypted documents are not supported")
-        table_bytes = self._cfbf.open_stream(fib.table_stream_name).read()
-        piece_table = PieceTable(table_bytes, fib.fcClx, fib.lcbClx)
-        segments = tuple(piece_table.segments())
-        consolidator = io.BytesIO(word_bytes)
-        parts = []
-        for segment in segments:
-            parts.append(self._decode_segment(segment, consolidator))
-        return self._normalize("".join(parts))
+        """Return the whole normalized text.
+
+        With a ``cache`` the text is looked up first, and the container is only
+        parsed (and the result stored) on a miss.
+        """
+        if self._cache is None:
+            return "".join(self.iter_text())
+        key = self._cache.key_for(self._source, variant="field-codes" if self._keep_field_codes else "")
+        text = self._cache.get(key)
+        if self._stats is not None:
+            self._stats.count("cache_misses" if text is None else "cache_hits")
+        if text is None:
+            text = "".join(self.iter_text())
+            self._cache.put(key, text)
+        return text
+
+    def iter_text(self, chunk_chars: int = DEFAULT_CHUNK_CHARS) -> Iterator[str]:
+        """Yield the normalized document text in chunks of about ``chunk_chars``.
+
+        Pieces are decoded incrementally, so memory stays proportional to the
+        chunk size rather than to the document.
+        """
+        if chunk_chars < 1:
+            raise ValueError("chunk_chars must be positive")
+        word_stream, piece_table = self._load()
+        return self._text_chunks(piece_table.segments(), word_stream, chunk_chars)
+
+    def char_count(self) -> int:
+        """Return the number of character positions (CPs) in the document.
+
+        This is the length of the text before normalization; it only needs the
+        piece table, not any decoding.
+        """
+        return self._load()[1].char_count
+
+    def read_range(self, cp_start: int, cp_end: Optional[int] = None) -> str:
+        """Return the normalized text for character positions ``[cp_start, cp_end)``.
+
+        Only the pieces overlapping the range are located (by bisect) and decoded,
+        so previews of large documents cost the size of the preview.
+        """
+        if cp_start < 0:
+            raise ValueError("cp_start must not be negative")
+        word_stream, piece_table = self._load()
+        if cp_end is None:
+            cp_end = piece_table.char_count
+        if cp_end <= cp_start:
+            return ""
+        segments = piece_table.segments_in_range(cp_start, cp_end)
+        chunk_chars = min(DEFAULT_CHUNK_CHARS, cp_end - cp_start)
+        return "".join(self._text_chunks(segments, word_stream, chunk_chars))
+
+    def story_ranges(self) -> Dict[str, Tuple[int, int]]:
+        """Return the CP range of each story (``main``, ``footnotes``, ``headers``, ...)."""
+        self._load()
+        return self._fib.story_ranges()
+
+    def read_story(self, name: str) -> str:
+        """Return the normalized text of one story, e.g. ``read_story("main")``.
+
+        Only the pieces inside the story's CP range are decoded.  Story names
+        are those of :data:`zddoc.fib.STORIES`.
+        """
+        ranges = self.story_ranges()
+        if name not in ranges:
+            raise ValueError(f"unknown story {name!r}; expected one of {', '.join(ranges)}")
+        cp_start, cp_end = ranges[name]
+        return self.read_range(cp_start, cp_end)
+
+    def iter_stories(self, names: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str]]:
+        """Yield ``(name, text)`` for each non-empty story, in document order.
+
+        Pass ``names`` to decode only those stories.
+        """
+        ranges = self.story_ranges()
+        wanted = set(ranges if names is None else names)
+        unknown = wanted - set(ranges)
+        if unknown:
+            raise ValueError(f"unknown stories: {', '.join(sorted(unknown))}")
+        return (
+            (name, self.read_range(cp_start, cp_end))
+            for name, (cp_start, cp_end) in ranges.items()
+            if name in wanted and cp_end > cp_start
+        )
+
+    def iter_paragraphs(self, story: Optional[str] = None) -> Iterator[Paragraph]:
+        """Yield the document's paragraphs in CP order, with their runs.
+
+        Each :class:`~zddoc.formatting.Paragraph` carries its CP range, its
+        paragraph style index and :class:`~zddoc.formatting.Run` objects with
+        bold, italic and character style index.  Text is normalized and
+        field instructions are dropped as in :meth:`read_text`; paragraph
+        marks end a paragraph and are not part of its text.  Pass ``story``
+        to restrict the walk to one story.
+
+        Formatting comes from the PlcBteChpx/PlcBtePapx bin tables; their
+        FKP pages are decoded on demand and kept in a small LRU cache.
+        """
+        if story is None:
+            word_stream, piece_table = self._load()
+            segments = piece_table.segments()
+        else:
+            ranges = self.story_ranges()
+            if story not in ranges:
+                raise ValueError(f"unknown story {story!r}; expected one of {', '.join(ranges)}")
+            word_stream, piece_table = self._load()
+            segments = piece_table.segments_in_range(*ranges[story])
+        characters, paragraphs = self._load_formatting()
+        return self._iter_paragraphs(segments, word_stream, characters, paragraphs)
+
+    def _load_formatting(self) -> Tuple[FkpIndex[RunProperties], FkpIndex[int]]:
+        if self._formatting is None:
+            word_stream, _ = self._load()
+            fib = self._fib
+            table_stream = self._cfbf.open_stream(fib.table_stream_name, lazy=True)
+
+            def read_plc(fc: int, lcb: int) -> bytes:
+                table_stream.seek(fc)
+                plc = table_stream.read(lcb) if fc + lcb <= table_stream.size else b""
+                if len(plc) != lcb:
+                    raise DocFormatError("bin table lies outside the table stream")
+                return plc
+
+            # Each index keeps its own view so page reads do not disturb text decoding.
+            self._formatting = (
+                character_index(read_plc(fib.fcPlcfBteChpx, fib.lcbPlcfBteChpx), self._word_view()),
+                paragraph_index(read_plc(fib.fcPlcfBtePapx, fib.lcbPlcfBtePapx), self._word_view()),
+            )
+        return self._formatting
+
+    def _word_view(self) -> StreamView:
+        return self._cfbf.open_stream("WordDocument", lazy=True)
+
+    def _iter_paragraphs(
+        self,
+        segments: Iterable[PieceSegment],
+        word_stream: BinaryIO,
+        characters: FkpIndex[RunProperties],
+        paragraphs: FkpIndex[int],
+    ) -> Iterator[Paragraph]:
+        """Split decoded pieces at paragraph marks and character-run boundaries.
+
+        Pieces are decoded one character run at a time; the FC of every
+        character is known from its piece, so runs come from the CHPX index
+        and each paragraph's style from the PAPX entry of its mark.
+        """
+        scanner = FieldScanner()
+        buffer = memoryview(bytearray(DEFAULT_CHUNK_CHARS * 2))
+        current: Optional[Paragraph] = None
+        planned = 0
+        last_fc = 0
+        for piece in coalesce_segments(segments):
+            planned += piece.cp_end - piece.cp_start
+            self._limits.check("max_output_chars", planned)
+            width = 1 if piece.encoding == "cp1252" else 2
+            fc = piece.offset
+            piece_end = piece.offset + piece.byte_length
+            while fc < piece_end:
+                run_end, properties = characters.lookup(fc)
+                # Round to whole characters and always make progress, even on bad FKPs.
+                run_end = min(piece_end, fc + max(width, -(-(run_end - fc) // width) * width))
+                cp = piece.cp_start + (fc - piece.offset) // width
+                run = PieceSegment(cp, cp + (run_end - fc) // width, fc, piece.encoding, run_end - fc)
+                position = fc
+                # Undecodable bytes become U+FFFD rather than vanishing, so FCs and CPs stay in step.
+                for chunk in self._iter_segment(run, word_stream, buffer, errors="replace"):
+                    start = 0
+                    for match in _PARAGRAPH_MARKS.finditer(chunk):
+                        index = match.start()
+                        mark_fc = position + cp_length(chunk[start:index]) * width
+                        if current is None:
+                            current = Paragraph(piece.cp_start + (position - piece.offset) // width, 0, 0)
+                        self._append_run(current, scanner, chunk[start:index], position, piece, properties)
+                        current.cp_end = piece.cp_start + (mark_fc - piece.offset) // width + 1
+                        current.style_index = paragraphs.lookup(mark_fc)[1]
+                        yield self._finish_paragraph(current)
+                        current = None
+                        position = mark_fc + width
+                        start = index + 1
+                    if start < len(chunk):
+                        text = chunk[start:]
+                        if current is None:
+                            current = Paragraph(piece.cp_start + (position - piece.offset) // width, 0, 0)
+                        self._append_run(current, scanner, text, position, piece, properties)
+                        position += cp_length(text) * width
+                last_fc = position - width
+                fc = run_end
+        if current is not None:
+            current.style_index = paragraphs.lookup(last_fc)[1]
+            yield self._finish_paragraph(current)
 
     @staticmethod
-    def _decode_segment(segment: PieceSegment, stream: io.BytesIO) -> str:
-        stream.seek(segment.offset)
-        raw = stream.read(segment.byte_length)
-        return raw.decode(segment.encoding, errors="ignore")
+    def _append_run(
+        paragraph: Paragraph,
+        scanner: FieldScanner,
+        raw: str,
+        fc: int,
+        piece: PieceSegment,
+        properties: RunProperties,
+    ) -> None:
+        """Add ``raw`` (starting at ``fc`` in ``piece``) to the paragraph's last run or a new one."""
+        width = 1 if piece.encoding == "cp1252" else 2
+        cp_start = piece.cp_start + (fc - piece.offset) // width
+        cp_end = cp_start + cp_length(raw)
+        paragraph.cp_end = cp_end
+        # Bytes that do not decode only hold their CPs; read_text drops them too.
+        text = scanner.feed(raw).replace("\ufffd", "")
+        if not text:
+            return
+        runs = paragraph.runs
+        if runs and runs[-1].properties == properties:
+            runs[-1].text += text
+            runs[-1].cp_end = cp_end
+        else:
+            runs.append(Run(cp_start, cp_end, text, properties))
+
+    @classmethod
+    def _finish_paragraph(cls, paragraph: Paragraph) -> Paragraph:
+        for run in paragraph.runs:
+            run.text = cls._normalize(run.text)
+        return paragraph
+
+    def metadata(self) -> DocumentMetadata:
+        """Return title, author, dates and counts from the property-set streams.
+
+        Only the container directory and the two ``\\x05...SummaryInformation``
+        streams are read; the ``WordDocument`` stream is never opened.
+        """
+        return read_properties(self._cfbf)
+
+    def write_text(
+        self,
+        fp: Union[TextIO, BinaryIO],
+        encoding: Optional[str] = None,
+        errors: str = "strict",
+        chunk_chars: int = DEFAULT_CHUNK_CHARS,
+    ) -> int:
+        """Stream the text to ``fp`` and return the number of characters written.
+
+        ``fp`` is a text file unless ``encoding`` is given, in which case chunks
+        are encoded and written to a binary file.  With a cache the text goes
+        through :meth:`read_text` so it can be served from or stored in it.
+        """
+        chunks = self.iter_text(chunk_chars) if self._cache is None else (self.read_text(),)
+        written = 0
+        for chunk in chunks:
+            fp.write(chunk if encoding is None else chunk.encode(encoding, errors))
+            written += len(chunk)
+        return written
+
+    def fields(self) -> List[Field]:
+        """Return every field of the document in CP order, results normalized.
+
+        Filter on :attr:`Field.code` (``HYPERLINK``, ``PAGEREF``, ``TOC``, ...)
+        or use :meth:`hyperlinks`.
+        """
+        word_stream, piece_table = self._load()
+        scanner = FieldScanner(collect=True)
+        # Undecodable bytes become U+FFFD rather than vanishing, so field CPs stay exact.
+        raw_chunks = self._iter_segments(
+            piece_table.segments(), word_stream, DEFAULT_CHUNK_CHARS, self._stats, self._limits, errors="replace"
+        )
+        for _ in self._strip_fields(raw_chunks, scanner, self._stats):
+            pass
+        scanner.fields.sort(key=lambda record: record.cp_start)
+        return [dataclasses.replace(record, result=self._normalize(record.result)) for record in scanner.fields]
+
+    def hyperlinks(self) -> List[Field]:
+        """Return the HYPERLINK fields; :attr:`Field.target` holds the URL."""
+        return [record for record in self.fields() if record.code == "HYPERLINK"]
+
+    def extract_incremental(
+        self, previous: Optional[ExtractionSnapshot] = None, sample: bool = False
+    ) -> IncrementalResult:
+        """Return the text as :meth:`read_text` does, re-decoding only what changed since ``previous``.
+
+        ``previous`` is the ``snapshot`` of an earlier result for an older
+        version of this document.  Pieces whose bytes are still at the same
+        file offset (as after a fast save) are spliced in from it and only
+        new or changed pieces are decoded and normalized; ``changes`` lists
+        the CP ranges that differ between the versions.  Without
+        ``previous`` everything is decoded and reported as changed.
+
+        Old pieces are trusted when their bytes still hash to the digest in
+        ``previous``.  ``sample=True`` only compares their first and last
+        characters, which is faster but misses an edit that keeps the offset
+        and length of the bytes it changes.
+        """
+        word_stream, piece_table = self._load()
+        scanner = None if self._keep_field_codes else FieldScanner()
+        with self._stage("decode"):
+            result = reextract(
+                piece_table.segments(), word_stream, self._normalize, previous, scanner, self._limits, sample
+            )
+        if self._stats is not None:
+            self._stats.count("decoded_chars", result.decoded_chars)
+            self._stats.count("reused_chars", result.reused_chars)
+        return result
+
+    def search(
+        self,
+        patterns: Union[SearchPattern, Iterable[SearchPattern]],
+        ignore_case: bool = False,
+        max_count: Optional[int] = None,
+        story: Optional[str] = None,
+        max_match_chars: int = DEFAULT_MAX_MATCH_CHARS,
+    ) -> Iterator[Match]:
+        """Yield :class:`~zddoc.search.Match` objects for ``patterns`` in CP order.
+
+        Strings are searched for literally; compiled ``re`` patterns are
+        used as they are.  The search runs over the raw characters, so
+        offsets are exact CPs (usable with :meth:`read_range`) and matches
+        may span pieces.  Literal patterns are matched against the bytes of
+        compressed pieces without decoding them.  Pieces are read one at a
+        time and reading stops after ``max_count`` matches or as soon as
+        the caller stops iterating, e.g. ``next(reader.search(terms), None)``.
+        """
+        if isinstance(patterns, (str, re.Pattern)):
+            patterns = [patterns]
+        searcher = Searcher(patterns, ignore_case, max_count, max_match_chars)
+        word_stream, piece_table = self._load()
+        if story is None:
+            segments = piece_table.segments()
+        else:
+            ranges = self.story_ranges()
+            if story not in ranges:
+                raise ValueError(f"unknown story {story!r}; expected one of {', '.join(ranges)}")
+            segments = piece_table.segments_in_range(*ranges[story])
+        return self._search(searcher, segments, word_stream)
+
+    def _search(self, searcher: Searcher, segments: Iterable[PieceSegment], stream: BinaryIO) -> Iterator[Match]:
+        buffer = memoryview(bytearray(DEFAULT_CHUNK_CHARS * 2))
+        planned = 0
+        for segment in coalesce_segments(segments):
+            planned += segment.cp_end - segment.cp_start
+            self._limits.check("max_output_chars", planned)
+            counter = "compressed_chars" if segment.encoding == "cp1252" else "unicode_chars"
+            if segment.encoding == "cp1252":
+                # Searched as bytes: one block per buffer fill, CPs equal to byte offsets.
+                cp = segment.cp_start
+                offset = segment.offset
+                remaining = segment.byte_length
+                while remaining > 0:
+                    stream.seek(offset)
+                    filled = stream.readinto(buffer[: min(len(buffer), remaining)])
+                    if not filled:
+                        break
+                    if self._stats is not None:
+                        self._stats.count(counter, filled)
+                    yield from searcher.feed(cp, raw=buffer[:filled])
+                    if searcher.done:
+                        return
+                    cp += filled
+                    offset += filled
+                    remaining -= filled
+            else:
+                cp = segment.cp_start
+                for text in self._iter_segment(segment, stream, buffer, errors="replace"):
+                    chars = cp_length(text)
+                    if self._stats is not None:
+                        self._stats.count(counter, chars)
+                    yield from searcher.feed(cp, text=text)
+                    if searcher.done:
+                        return
+                    cp += chars
+        yield from searcher.finish()
+
+    def _text_chunks(self, segments: Iterable[PieceSegment], stream: BinaryIO, chunk_chars: int) -> Iterator[str]:
+        stats = self._stats
+        raw_chunks = self._iter_segments(segments, stream, chunk_chars, stats, self._limits)
+        if stats is not None:
+            raw_chunks = stats.timed(raw_chunks, "decode")
+        if not self._keep_field_codes:
+            raw_chunks = self._strip_fields(raw_chunks, FieldScanner(), stats)
+        return self._normalize_chunks(raw_chunks, chunk_chars, stats)
+
+    @staticmethod
+    def _strip_fields(
+        raw_chunks: Iterable[str], scanner: FieldScanner, stats: Optional[ExtractionStats] = None
+    ) -> Iterator[str]:
+        """Pass raw chunks through ``scanner``, keeping field results only."""
+        for chunk in raw_chunks:
+            if stats is None:
+                text = scanner.feed(chunk)
+            else:
+                with stats.stage("fields"):
+                    text = scanner.feed(chunk)
+            if text:
+                yield text
+
+    @classmethod
+    def _iter_segments(
+        cls,
+        segments: Iterable[PieceSegment],
+        stream: BinaryIO,
+        chunk_chars: int,
+        stats: Optional[ExtractionStats] = None,
+        limits: Limits = DEFAULT_LIMITS,
+        errors: str = "ignore",
+    ) -> Iterator[str]:
+        """Decode ``segments`` into raw (unnormalized) text chunks.
+
+        File-contiguous pieces are merged first, and every read lands in one
+        reusable buffer that is decoded in place through a memoryview.  Each
+        piece's character count is checked against ``max_output_chars``
+        before it is decoded, so overlapping pieces that all point at the
+        same large run of text cannot multiply the work.
+        """
+        buffer = memoryview(bytearray(chunk_chars * 2))
+        planned = 0
+        for segment in coalesce_segments(segments):
+            planned += segment.cp_end - segment.cp_start
+            limits.check("max_output_chars", planned)
+            if stats is not None:
+                counter = "compressed_chars" if segment.encoding == "cp1252" else "unicode_chars"
+                stats.count(counter, segment.cp_end - segment.cp_start)
+            yield from cls._iter_segment(segment, stream, buffer, errors)
+
+    @staticmethod
+    def _iter_segment(
+        segment: PieceSegment, stream: BinaryIO, buffer: memoryview, errors: str = "ignore"
+    ) -> Iterator[str]:
+        step = len(buffer) // 2 * (1 if segment.encoding == "cp1252" else 2)
+        if segment.byte_length <= step:
+            stream.seek(segment.offset)
+            filled = stream.readinto(buffer[: segment.byte_length])
+            text = str(buffer[:filled], segment.encoding, errors)
+            if text:
+                yield text
+            return
+        decoder = codecs.getincrementaldecoder(segment.encoding)(errors=errors)
+        offset = segment.offset
+        remaining = segment.byte_length
+        while remaining > 0:
+            # Seek every time: several iterators may share the cached stream.
+            stream.seek(offset)
+            filled = stream.readinto(buffer[: min(step, remaining)])
+            if not filled:
+                break
+            offset += filled
+            remaining -= filled
+            text = decoder.decode(buffer[:filled])
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+
+    @classmethod
+    def _normalize_chunks(
+        cls, raw_chunks: Iterable[str], chunk_chars: int, stats: Optional[ExtractionStats] = None
+    ) -> Iterator[str]:
+        """Normalize decoded text chunk by chunk.
+
+        A trailing ``\\r`` is held back until the next chunk is seen so that
+        ``\\r\\n`` pairs straddling piece or chunk boundaries collapse correctly.
+        """
+        parts = []
+        buffered = 0
+        for chunk in raw_chunks:
+            parts.append(chunk)
+            buffered += len(chunk)
+            if buffered < chunk_chars:
+                continue
+            content = "".join(parts)
+            if content.endswith("\r"):
+                parts, buffered = ["\r"], 1
+                content = content[:-1]
+            else:
+                parts, buffered = [], 0
+            content = cls._timed_normalize(content, stats)
+            if content:
+                yield content
+        content = cls._timed_normalize("".join(parts), stats)
+        if content:
+            yield content
+
+    @classmethod
+    def _timed_normalize(cls, content: str, stats: Optional[ExtractionStats]) -> str:
+        if stats is None:
+            return cls._normalize(content)
+        with stats.stage("normalize"):
+            return cls._normalize(content)
 
     @staticmethod
     def _normalize(content: str) -> str:
-        content = content.replace("\r\n", "\n").replace("\r", "\n")
-        content = content.replace("\x0c", "\n").replace("\x07", "\t")
-        for control in ("\x13", "\x14", "\x15"):
-            content = content.replace(control, "")
-        return content
+        return content.replace("\r\n", "\n").translate(_CONTROL_TRANSLATION)
 
     def close(self) -> None:
-        self._cfbf.close()
+        if self._cfbf_reader is not None:
+            self._cfbf_reader.close()
+        if self._stats is not None:
+            self._stats.close()
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         self.close()
+
+
+def normalize_text(text: str) -> str:
+    """Map raw document characters (as in a search :class:`~zddoc.search.Match`) to output text.
+
+    Paragraph, cell and page marks become whitespace and field delimiters
+    are dropped, exactly as :meth:`DocReader.read_text` does.
+    """
+    return DocReader._normalize(text)
+
+
+def read_metadata(source) -> DocumentMetadata:
+    """Convenience wrapper around :meth:`DocReader.metadata` for one document."""
+    with DocReader(source) as reader:
+        return reader.metadata()
@@ -0,0 +1,211 @@
+"""Streaming search over the raw characters of a document.
+
+:class:`Searcher` is fed the document block by block in CP order: raw
+bytes for compressed (cp1252) pieces, decoded text for Unicode ones.
+Literal patterns that encode to cp1252 are matched against the bytes
+directly, so compressed pieces are never decoded except around matches
+and block boundaries.  The last characters of every block are carried
+over and searched together with the start of the next one, which finds
+matches that span pieces.  Matches are released in CP order as soon as no
+later block can produce an earlier one, so callers can stop early.
+"""
+
+import heapq
+import re
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Pattern, Tuple, Union
+
+from .piece_table import cp_length
+
+# How far a regular expression match may reach across a block boundary.
+DEFAULT_MAX_MATCH_CHARS = 256
+
+SearchPattern = Union[str, Pattern[str]]
+
+
+@dataclass(frozen=True)
+class Match:
+    """One match: the pattern as passed, its CP range and the raw matched characters.
+
+    CPs index the document before normalization, so paragraph marks are
+    ``\\r`` and field instructions are included;
+    ``DocReader.read_range(match.cp_start, match.cp_end)`` returns the
+    normalized text of the match.
+    """
+
+    pattern: SearchPattern
+    cp_start: int
+    cp_end: int
+    text: str
+
+
+@dataclass
+class _Compiled:
+    source: SearchPattern
+    text: Pattern[str]
+    encoded: Optional[Pattern[bytes]]
+    max_chars: int
+    # Regular expressions may match more once the next block is known.
+    variable: bool = False
+
+
+def _compile(pattern: SearchPattern, ignore_case: bool, max_match_chars: int) -> _Compiled:
+    if isinstance(pattern, re.Pattern):
+        if not isinstance(pattern.pattern, str):
+            raise TypeError("search patterns must be str or compiled str patterns")
+        return _Compiled(pattern, pattern, None, max_match_chars, variable=True)
+    if not isinstance(pattern, str):
+        raise TypeError("search patterns must be str or compiled str patterns")
+    if not pattern:
+        raise ValueError("search patterns must not be empty")
+    flags = re.IGNORECASE if ignore_case else 0
+    encoded = None
+    # bytes patterns fold ASCII case only, which matches str folding for ASCII-only literals.
+    if not ignore_case or pattern.isascii():
+        try:
+            encoded = re.compile(re.escape(pattern.encode("cp1252")), flags)
+        except UnicodeEncodeError:
+            pass
+    return _Compiled(pattern, re.compile(re.escape(pattern), flags), encoded, len(pattern))
+
+
+def _is_wide(text: str) -> bool:
+    return not text.isascii() and max(text) > "\uffff"
+
+
+def _index_at(text: str, wide: bool, cps: int) -> int:
+    """Index of the character ``cps`` CPs into ``text``."""
+    if not wide:
+        return cps
+    index = 0
+    while cps > 0 and index < len(text):
+        cps -= 2 if text[index] > "\uffff" else 1
+        index += 1
+    return index
+
+
+class Searcher:
+    """Find ``patterns`` in blocks of document text fed in CP order.
+
+    Strings are literals (case-folded with ``ignore_case``); compiled
+    patterns are used as they are and may reach at most
+    ``max_match_chars`` across a block boundary.  After ``max_count``
+    matches :attr:`done` is set and further input is ignored.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[SearchPattern],
+        ignore_case: bool = False,
+        max_count: Optional[int] = None,
+        max_match_chars: int = DEFAULT_MAX_MATCH_CHARS,
+    ):
+        self._patterns = [_compile(pattern, ignore_case, max_match_chars) for pattern in patterns]
+        if not self._patterns:
+            raise ValueError("at least one search pattern is required")
+        if max_count is not None and max_count < 1:
+            raise ValueError("max_count must be positive")
+        self._overlap = max(pattern.max_chars for pattern in self._patterns) - 1
+        self._max_count = max_count
+        self._resume = [0] * len(self._patterns)
+        self._pending: List[Tuple[int, int, int, str]] = []
+        self._carry = ""
+        self._carry_cp = 0
+        self._end_cp = 0
+        self.count = 0
+
+    @property
+    def done(self) -> bool:
+        return self._max_count is not None and self.count >= self._max_count
+
+    @property
+    def needs_text(self) -> bool:
+        """Whether compressed blocks must be decoded because a pattern cannot match bytes."""
+        return any(pattern.encoded is None for pattern in self._patterns)
+
+    def feed(self, cp_start: int, raw=None, text: Optional[str] = None) -> List[Match]:
+        """Search one block starting at ``cp_start`` and return the matches now known to be next.
+
+        Pass compressed blocks as ``raw`` cp1252 bytes (``text`` may be
+        given too if already decoded) and Unicode blocks as ``text``.
+        """
+        if self.done:
+            return []
+        if cp_start != self._end_cp and self._carry:
+            # Not contiguous with the previous block (e.g. a new story): nothing spans the gap.
+            self._search_seam("", open_end=False)
+            self._carry = ""
+        if raw is not None and text is None and self.needs_text:
+            text = str(raw, "cp1252", "replace")
+        wide = text is not None and _is_wide(text)
+        if raw is not None:
+            cp_end = cp_start + len(raw)
+        else:
+            cp_end = cp_start + (cp_length(text) if wide else len(text))
+        if self._carry and self._overlap:
+            head = text[: self._overlap] if text is not None else str(raw[: self._overlap], "cp1252", "replace")
+            self._search_seam(head, open_end=cp_end - cp_start <= self._overlap)
+        for number, pattern in enumerate(self._patterns):
+            skip = max(0, self._resume[number] - cp_start)
+            if raw is not None and pattern.encoded is not None:
+                for match in pattern.encoded.finditer(raw, skip):
+                    start = cp_start + match.start()
+                    self._add(number, start, start + match.end() - match.start(), str(match.group(), "cp1252"))
+            else:
+                for match in pattern.text.finditer(text, _index_at(text, wide, skip)):
+                    if match.end() == match.start():
+                        continue
+                    if pattern.variable and match.end() == len(text) and match.start() >= len(text) - self._overlap:
+                        # It may continue in the next block; the seam search will find all of it.
+                        break
+                    start = cp_start + (cp_length(text[: match.start()]) if wide else match.start())
+                    self._add(number, start, start + cp_length(match.group()), match.group())
+        if self._overlap:
+            if text is not None:
+                tail = text[-self._overlap :]
+            else:
+                tail = str(raw[-self._overlap :], "cp1252", "replace")
+            self._carry = (self._carry + tail)[-self._overlap :]
+        self._end_cp = cp_end
+        self._carry_cp = cp_end - cp_length(self._carry)
+        return self._release(self._carry_cp)
+
+    def finish(self) -> List[Match]:
+        """Return the matches still held back once the last block was fed."""
+        if self._carry and not self.done:
+            self._search_seam("", open_end=False)
+        return self._release(None)
+
+    def _search_seam(self, head: str, open_end: bool) -> None:
+        """Find matches that start in the carried-over text and may continue into ``head``.
+
+        ``open_end`` says that ``head`` is a whole block, so a match reaching
+        its end may grow further and is left for the next seam.
+        """
+        seam = self._carry + head
+        wide = _is_wide(seam)
+        boundary = len(self._carry)
+        for number, pattern in enumerate(self._patterns):
+            skip = max(0, self._resume[number] - self._carry_cp)
+            for match in pattern.text.finditer(seam, _index_at(seam, wide, skip)):
+                if match.start() >= boundary:
+                    break
+                if match.end() == match.start():
+                    continue
+                if pattern.variable and open_end and match.end() == len(seam):
+                    break
+                start = self._carry_cp + (cp_length(seam[: match.start()]) if wide else match.start())
+                self._add(number, start, start + cp_length(match.group()), match.group())
+
+    def _add(self, number: int, cp_start: int, cp_end: int, text: str) -> None:
+        self._resume[number] = cp_end
+        heapq.heappush(self._pending, (cp_start, number, cp_end, text))
+
+    def _release(self, before: Optional[int]) -> List[Match]:
+        released = []
+        pending = self._pending
+        while pending and (before is None or pending[0][0] < before) and not self.done:
+            cp_start, number, cp_end, text = heapq.heappop(pending)
+            released.append(Match(self._patterns[number].source, cp_start, cp_end, text))
+            self.count += 1
+        return released
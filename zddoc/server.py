@@ -0,0 +1,303 @@
+"""Long-running extraction service for callers that would otherwise pay Python startup per file.
+
+``zddoc serve`` listens on a Unix socket or a localhost TCP port and speaks
+plain HTTP with JSON bodies:
+
+``GET /ready``
+    200 once the worker pool is warm, 503 before (and while shutting down).
+``POST /extract``
+    With ``Content-Type: application/json`` the body names a file the
+    server can read: ``{"path": ..., "stories": [...], "keep_field_codes":
+    false, "metadata": false}``.  Any other content type uploads the
+    document itself; the same options go in the query string
+    (``?name=a.doc&metadata=1&story=main``).
+
+Documents are parsed by a pool of worker processes that is started (and
+warmed up) before the server reports ready, so every request runs in an
+interpreter that already imported zddoc.  At most ``max_requests`` requests
+are handled at once; the rest are answered with 503 straight away instead
+of queueing.  Per-document failures come back as a 200 response whose
+``ok`` is false, exactly like :class:`~zddoc.extract.BatchResult` records;
+unexpected worker errors get a 500 response with the same fields.
+"""
+
+import json
+import os
+import socketserver
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .extract import RECORDED_ERRORS, BatchResult, _deadline
+from .cache import ExtractionCache
+from .client import DEFAULT_HOST, DEFAULT_PORT, UNIX_PREFIX, Address
+from .reader import DocReader
+
+DEFAULT_MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class ExtractRequest:
+    """One document to extract: a ``path`` readable by the server, or uploaded ``data``."""
+
+    name: str
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+    stories: List[str] = field(default_factory=list)
+    keep_field_codes: bool = False
+    metadata: bool = False
+
+
+def handle_request(
+    request: ExtractRequest, timeout: Optional[float] = None, cache: Optional[ExtractionCache] = None
+) -> Dict[str, object]:
+    """Extract one document in a worker and return the JSON response record."""
+    source = request.path if request.data is None else request.data
+    result = BatchResult(request.name)
+    record: Dict[str, object] = {}
+    started = time.perf_counter()
+    try:
+        result.input_bytes = len(request.data) if request.data is not None else os.path.getsize(request.path)
+        # Field codes change the text, so the cache is only used for the default output.
+        use_cache = cache if not (request.stories or request.keep_field_codes) else None
+        with _deadline(timeout), DocReader(
+            source, cache=use_cache, keep_field_codes=request.keep_field_codes
+        ) as reader:
+            if request.stories:
+                result.text = "".join(text for _, text in reader.iter_stories(request.stories))
+            else:
+                result.text = reader.read_text()
+            if request.metadata:
+                record["metadata"] = reader.metadata().to_dict()
+    except RECORDED_ERRORS as exc:
+        result.error = str(exc) or exc.__class__.__name__
+        result.error_type = exc.__class__.__name__
+    result.seconds = time.perf_counter() - started
+    record.update(result.to_dict())
+    return record
+
+
+def _warm() -> int:
+    return os.getpid()
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "zddoc"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> "ExtractionServer":
+        return self.server.service
+
+    def address_string(self) -> str:
+        # Unix-socket peers have no address.
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        if self.service.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: Dict[str, object]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send_json(status, {"ok": False, "error": message})
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path != "/ready":
+            self._error(404, "unknown endpoint")
+            return
+        service = self.service
+        payload = {"ready": service.ready, "workers": service.jobs, "in_flight": service.in_flight}
+        self._send_json(200 if service.ready else 503, payload)
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/extract":
+            self._error(404, "unknown endpoint")
+            return
+        service = self.service
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._error(411, "Content-Length is required")
+            return
+        if length < 0:
+            self.close_connection = True
+            self._error(400, "Content-Length must not be negative")
+            return
+        # Refusals skip the body, so the connection cannot be reused after them.
+        if length > service.max_upload_bytes:
+            self.close_connection = True
+            self._error(413, f"request body exceeds {service.max_upload_bytes} bytes")
+            return
+        if not service.ready:
+            self.close_connection = True
+            self._error(503, "server is not ready")
+            return
+        # Take the slot before reading the body so refused uploads are never buffered.
+        if not service.slots.acquire(blocking=False):
+            self.close_connection = True
+            self._error(503, "too many concurrent requests")
+            return
+        try:
+            try:
+                request = self._parse_request(url.query, self.rfile.read(length))
+            except (ValueError, TypeError, KeyError) as exc:
+                status, payload = 400, {"ok": False, "error": f"bad request: {exc}"}
+            else:
+                status, payload = 200, service.submit(request)
+        except Exception as exc:
+            # A dead worker pool or an error that handle_request does not record.
+            status, payload = 500, {"ok": False, "error": str(exc), "error_type": exc.__class__.__name__}
+        finally:
+            service.slots.release()
+        self._send_json(status, payload)
+
+    def _parse_request(self, query: str, body: bytes) -> ExtractRequest:
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        if content_type == "application/json":
+            options = json.loads(body)
+            path = options["path"]
+            if not isinstance(path, str):
+                raise TypeError("path must be a string")
+            return ExtractRequest(
+                name=path,
+                path=path,
+                stories=list(options.get("stories") or []),
+                keep_field_codes=bool(options.get("keep_field_codes")),
+                metadata=bool(options.get("metadata")),
+            )
+        params = parse_qs(query)
+
+        def flag(name: str) -> bool:
+            return params.get(name, ["0"])[-1].lower() in ("1", "true", "yes")
+
+        return ExtractRequest(
+            name=params.get("name", ["<upload>"])[-1],
+            data=body,
+            stories=params.get("story", []),
+            keep_field_codes=flag("keep_field_codes"),
+            metadata=flag("metadata"),
+        )
+
+
+class ExtractionServer:
+    """HTTP front-end over a warm pool of extraction worker processes.
+
+    ``address`` is a Unix socket path (prefixed with ``unix:``) or a
+    ``(host, port)`` pair; port 0 picks a free port, see :attr:`address`.
+    """
+
+    def __init__(
+        self,
+        address: Address = (DEFAULT_HOST, DEFAULT_PORT),
+        jobs: Optional[int] = None,
+        max_requests: Optional[int] = None,
+        max_upload_bytes: int = DEFAULT_MAX_UPLOAD_BYTES,
+        timeout: Optional[float] = None,
+        cache: Optional[ExtractionCache] = None,
+        verbose: bool = False,
+    ):
+        self.jobs = jobs or os.cpu_count() or 1
+        # Twice the workers keeps every worker busy while the next request is read.
+        self.max_requests = max_requests or self.jobs * 2
+        self.max_upload_bytes = max_upload_bytes
+        self.timeout = timeout
+        self.cache = cache
+        self.verbose = verbose
+        self.slots = threading.BoundedSemaphore(self.max_requests)
+        self.in_flight = 0
+        self.ready = False
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._socket_path: Optional[str] = None
+        if isinstance(address, str):
+            self._socket_path = address[len(UNIX_PREFIX) :] if address.startswith(UNIX_PREFIX) else address
+            if os.path.exists(self._socket_path):
+                os.unlink(self._socket_path)
+            self._http = _UnixHTTPServer(self._socket_path, _Handler)
+        else:
+            self._http = ThreadingHTTPServer(address, _Handler)
+            self._http.daemon_threads = True
+        self._http.service = self
+
+    @property
+    def address(self) -> str:
+        """The address clients should use, as accepted by :func:`~zddoc.client.request_extract`."""
+        if self._socket_path is not None:
+            return UNIX_PREFIX + self._socket_path
+        host, port = self._http.server_address[:2]
+        return f"{host}:{port}"
+
+    def start_workers(self) -> None:
+        """Start the worker processes and wait until each one has answered once."""
+        pool = ProcessPoolExecutor(max_workers=self.jobs)
+        futures = [pool.submit(_warm) for _ in range(self.jobs)]
+        for future in futures:
+            future.result()
+        with self._lock:
+            previous, self._pool = self._pool, pool
+        if previous is not None:
+            previous.shutdown(wait=False, cancel_futures=True)
+        self.ready = True
+
+    def submit(self, request: ExtractRequest) -> Dict[str, object]:
+        with self._lock:
+            pool = self._pool
+            self.in_flight += 1
+        try:
+            return pool.submit(handle_request, request, self.timeout, self.cache).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed by the OS); replace the pool for later requests.
+            with self._lock:
+                replace = self._pool is pool
+            if replace:
+                self.ready = False
+                self.start_workers()
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def serve_forever(self) -> None:
+        """Warm the workers if needed and handle requests until :meth:`shutdown`."""
+        if not self.ready:
+            self.start_workers()
+        self._http.serve_forever()
+
+    def shutdown(self) -> None:
+        """Make :meth:`serve_forever` return; call from another thread, then :meth:`close`."""
+        self.ready = False
+        self._http.shutdown()
+
+    def close(self) -> None:
+        self.ready = False
+        self._http.server_close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._socket_path is not None and os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+
+    def __enter__(self) -> "ExtractionServer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
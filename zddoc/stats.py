@@ -0,0 +1,78 @@
+"""Opt-in instrumentation for CFBF and text extraction stages."""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class StatsHook:
+    """Receives instrumentation events; subclass and override what you need.
+
+    Use it to forward numbers to a metrics pipeline.  Hooks are only invoked
+    when an :class:`ExtractionStats` object is passed to a reader, so a
+    disabled pipeline costs nothing.
+    """
+
+    def on_stage(self, name: str, seconds: float) -> None:
+        """Called each time a timed stage finishes (streaming stages may report several times)."""
+
+    def on_close(self, stats: "ExtractionStats") -> None:
+        """Called once when the reader the stats belong to is closed."""
+
+
+class ExtractionStats:
+    """Wall time per stage and I/O/decoding counters for one document.
+
+    Stages recorded by the readers are ``open``, ``build_fat``,
+    ``read_directory``, ``load_mini_stream``, ``fib``, ``piece_table``,
+    ``decode``, ``fields`` and ``normalize``.  Counters are ``sectors_read``, ``seeks``,
+    ``bytes_copied``, ``pieces``, ``compressed_chars`` and ``unicode_chars``.
+    """
+
+    def __init__(self, hooks: Iterable[StatsHook] = ()):
+        self.stages: Dict[str, float] = defaultdict(float)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self._hooks = list(hooks)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def timed(self, iterable: Iterable[T], name: str) -> Iterator[T]:
+        """Yield from ``iterable``, charging only the time spent producing items to ``name``."""
+        iterator = iter(iterable)
+        seconds = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - started
+                yield item
+        finally:
+            self.add_time(name, seconds)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.stages[name] += seconds
+        for hook in self._hooks:
+            hook.on_stage(name, seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def close(self) -> None:
+        for hook in self._hooks:
+            hook.on_close(self)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {"stages": dict(self.stages), "counters": dict(self.counters)}
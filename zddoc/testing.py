@@ -0,0 +1,618 @@
+"""Writers for synthetic Compound Files and Word documents used by tests and benchmarks.
+
+Only the structures zddoc reads are produced: the CFBF header, FAT/DIFAT,
+mini FAT and mini stream, a flat directory, a FIB and a piece table.  The
+output is not meant to open in Word.
+"""
+
+import math
+import random
+import re
+import struct
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .cfbf import ENDOFCHAIN, FATSECT, FREESECT, OLE_SIGNATURE, CFBFReader
+from .fib import (
+    CCP_OFFSETS,
+    FC_CLX_OFFSET,
+    FC_PLCF_BTE_CHPX_OFFSET,
+    FC_PLCF_BTE_PAPX_OFFSET,
+    LCB_CLX_OFFSET,
+    LCB_PLCF_BTE_CHPX_OFFSET,
+    LCB_PLCF_BTE_PAPX_OFFSET,
+    WordFIB,
+)
+from .formatting import (
+    DEFAULT_CHARACTER_STYLE,
+    FKP_SIZE,
+    SPRM_C_F_BOLD,
+    SPRM_C_F_ITALIC,
+    SPRM_C_ISTD,
+    RunProperties,
+)
+from .piece_table import PieceTable
+
+DIFSECT = 0xFFFFFFFC
+NOSTREAM = 0xFFFFFFFF
+MINI_SECTOR_SIZE = 64
+MINI_STREAM_CUTOFF = 4096
+HEADER_DIFAT_ENTRIES = 109
+
+FIB_NFIB_WORD97 = 0x00C1
+FIB_SIZE = 0x0400
+TEXT_START = 0x0800
+
+
+def _sector_count(size: int, sector_size: int) -> int:
+    return (size + sector_size - 1) // sector_size
+
+
+def _pad(data: bytes, size: int) -> bytes:
+    return data + b"\x00" * (-len(data) % size)
+
+
+def build_compound_file(
+    streams: Dict[str, bytes],
+    sector_size: int = 512,
+    min_fat_sectors: int = 0,
+    scatter_sectors: bool = False,
+    seed: int = 0,
+) -> bytes:
+    """Serialize ``streams`` into a Compound File.
+
+    Streams smaller than the 4096-byte cutoff go to the mini stream.
+    ``sector_size`` 512 writes a version 3 file, 4096 a version 4 file.
+    ``min_fat_sectors`` pads the FAT so that more than 109 FAT sectors (and
+    therefore DIFAT sectors) can be exercised with small files, and
+    ``scatter_sectors`` shuffles where data sectors land so chains are not
+    contiguous.
+    """
+    if sector_size not in (512, 4096):
+        raise ValueError("sector_size must be 512 or 4096")
+    entries_per_sector = sector_size // 4
+    names = list(streams)
+
+    # Mini stream: every small stream is padded to whole 64-byte mini sectors.
+    mini_stream = bytearray()
+    mini_fat: List[int] = []
+    placement: Dict[str, Tuple[bool, int]] = {}
+    for name in names:
+        data = streams[name]
+        if not data or len(data) >= MINI_STREAM_CUTOFF:
+            continue
+        first = len(mini_fat)
+        count = _sector_count(len(data), MINI_SECTOR_SIZE)
+        mini_fat.extend(range(first + 1, first + count))
+        mini_fat.append(ENDOFCHAIN)
+        mini_stream += _pad(data, MINI_SECTOR_SIZE)
+        placement[name] = (True, first)
+
+    # Payloads that occupy regular sectors, in allocation order.
+    payloads: List[Tuple[str, bytes]] = [
+        (name, streams[name]) for name in names if len(streams[name]) >= MINI_STREAM_CUTOFF
+    ]
+    if mini_stream:
+        payloads.append(("\x00mini stream", bytes(mini_stream)))
+    if mini_fat:
+        payloads.append(("\x00mini fat", struct.pack(f"<{len(mini_fat)}I", *mini_fat)))
+    directory_size = (len(names) + 1) * 128
+    data_sectors = sum(_sector_count(len(data), sector_size) for _, data in payloads)
+    data_sectors += _sector_count(directory_size, sector_size)
+
+    fat_count = max(1, min_fat_sectors)
+    difat_count = 0
+    while True:
+        total = data_sectors + fat_count + difat_count
+        needed_fat = max(min_fat_sectors, math.ceil(total / entries_per_sector))
+        needed_difat = math.ceil(max(0, needed_fat - HEADER_DIFAT_ENTRIES) / (entries_per_sector - 1))
+        if (needed_fat, needed_difat) == (fat_count, difat_count):
+            break
+        fat_count, difat_count = needed_fat, needed_difat
+
+    # Data sectors come first (optionally shuffled), then FAT and DIFAT sectors.
+    slots = list(range(data_sectors))
+    if scatter_sectors:
+        random.Random(seed).shuffle(slots)
+    fat = [FREESECT] * (fat_count * entries_per_sector)
+    body: Dict[int, bytes] = {}
+    cursor = 0
+
+    def allocate(data: bytes) -> int:
+        nonlocal cursor
+        count = _sector_count(len(data), sector_size)
+        chain = slots[cursor : cursor + count]
+        cursor += count
+        for index, sector in enumerate(chain):
+            fat[sector] = chain[index + 1] if index + 1 < count else ENDOFCHAIN
+            body[sector] = data[index * sector_size : (index + 1) * sector_size]
+        return chain[0]
+
+    starts: Dict[str, int] = {}
+    for name, data in payloads:
+        starts[name] = allocate(data)
+
+    fat_sectors = list(range(data_sectors, data_sectors + fat_count))
+    difat_sectors = list(range(data_sectors + fat_count, data_sectors + fat_count + difat_count))
+    for sector in fat_sectors:
+        fat[sector] = FATSECT
+    for sector in difat_sectors:
+        fat[sector] = DIFSECT
+
+    directory = bytearray()
+    root_start = starts.get("\x00mini stream", ENDOFCHAIN)
+    directory += _directory_entry("Root Entry", 5, root_start, len(mini_stream), child=1 if names else NOSTREAM)
+    for index, name in enumerate(names):
+        in_mini, mini_start = placement.get(name, (False, 0))
+        if not streams[name]:
+            start = ENDOFCHAIN
+        elif in_mini:
+            start = mini_start
+        else:
+            start = starts[name]
+        right = index + 2 if index + 1 < len(names) else NOSTREAM
+        directory += _directory_entry(name, 2, start, len(streams[name]), right=right)
+    dir_start = allocate(bytes(directory))
+
+    for sector, chunk in enumerate(fat[i : i + entries_per_sector] for i in range(0, len(fat), entries_per_sector)):
+        body[fat_sectors[sector]] = struct.pack(f"<{entries_per_sector}I", *chunk)
+    spill = fat_sectors[HEADER_DIFAT_ENTRIES:]
+    per_difat = entries_per_sector - 1
+    for index, sector in enumerate(difat_sectors):
+        entries = spill[index * per_difat : (index + 1) * per_difat]
+        entries += [FREESECT] * (per_difat - len(entries))
+        following = difat_sectors[index + 1] if index + 1 < len(difat_sectors) else ENDOFCHAIN
+        body[sector] = struct.pack(f"<{entries_per_sector}I", *entries, following)
+
+    header = bytearray(512)
+    header[:8] = OLE_SIGNATURE
+    struct.pack_into(
+        "<HHHHH", header, 0x18, 0x003E, 3 if sector_size == 512 else 4, 0xFFFE, sector_size.bit_length() - 1, 6
+    )
+    if sector_size == 4096:
+        struct.pack_into("<I", header, 0x28, _sector_count(len(directory), sector_size))
+    struct.pack_into("<I", header, 0x2C, fat_count)
+    struct.pack_into("<I", header, 0x30, dir_start)
+    struct.pack_into("<I", header, 0x38, MINI_STREAM_CUTOFF)
+    struct.pack_into("<I", header, 0x3C, starts.get("\x00mini fat", ENDOFCHAIN))
+    struct.pack_into("<I", header, 0x40, _sector_count(len(mini_fat) * 4, sector_size))
+    struct.pack_into("<I", header, 0x44, difat_sectors[0] if difat_sectors else ENDOFCHAIN)
+    struct.pack_into("<I", header, 0x48, difat_count)
+    head_difat = fat_sectors[:HEADER_DIFAT_ENTRIES]
+    head_difat += [FREESECT] * (HEADER_DIFAT_ENTRIES - len(head_difat))
+    struct.pack_into(f"<{HEADER_DIFAT_ENTRIES}I", header, 0x4C, *head_difat)
+
+    out = bytearray(_pad(bytes(header), sector_size))
+    for sector in range(data_sectors + fat_count + difat_count):
+        out += _pad(body.get(sector, b""), sector_size)
+    return bytes(out)
+
+
+def _directory_entry(
+    name: str, object_type: int, start: int, size: int, child: int = NOSTREAM, right: int = NOSTREAM
+) -> bytes:
+    entry = bytearray(128)
+    encoded = (name + "\x00").encode("utf-16le")
+    entry[: len(encoded)] = encoded
+    struct.pack_into("<HBB", entry, 0x40, len(encoded), object_type, 1)
+    struct.pack_into("<III", entry, 0x44, NOSTREAM, right, child)
+    struct.pack_into("<IQ", entry, 0x74, start, size)
+    return bytes(entry)
+
+
+def split_text(text: str, pieces: int) -> List[str]:
+    """Split ``text`` into ``pieces`` non-empty parts of nearly equal length."""
+    pieces = max(1, min(pieces, len(text)))
+    bounds = [len(text) * index // pieces for index in range(pieces + 1)]
+    return [text[bounds[index] : bounds[index + 1]] for index in range(pieces)]
+
+
+def _chpx(properties: RunProperties) -> bytes:
+    grpprl = b""
+    if properties.bold:
+        grpprl += struct.pack("<HB", SPRM_C_F_BOLD, 1)
+    if properties.italic:
+        grpprl += struct.pack("<HB", SPRM_C_F_ITALIC, 1)
+    if properties.style_index != DEFAULT_CHARACTER_STYLE:
+        grpprl += struct.pack("<HH", SPRM_C_ISTD, properties.style_index)
+    return bytes([len(grpprl)]) + grpprl
+
+
+def _build_fkps(runs: List[Tuple[int, int, Optional[bytes]]], first_pn: int, papx: bool) -> Tuple[bytes, bytes]:
+    """Lay ``(fc_start, fc_end, properties)`` runs out as FKPs; return the pages and their PlcBte.
+
+    ``properties`` is a Chpx or, for PAPX pages, a PapxInFkp; gaps
+    between runs are filled with property-less runs.
+    """
+    contiguous: List[Tuple[int, int, Optional[bytes]]] = []
+    for start, end, properties in sorted(runs, key=lambda run: run[0]):
+        if contiguous and start > contiguous[-1][1]:
+            contiguous.append((contiguous[-1][1], start, None))
+        contiguous.append((start, end, properties))
+    entry_size = 13 if papx else 1
+    pages = bytearray()
+    fcs: List[int] = []
+    pns: List[int] = []
+    index = 0
+    while index < len(contiguous):
+        page = bytearray(FKP_SIZE)
+        heap = FKP_SIZE - 1
+        chunk: List[Tuple[int, int, int]] = []
+        while index < len(contiguous):
+            start, end, properties = contiguous[index]
+            # Property blocks are word-aligned and grow down from the end of the page.
+            top = (heap - len(properties or b"")) & ~1
+            if 4 * (len(chunk) + 2) + entry_size * (len(chunk) + 1) > top:
+                break
+            heap = top
+            if properties:
+                page[heap : heap + len(properties)] = properties
+            chunk.append((start, end, heap // 2 if properties else 0))
+            index += 1
+        page[: 4 * (len(chunk) + 1)] = struct.pack(
+            f"<{len(chunk) + 1}I", *[start for start, _, _ in chunk], chunk[-1][1]
+        )
+        for slot, (_, _, word_offset) in enumerate(chunk):
+            page[4 * (len(chunk) + 1) + slot * entry_size] = word_offset
+        page[FKP_SIZE - 1] = len(chunk)
+        fcs.append(chunk[0][0])
+        pns.append(first_pn + len(pns))
+        pages += page
+    fcs.append(contiguous[-1][1] if contiguous else 0)
+    plc = struct.pack(f"<{len(fcs)}I{len(pns)}I", *fcs, *pns) if pns else b""
+    return bytes(pages), plc
+
+
+def _fc_ranges(cp_start: int, cp_end: int, pieces: List[Tuple[int, int, int, int]]) -> Iterator[Tuple[int, int]]:
+    """Map a CP range to FC ranges through ``(cp_start, cp_end, offset, width)`` pieces."""
+    for start, end, offset, width in pieces:
+        low, high = max(cp_start, start), min(cp_end, end)
+        if low < high:
+            yield offset + (low - start) * width, offset + (high - start) * width
+
+
+def build_word_streams(
+    text: str,
+    pieces: int = 1,
+    unicode_ratio: float = 0.0,
+    shuffle_pieces: bool = False,
+    which_table: bool = True,
+    encrypted: bool = False,
+    nfib: int = FIB_NFIB_WORD97,
+    min_stream_size: int = MINI_STREAM_CUTOFF,
+    story_counts: Optional[Dict[str, int]] = None,
+    runs: Optional[Sequence[Tuple[int, int, RunProperties]]] = None,
+    paragraph_styles: Optional[Sequence[int]] = None,
+    seed: int = 0,
+) -> Dict[str, bytes]:
+    """Build the ``WordDocument`` and table streams for ``text``.
+
+    ``text`` is cut into ``pieces`` pieces; a ``unicode_ratio`` share of them
+    is stored as UTF-16 (and any piece cp1252 cannot encode), the rest as
+    compressed cp1252.  ``shuffle_pieces`` stores the pieces out of CP order so
+    that nothing can be coalesced.  Both streams are padded to
+    ``min_stream_size`` bytes; pass 0 to let small documents use the mini
+    stream.  ``story_counts`` maps FIB count fields (``ccpText``, ``ccpFtn``,
+    ...) to the length of each story; by default all of ``text`` is the main
+    story.  ``runs`` gives ``(cp_start, cp_end, RunProperties)`` character
+    formatting and ``paragraph_styles`` the style index of each paragraph
+    (cycled); either one adds CHPX and PAPX FKPs and their bin tables.
+    """
+    rng = random.Random(seed)
+    parts = split_text(text, pieces) if text else []
+    encoded: List[Tuple[bytes, bool]] = []
+    for part in parts:
+        compressed = rng.random() >= unicode_ratio
+        if compressed:
+            try:
+                encoded.append((part.encode("cp1252"), True))
+                continue
+            except UnicodeEncodeError:
+                pass
+        encoded.append((part.encode("utf-16le"), False))
+
+    order = list(range(len(encoded)))
+    if shuffle_pieces:
+        rng.shuffle(order)
+    body = bytearray()
+    offsets = [0] * len(encoded)
+    for index in order:
+        offsets[index] = TEXT_START + len(body)
+        body += encoded[index][0]
+
+    cps = [0]
+    pcds = bytearray()
+    piece_fcs: List[Tuple[int, int, int, int]] = []
+    for (data, compressed), offset in zip(encoded, offsets):
+        # A CP is one byte of a compressed piece and one UTF-16 code unit of a Unicode one.
+        cps.append(cps[-1] + (len(data) if compressed else len(data) // 2))
+        piece_fcs.append((cps[-2], cps[-1], offset, 1 if compressed else 2))
+        fc = (offset * 2) | 0x40000000 if compressed else offset
+        pcds += struct.pack("<HIH", 0, fc, 0)
+    plc = struct.pack(f"<{len(cps)}I", *cps) + bytes(pcds)
+    clx = b"\x02" + struct.pack("<I", len(plc)) + plc
+    table = bytearray(b"\x00" * 16) + clx
+
+    bin_tables: Dict[int, Tuple[int, int]] = {}
+    if runs is not None or paragraph_styles is not None:
+        character_runs = [
+            (fc_start, fc_end, _chpx(properties))
+            for cp_start, cp_end, properties in runs or ()
+            for fc_start, fc_end in _fc_ranges(cp_start, cp_end, piece_fcs)
+        ]
+        paragraph_runs = []
+        styles = list(paragraph_styles or (0,))
+        cp_start = position = 0
+        for number, mark in enumerate(re.finditer("[\r\x07]", text)):
+            papx = struct.pack("<BBH", 0, 1, styles[number % len(styles)])
+            cp_end = cp_start + len(text[position : mark.end()].encode("utf-16le")) // 2
+            for fc_start, fc_end in _fc_ranges(cp_start, cp_end, piece_fcs):
+                paragraph_runs.append((fc_start, fc_end, papx))
+            cp_start, position = cp_end, mark.end()
+        body += b"\x00" * (-(TEXT_START + len(body)) % FKP_SIZE)
+        for fc_offset, runs_of_kind, papx in (
+            (FC_PLCF_BTE_CHPX_OFFSET, character_runs, False),
+            (FC_PLCF_BTE_PAPX_OFFSET, paragraph_runs, True),
+        ):
+            pages, bin_table = _build_fkps(runs_of_kind, (TEXT_START + len(body)) // FKP_SIZE, papx)
+            body += pages
+            bin_tables[fc_offset] = (len(table), len(bin_table))
+            table += bin_table
+
+    fib = bytearray(FIB_SIZE)
+    struct.pack_into("<HH", fib, 0x0000, 0xA5EC, nfib)
+    flags = (0x0200 if which_table else 0) | (0x0100 if encrypted else 0)
+    struct.pack_into("<H", fib, 0x000A, flags)
+    struct.pack_into("<H", fib, 0x0020, 14)
+    struct.pack_into("<H", fib, 0x003E, 22)
+    for name, count in (story_counts or {"ccpText": cps[-1]}).items():
+        struct.pack_into("<i", fib, CCP_OFFSETS[name], count)
+    struct.pack_into("<H", fib, 0x0098, 0x005D)
+    struct.pack_into("<I", fib, FC_CLX_OFFSET, 16)
+    struct.pack_into("<I", fib, LCB_CLX_OFFSET, len(clx))
+    for fc_offset, lcb_offset in (
+        (FC_PLCF_BTE_CHPX_OFFSET, LCB_PLCF_BTE_CHPX_OFFSET),
+        (FC_PLCF_BTE_PAPX_OFFSET, LCB_PLCF_BTE_PAPX_OFFSET),
+    ):
+        if fc_offset in bin_tables:
+            struct.pack_into("<II", fib, fc_offset, *bin_tables[fc_offset])
+    word = bytes(fib) + b"\x00" * (TEXT_START - FIB_SIZE) + bytes(body)
+
+    def padded(data: bytes) -> bytes:
+        return data + b"\x00" * max(0, min_stream_size - len(data))
+
+    return {
+        "WordDocument": padded(word),
+        "1Table" if which_table else "0Table": padded(bytes(table)),
+    }
+
+
+def build_doc(
+    text: str,
+    pieces: int = 1,
+    unicode_ratio: float = 0.0,
+    shuffle_pieces: bool = False,
+    min_stream_size: int = MINI_STREAM_CUTOFF,
+    sector_size: int = 512,
+    min_fat_sectors: int = 0,
+    scatter_sectors: bool = False,
+    extra_streams: Optional[Dict[str, bytes]] = None,
+    seed: int = 0,
+    **fib_options,
+) -> bytes:
+    """Build a complete synthetic ``.doc`` file whose text is ``text``.
+
+    See :func:`build_word_streams` and :func:`build_compound_file` for the
+    options; ``fib_options`` are passed through to the FIB writer.
+    """
+    streams = build_word_streams(
+        text,
+        pieces=pieces,
+        unicode_ratio=unicode_ratio,
+        shuffle_pieces=shuffle_pieces,
+        min_stream_size=min_stream_size,
+        seed=seed,
+        **fib_options,
+    )
+    streams.update(extra_streams or {})
+    return build_compound_file(
+        streams,
+        sector_size=sector_size,
+        min_fat_sectors=min_fat_sectors,
+        scatter_sectors=scatter_sectors,
+        seed=seed,
+    )
+
+
+def sample_text(chars: int, seed: int = 0, alphabet: Sequence[str] = ()) -> str:
+    """Return ``chars`` characters of word-like text with paragraph marks."""
+    rng = random.Random(seed)
+    words = list(alphabet) or [
+        "lorem", "ipsum", "dolor", "sit", "amet", "legacy", "document", "piece", "table", "stream",
+    ]
+    out: List[str] = []
+    size = 0
+    while size < chars:
+        word = rng.choice(words)
+        separator = "\r" if rng.random() < 0.05 else " "
+        out.append(word + separator)
+        size += len(word) + 1
+    return "".join(out)[:chars]
+
+
+def _clip_pieces(pieces: List[Tuple[int, int, int]], cp_start: int, cp_end: int) -> List[Tuple[int, int, int]]:
+    """The parts of ``(length, offset, width)`` pieces inside ``[cp_start, cp_end)``."""
+    clipped = []
+    position = 0
+    for length, offset, width in pieces:
+        start = max(cp_start, position)
+        end = min(cp_end, position + length)
+        if start < end:
+            clipped.append((end - start, offset + (start - position) * width, width))
+        position += length
+    return clipped
+
+
+def fast_save(data: bytes, edits: Sequence[Tuple[int, int, str]], **compound_options) -> bytes:
+    """Apply ``(cp_start, cp_end, replacement)`` edits to a document the way Word's fast save does.
+
+    Replacement text is appended to the ``WordDocument`` stream and a new
+    piece table, with the old pieces split around each edit, is appended to
+    the table stream, so unchanged text keeps its file offsets.  Edits apply
+    in order to the main story, each to the result of the previous ones.
+    """
+    with CFBFReader(data) as cfbf:
+        streams = {
+            name: cfbf.open_stream(name).getvalue() for name, entry in cfbf._entries.items() if entry.object_type == 2
+        }
+    word = bytearray(streams["WordDocument"])
+    fib = WordFIB.from_bytes(bytes(word))
+    table = bytearray(streams[fib.table_stream_name])
+    pieces = [
+        (segment.cp_end - segment.cp_start, segment.offset, 1 if segment.encoding == "cp1252" else 2)
+        for segment in PieceTable(bytes(table), fib.fcClx, fib.lcbClx).segments()
+    ]
+    total = sum(length for length, _, _ in pieces)
+    ccp_text = fib.ccpText
+    for cp_start, cp_end, replacement in edits:
+        inserted = []
+        if replacement:
+            try:
+                encoded, width = replacement.encode("cp1252"), 1
+            except UnicodeEncodeError:
+                encoded, width = replacement.encode("utf-16le"), 2
+            word += b"\x00" * (len(word) % 2)
+            inserted = [(len(encoded) // width, len(word), width)]
+            word += encoded
+        pieces = _clip_pieces(pieces, 0, cp_start) + inserted + _clip_pieces(pieces, cp_end, total)
+        delta = sum(length for length, _, _ in inserted) - (cp_end - cp_start)
+        total += delta
+        ccp_text += delta
+    cps = [0]
+    pcds = bytearray()
+    for length, offset, width in pieces:
+        cps.append(cps[-1] + length)
+        pcds += struct.pack("<HIH", 0, (offset * 2) | 0x40000000 if width == 1 else offset, 0)
+    plc = struct.pack(f"<{len(cps)}I", *cps) + bytes(pcds)
+    clx = b"\x02" + struct.pack("<I", len(plc)) + plc
+    struct.pack_into("<II", word, FC_CLX_OFFSET, len(table), len(clx))
+    struct.pack_into("<i", word, CCP_OFFSETS["ccpText"], ccp_text)
+    table += clx
+    streams["WordDocument"] = bytes(word)
+    streams[fib.table_stream_name] = bytes(table)
+    return build_compound_file(streams, **compound_options)
+
+
+# Values that tend to break sector arithmetic when written over a 32-bit field.
+_FUZZ_VALUES = (0, 1, 2, 0x7F, 0x1000, 0x7FFFFFFF, 0xFFFFFFF0, DIFSECT, FATSECT, ENDOFCHAIN, FREESECT)
+
+
+def _structure_spans(data: bytes) -> List[Tuple[int, int]]:
+    """Byte ranges of the header, FAT and directory sectors of a well-formed file."""
+    with CFBFReader(data) as cfbf:
+        spans = [(0, 512)]
+        for sector in list(cfbf._fat_sectors) + list(cfbf._iter_chain(cfbf._dir_start_sector)):
+            offset = cfbf._sector_offset(sector)
+            spans.append((offset, offset + cfbf.sector_size))
+    return spans
+
+
+def mutations(data: bytes, count: int, seed: int = 0) -> Iterator[bytes]:
+    """Yield ``count`` randomly corrupted copies of the well-formed file ``data``.
+
+    Mutations overwrite 32-bit fields of the header, FAT and directory with
+    boundary values, flip random bytes anywhere, or truncate the file.
+    """
+    rng = random.Random(seed)
+    spans = _structure_spans(data)
+    for _ in range(count):
+        mutated = bytearray(data)
+        strategy = rng.random()
+        if strategy < 0.6:
+            for _ in range(rng.randint(1, 4)):
+                start, end = rng.choice(spans)
+                offset = rng.randrange(start, end - 3) & ~3
+                value = rng.choice(_FUZZ_VALUES + (rng.randrange(len(data) // 512 + 4),))
+                struct.pack_into("<I", mutated, offset, value)
+        elif strategy < 0.9:
+            for _ in range(rng.randint(1, 16)):
+                mutated[rng.randrange(len(mutated))] = rng.randrange(256)
+        else:
+            del mutated[rng.randrange(len(mutated)) :]
+        yield bytes(mutated)
+
+
+def _patch_fat(data: bytearray, sector: int, value: int) -> None:
+    with CFBFReader(bytes(data)) as cfbf:
+        per_sector = cfbf.sector_size // 4
+        offset = cfbf._sector_offset(cfbf._fat_sectors[sector // per_sector]) + sector % per_sector * 4
+    struct.pack_into("<I", data, offset, value)
+
+
+def _patch_directory(data: bytearray, name: str, field_offset: int, fmt: str, value: int) -> None:
+    with CFBFReader(bytes(data)) as cfbf:
+        offsets = [cfbf._sector_offset(sector) for sector in cfbf._iter_chain(cfbf._dir_start_sector)]
+        for sector_offset in offsets:
+            for offset in range(sector_offset, sector_offset + cfbf.sector_size, 128):
+                if data[offset : offset + len(name) * 2] == name.encode("utf-16le"):
+                    struct.pack_into(fmt, data, offset + field_offset, value)
+                    return
+    raise KeyError(name)
+
+
+def hostile_docs(text: str = "hostile input\r") -> Dict[str, bytes]:
+    """Return hand-made documents that attack the reader's loops and allocations.
+
+    Each one is structurally broken in a way a naive reader follows forever
+    or answers with a huge allocation: cyclic FAT, mini FAT and DIFAT chains,
+    absurd stream sizes and ``lcbClx`` values, and piece tables whose pieces
+    all point at the same run of text.
+    """
+    docs: Dict[str, bytes] = {}
+    base = build_doc(text * 400)
+    with CFBFReader(base) as cfbf:
+        word_start = cfbf._entries["WordDocument"].start_sector
+        chain = list(cfbf._iter_chain(word_start))
+        dir_start = cfbf._dir_start_sector
+        word_offset = cfbf._sector_offset(word_start)
+
+    data = bytearray(base)
+    _patch_fat(data, chain[1], chain[0])
+    docs["fat cycle"] = bytes(data)
+    data = bytearray(base)
+    _patch_fat(data, dir_start, dir_start)
+    docs["directory self loop"] = bytes(data)
+    data = bytearray(base)
+    _patch_directory(data, "WordDocument", 0x78, "<Q", 0xFFFFFFF0)
+    docs["huge stream size"] = bytes(data)
+    data = bytearray(base)
+    struct.pack_into("<I", data, word_offset + LCB_CLX_OFFSET, 0x7FFFFFF0)
+    docs["huge lcbClx"] = bytes(data)
+
+    mini = bytearray(build_doc(text, min_stream_size=0))
+    with CFBFReader(bytes(mini)) as cfbf:
+        table_start = cfbf._entries["1Table"].start_sector
+        mini_fat_offset = cfbf._sector_offset(cfbf._mini_fat_start)
+    struct.pack_into("<I", mini, mini_fat_offset + table_start * 4, table_start)
+    docs["mini FAT cycle"] = bytes(mini)
+
+    difat = bytearray(build_doc(text, min_fat_sectors=130))
+    difat_start = struct.unpack_from("<I", difat, 0x44)[0]
+    struct.pack_into("<I", difat, 0x48, 0xFFFFFFFF)
+    struct.pack_into("<I", difat, 512 * (difat_start + 1) + 508, difat_start)
+    docs["DIFAT cycle"] = bytes(difat)
+
+    streams = build_word_streams(text * 4000)
+    table = bytearray(streams["1Table"])
+    count = 5000
+    length = len(text) * 4000
+    cps = struct.pack(f"<{count + 1}I", *range(0, (count + 1) * length, length))
+    pcds = struct.pack("<HIH", 0, (TEXT_START * 2) | 0x40000000, 0) * count
+    plc = cps + pcds
+    clx = b"\x02" + struct.pack("<I", len(plc)) + plc
+    word = bytearray(streams["WordDocument"])
+    struct.pack_into("<I", word, LCB_CLX_OFFSET, len(clx))
+    struct.pack_into("<i", word, CCP_OFFSETS["ccpText"], count * length)
+    docs["overlapping pieces"] = build_compound_file(
+        {"WordDocument": bytes(word), "1Table": bytes(table[:16]) + clx}
+    )
+    return docs